@@ -0,0 +1,45 @@
+'''
+Measures the memory of a cleaned contest against the published bytes-per-entry and bytes-per-user targets.
+
+    python benchmarks/memory.py --sizes 100000 1000000
+'''
+
+import os
+import sys
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+from showdown.synthetic import generateContest
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure bytes per entry and per user of cleaned contests.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[], help='Synthetic contest sizes to measure as well')
+    args = parser.parse_args(argv)
+
+    contests = [('sampleContest.csv', pd.read_csv(SAMPLE))]
+    contests += [(f'synthetic {i}', generateContest(i)) for i in args.sizes]
+
+    rows = []
+    for name, data in contests:
+        df, userTable, players, slots = showdown.cleanData(data)
+        rows.append({'contest':name, 'entries':len(df), **showdown.contestBytes(df, userTable, players, slots)})
+
+    results = pd.DataFrame(rows)
+    results[['per_entry', 'per_user']] = results[['per_entry', 'per_user']].round(2)
+    print(results.to_string(index=False))
+    print(f'\ntargets: {showdown.TARGET_BYTES_PER_ENTRY} bytes per entry (row frame + slot matrix), '
+          f'{showdown.TARGET_BYTES_PER_USER} bytes per user (user names + user table)')
+
+    if (results['per_entry'] > showdown.TARGET_BYTES_PER_ENTRY).any():
+        sys.exit('over the bytes-per-entry target')
+    if (results['per_user'] > showdown.TARGET_BYTES_PER_USER).any():
+        sys.exit('over the bytes-per-user target')
+
+if __name__ == '__main__':
+    main()
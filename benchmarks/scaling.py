@@ -0,0 +1,127 @@
+'''
+Times and memory-profiles each analysis stage on synthetic contests.
+
+    python benchmarks/scaling.py --sizes 10000 100000 1000000 --json results.json
+'''
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+from showdown.synthetic import generateContest, writeContest
+
+def measure(func, memory=True):
+    '''
+    Runs func once for wall time and, optionally, once more under tracemalloc for peak memory.
+
+            Returns:
+                    result: Return value of func
+                    seconds (float): Wall time
+                    peak (float): Peak traced memory in MB, or None
+    '''
+
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+    return result, seconds, peak
+
+def benchmark(nEntries, lineupFormat='CPT', memory=True):
+    '''
+    Benchmarks every stage on one synthetic contest.
+
+            Returns:
+                    rows (list): One dict per stage with entries, seconds and peak MB
+    '''
+
+    rows = []
+
+    def record(stage, func):
+        result, seconds, peak = measure(func, memory)
+        rows.append({'entries':nEntries, 'format':lineupFormat, 'stage':stage,
+                     'seconds':round(seconds, 4), 'peak_mb':None if peak is None else round(peak, 1)})
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'contest.csv')
+        writeContest(generateContest(nEntries, lineupFormat), path)
+
+        data = record('read_csv', lambda: pd.read_csv(path))
+        lineups = data['Lineup'].dropna()
+        ids = {name:i for i, name in enumerate(pd.unique(showdown.normalizeNames(data['Player'].dropna())))}
+        # bound as defaults, since the names are deleted to free memory before later stages
+        record('regex split', lambda lineups=lineups: showdown.splitLineups(lineups))
+        record('tokenizer', lambda lineups=lineups: showdown.tokenizeLineups(lineups, ids))
+        del lineups
+        df, userTable, players, slots = record('cleanData', lambda data=data: showdown.cleanData(data))
+        del data
+        record('streamContest', lambda: showdown.streamContest(path))
+        stats = record('player stats', lambda: showdown.readPlayerStats(path, players))
+
+    record('field exposures', lambda: pd.DataFrame(showdown.getfieldExposure(slots, players)))
+    userMatrix = record('user exposure matrix', lambda: showdown.getuserExposureMatrix(df, slots, players))
+    user = df['user'].iloc[0]
+    record('user exposures', lambda: showdown.getuserExposure(user, userMatrix, players))
+    record('field distance', lambda: showdown.getfieldDistance(userMatrix, slots, players, 20))
+    record('leaders', lambda: showdown.getleaders(userTable))
+    record('chalk', lambda: showdown.getchalk(df, slots, players))
+    metrics = record('lineup metrics', lambda: showdown.getlineupMetrics(slots, stats))
+    record('user metrics', lambda: showdown.getuserMetrics(df, metrics))
+
+    comboIndex = record('combo index', lambda: showdown.getcomboIndex(df, slots, players))
+    key = showdown.comboKey(0, 'CPT', 1, 'FLEX', len(players))
+    record('combo query', lambda: df.iloc[showdown.getcombo(comboIndex, key)[2]])
+
+    bitmapIndex = record('bitmap index', lambda: showdown.getbitmapIndex(df, slots, players))
+    terms = [('', players[0], 'CPT'), ('AND', players[1], 'FLEX'), ('OR', players[2], 'ANY'),
+             ('AND NOT', players[3], 'ANY'), ('AND', players[4], 'FLEX')]
+    record('5-term lineup query', lambda: showdown.lineupQuery(bitmapIndex, players, terms))
+
+    nearIndex = record('near-dupe index', lambda: showdown.getnearIndex(df, slots, players))
+    record('near-dupe metrics', lambda: showdown.getnearMetrics(nearIndex))
+    record('near-dupe clusters', lambda: showdown.getnearClusters(df, nearIndex, players))
+    record('portfolio overlap', lambda: showdown.getportfolioOverlap(df, nearIndex))
+
+    simResults = record('simulation (1000 sims)', lambda: showdown.getsimResults(df, slots, stats, 1000))
+    record('simulated users', lambda: showdown.getsimUsers(df, simResults))
+
+    pairCounts = record('pair counts', lambda: showdown.getpairCounts(slots, players))
+    record('heatmap', lambda: showdown.corrPlot(pairCounts, 5, 'CPT'))
+
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the analysis stages on synthetic contests.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--format', choices=['CPT', 'FLEX'], default='CPT', help='Lineup format')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args(argv)
+
+    rows = []
+    for size in args.sizes:
+        rows += benchmark(size, args.format, not args.no_memory)
+        print(pd.DataFrame([i for i in rows if i['entries'] == size]).to_string(index=False), '\n', flush=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == '__main__':
+    main()
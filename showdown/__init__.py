@@ -0,0 +1,46 @@
+'''
+Headless analytics for DraftKings NFL Showdown contests.
+'''
+
+from showdown.contest import (
+    SLOTS, CONTEST_COLUMNS, PLAYER_COLUMNS, TARGET_BYTES_PER_ENTRY, TARGET_BYTES_PER_USER, STREAM_CHUNKSIZE, MARKERS, ZIP_MAGIC,
+    isZipped, openExport, readHeader, normalizeNames, sideTable, tokenizeLineups, splitLineups, lineupKeys, cleanData, encodeNames, assembleContest,
+    displayLineups, contestBytes, streamContest
+    )
+from showdown.cache import (
+    CACHE_DIR, CACHE_MAX_BYTES, CACHE_VERSION,
+    contestKey, entryPath, loadContest, saveContest, evictContests, readContest
+    )
+from showdown.exposure import (
+    slotCounts, getfieldExposure, getuserExposureMatrix, getuserExposure, getfieldDistance
+    )
+from showdown.combos import (
+    pairKeys, comboKey, getcomboIndex, getcombo, packRows, getbitmapIndex, lineupQuery
+    )
+from showdown.analysis import (
+    topRows, orderRows, getexposureTable, getleaders, getchalk, getuserLineups, getuserSummary,
+    getexposureComparison, getpairCounts, corrPlot
+    )
+from showdown.ownership import (
+    playerStats, readPlayerStats, getlineupMetrics, getuserMetrics
+    )
+from showdown.neardupes import (
+    MAX_CORE_USERS, lineupTokens, subsetKeys, getnearIndex, getnearMetrics, getnearClusters, getportfolioOverlap
+    )
+from showdown.simulate import (
+    SIMS, SIM_CHUNK_CELLS, scoreModel, drawScores, payoutCurve, getsimResults, getsimLineups, getsimUsers
+    )
+from showdown.export import (
+    EXPORT_FORMATS, getlineupMatrix, getplayerTable, exportFormats, tableBytes, readExport
+    )
+from showdown.history import (
+    HISTORY_PATH, SLOT_CODES, openHistory, storeNames, appendContest, removeSlate, addContests,
+    getslates, getuserHistory, getexposureHistory, getuserSeasonExposure
+    )
+from showdown.metrics import (
+    BASE_INPUTS, METRICS, registerMetric, openContest, getMetric, peekMetric, carryMetrics, getResult, peekResult,
+    getExport, metricGraph
+    )
+from showdown.memo import (
+    RESULT_CACHE_MAX_BYTES, RESULTS, newCache, sizeOf, cachePut, memoize, cacheGet, cacheStats
+    )
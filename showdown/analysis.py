@@ -0,0 +1,334 @@
+'''
+Slate-wide, user and comparison tables shown by the dashboard.
+'''
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import displayLineups
+from showdown.combos import pairKeys
+from showdown.exposure import getfieldExposure, getuserExposure
+
+# ROW SELECTION FUNCS ------------------------------------------------------------------------------
+
+def topRows(values, n, ascending=False):
+    '''
+    Positions of the n largest (or smallest) values, found with a partial partition
+    instead of a full sort. Ties keep row order.
+
+            Parameters:
+                    values (numpy array): Encoded column to rank by
+                    n (int): Number of positions to return
+                    ascending (bool): Smallest values first instead of largest
+
+            Returns:
+                    top (numpy array): Positions of the top n values, best first
+    '''
+
+    values = np.asarray(values, dtype=float)
+    if not ascending:
+        values = -values
+
+    if n < len(values):
+        kth = np.partition(values, n - 1)[n - 1]
+        top = np.flatnonzero(values < kth)
+        top = np.concatenate([top, np.flatnonzero(values == kth)[:n - len(top)]])
+    else:
+        top = np.arange(len(values))
+
+    return top[np.lexsort((top, values[top]))]
+
+def orderRows(df, rows, by='dupes', ascending=False):
+    '''
+    Sorts a result's row positions by an encoded column of the cleaned contest,
+    so display strings can be built for just the rows shown. Ties keep row order.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    rows (numpy array): Row positions of the result
+                    by (str): Column to sort by
+                    ascending (bool): Smallest values first instead of largest
+
+            Returns:
+                    rows (numpy array): The row positions, sorted
+    '''
+
+    rows = np.asarray(rows)
+    values = df[by].to_numpy()[rows].astype(float)
+
+    return rows[np.argsort(values if ascending else -values, kind='stable')]
+
+# SLATE-WIDE FUNCS ------------------------------------------------------------------------------
+
+def getexposureTable(slots, players, minTotal=.99, exps=None):
+    '''
+    Field roster rates of every player with a total roster rate above minTotal.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+                    minTotal (float): Smallest CPT + FLEX roster rate to include
+                    exps (dict): Roster rates already counted, as returned by getfieldExposure,
+                    None to count them from slots
+
+            Returns:
+                    exposures (pandas DataFrame): Player, CPT, FLEX and TOTAL roster rates
+    '''
+
+    exposures = pd.DataFrame(exps if exps is not None else getfieldExposure(slots, players))
+
+    exposures['TOTAL'] = exposures['CPT'] + exposures['FLEX']
+
+    exposures = (exposures
+    .loc[exposures.TOTAL > minTotal]
+    .round(decimals=2)
+    .sort_values('TOTAL',ascending=False)
+    .reset_index(drop=True))
+
+    return exposures
+
+def getleaders(userTable, n=25):
+    '''
+    Users with the most unique lineups.
+
+            Parameters:
+                    userTable (pandas DataFrame): Per-user table of the cleaned contest
+                    n (int): Number of users to return
+
+            Returns:
+                    leaders (pandas DataFrame): One row per user, most uniques first
+    '''
+
+    leaders = (userTable
+    .iloc[topRows(userTable['user_uniques'].to_numpy(), n)]
+    .reset_index(drop=True))
+
+    return leaders
+
+def getchalk(df, slots, players, n=20):
+    '''
+    The most duplicated lineups.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+                    n (int): Number of lineups to return
+
+            Returns:
+                    chalk (pandas DataFrame): One row per distinct lineup, most dupes first
+    '''
+
+    chalk = df.loc[~df['lineup_key'].duplicated().to_numpy()]
+    chalk = chalk.iloc[topRows(chalk['dupes'].to_numpy(), n)]
+
+    return displayLineups(chalk, slots, players).reset_index(drop=True)
+
+# USER FUNCS ------------------------------------------------------------------------------
+
+def getuserLineups(df, slots, players, user):
+    '''
+    Every lineup entered by a user, least duplicated first.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+                    user (str): String of the user to be analyzed
+
+            Returns:
+                    userDf (pandas DataFrame): The user's rows of the cleaned contest, with display strings
+    '''
+
+    userDf = (df
+    .loc[df.user==user]
+    .sort_values(by='dupes'))
+
+    return displayLineups(userDf, slots, players).reset_index(drop=True)
+
+def getuserSummary(userTable, user):
+    '''
+    Headline numbers for a user.
+
+            Parameters:
+                    userTable (pandas DataFrame): Per-user table of the cleaned contest
+                    user (str): String of the user to be analyzed
+
+            Returns:
+                    summary (dict): Entries, uniques, u10 dupes and unique percentage
+    '''
+
+    row = userTable.loc[userTable.user==user].iloc[0]
+
+    summary = {
+    'entries':row['user_entries'],
+    'uniques':row['user_uniques'],
+    'u10_dupes':row['<10_dupes'],
+    'unique%':row['unique%']
+    }
+
+    return summary
+
+def getexposureComparison(userMatrix, slots, players, comp1, comp2='Field'):
+    '''
+    Compares a user's FLEX and CPT roster rates with another user's or the field's.
+
+            Parameters:
+                    userMatrix (dict): Output of getuserExposureMatrix
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+                    comp1 (str): User to compare
+                    comp2 (str): User to compare against, or 'Field'
+
+            Returns:
+                    compFLEX (pandas DataFrame): FLEX roster rates and Diff (comp1 - comp2)
+                    compCPT (pandas DataFrame): CPT roster rates and Diff (comp1 - comp2)
+                    comp (pandas DataFrame): Every roster rate of both users, None against the field
+    '''
+
+    exp1 = pd.DataFrame(getuserExposure(comp1, userMatrix, players))
+
+    if comp2 == 'Field':
+        exp2 = pd.DataFrame(getfieldExposure(slots, players))
+    else:
+        exp2 = pd.DataFrame(getuserExposure(comp2, userMatrix, players))
+
+    if comp2 == 'Field':
+        compFLEX = (exp1
+        .merge(exp2, on='Player')
+        .rename(columns={'CPT':f'{comp2}_CPT','FLEX':f'{comp2}_FLEX'})
+        [['Player',f'{comp1}_FLEX',f'{comp2}_FLEX']]
+        )
+
+        compFLEX['Diff'] = compFLEX[f'{comp1}_FLEX'] - compFLEX[f'{comp2}_FLEX']
+
+        compFLEX = (compFLEX
+        .loc[
+            (
+                ~(
+                    (compFLEX[f'{comp1}_FLEX'] == 0) & 
+                    (compFLEX[f'{comp2}_FLEX'] == 0)
+                    )) &
+                (
+                    (compFLEX[f'{comp2}_FLEX'] > 1.0) |
+                    (compFLEX[f'{comp1}_FLEX'] > 0))
+                ])
+
+        compCPT = (exp1
+        .merge(exp2, on='Player')
+        .rename(columns={'CPT':f'{comp2}_CPT','FLEX':f'{comp2}_FLEX'})
+        [['Player',f'{comp1}_CPT',f'{comp2}_CPT']]
+        )
+
+        compCPT['Diff'] = compCPT[f'{comp1}_CPT'] - compCPT[f'{comp2}_CPT']
+
+        compCPT = (compCPT
+        .loc[
+            (
+                ~(
+                    (compCPT[f'{comp1}_CPT'] == 0) & 
+                    (compCPT[f'{comp2}_CPT'] == 0)
+                    )) &
+                (
+                    (compCPT[f'{comp2}_CPT'] > 1.0) |
+                    (compCPT[f'{comp1}_CPT'] > 0))
+                ])
+
+        comp = None
+
+    else:
+        comp = exp1.merge(exp2, on='Player')
+
+        compFLEX = comp[['Player',f'{comp1}_FLEX',f'{comp2}_FLEX']].copy()
+
+        compFLEX['Diff'] = compFLEX[f'{comp1}_FLEX'] - compFLEX[f'{comp2}_FLEX']
+
+        compFLEX = (compFLEX
+        .loc[
+            ~(
+                (compFLEX[f'{comp1}_FLEX'] == 0) & 
+                (compFLEX[f'{comp2}_FLEX'] == 0)
+                )
+                ])
+
+        compCPT = comp[['Player',f'{comp1}_CPT',f'{comp2}_CPT']].copy()
+
+        compCPT['Diff'] = compCPT[f'{comp1}_CPT'] - compCPT[f'{comp2}_CPT']
+
+        compCPT = compCPT.loc[~((compCPT[f'{comp1}_CPT'] == 0) & (compCPT[f'{comp2}_CPT'] == 0))]
+
+        comp = (comp
+        .loc[~(
+                (comp[f'{comp1}_FLEX'] == 0) &
+                (comp[f'{comp1}_CPT'] == 0) &
+                (comp[f'{comp2}_FLEX'] == 0) &
+                (comp[f'{comp2}_CPT'] == 0)
+                )
+            ])
+
+    compFLEX = compFLEX.sort_values(by='Diff', ascending=False).reset_index(drop=True)
+    compCPT = compCPT.sort_values(by='Diff', ascending=False).reset_index(drop=True)
+
+    return compFLEX, compCPT, comp
+
+# VISUALIZER FUNCS ------------------------------------------------------------------------------
+
+def getpairCounts(slots, players):
+    '''
+    Counts how many lineups hold each CPT/FLEX and FLEX/FLEX pairing,
+    with one scatter-add over the lineups' pair keys.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    pairCounts (dict): CPT x FLEX and symmetric FLEX x FLEX count matrices,
+                    CPT and FLEX counts per player and the number of lineups
+    '''
+
+    nPlayers = len(players)
+    counts = np.bincount(pairKeys(slots, nPlayers).ravel(), minlength=2 * nPlayers**2)
+
+    cptFlex = counts[:nPlayers**2].reshape(nPlayers, nPlayers)
+    flexFlex = counts[nPlayers**2:].reshape(nPlayers, nPlayers)
+    flexFlex = flexFlex + flexFlex.T
+
+    pairCounts = {
+    'players':players,
+    'n':len(slots),
+    'CPT':cptFlex,
+    'FLEX':flexFlex,
+    'cptCounts':cptFlex.sum(axis=1) // 5,
+    'flexCounts':cptFlex.sum(axis=0)
+    }
+
+    return pairCounts
+
+def corrPlot(pairCounts, threshold=5, kind='CPT'):
+    '''
+    Share of all lineups with each CPT and FLEX (or FLEX and FLEX) pairing,
+    for players above a total roster rate threshold.
+
+            Parameters:
+                    pairCounts (dict): Output of getpairCounts
+                    threshold (float): Smallest CPT + FLEX roster rate (in %) to include
+                    kind (str): 'CPT' for CPT x FLEX, 'FLEX' for FLEX x FLEX co-ownership
+
+            Returns:
+                    m_div (pandas DataFrame): Share of lineups, rows are CPT (or FLEX) players
+    '''
+
+    n = max(pairCounts['n'], 1)
+    total = (pairCounts['cptCounts'] + pairCounts['flexCounts']) / n * 100
+    keep = np.flatnonzero(total > threshold)
+
+    m = pairCounts[kind][np.ix_(keep, keep)]
+    names = [pairCounts['players'][i] for i in keep]
+
+    m_div = pd.DataFrame(m / n, index=pd.Index(names, name=kind), columns=pd.Index(names, name='FLEX'))
+
+    # leave out players never paired with anyone in the chart
+    m_div = m_div.loc[m_div.sum(axis=1) > 0, m_div.sum(axis=0) > 0]
+
+    return m_div
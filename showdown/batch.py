@@ -0,0 +1,167 @@
+'''
+Batch processing of a season of contest exports.
+
+    python -m showdown batch contests/ --out summaries/ --workers 4
+'''
+
+import os
+import glob
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import CONTEST_COLUMNS, LOGGER, readHeader, streamContest
+from showdown.exposure import getfieldExposure
+
+# BATCH FUNCS ------------------------------------------------------------------------------
+
+def summarizeContest(path):
+    '''
+    Cleans and encodes one contest export and summarizes it.
+
+            Parameters:
+                    path (str): Path to a raw DraftKings NFL Showdown contest CSV, or the zip it is exported in
+
+            Returns:
+                    summary (dict): One row contest summary, per-user table and
+                    field exposures, each as a pandas DataFrame
+    '''
+
+    df, userTable, players, slots = streamContest(path)
+    contest = os.path.splitext(os.path.basename(path))[0]
+
+    codes = df['user'].cat.codes.to_numpy()
+    lineups = np.bincount(codes, minlength=len(userTable))
+
+    users = pd.DataFrame({
+        'contest':contest,
+        'user':userTable['user'].astype(str),
+        'entries':userTable['user_entries'],
+        'lineups':lineups,
+        'uniques':userTable['user_uniques'],
+        'u10_dupes':userTable['<10_dupes'],
+        'avg_dupes':np.bincount(codes, weights=df['dupes'].to_numpy(), minlength=len(userTable)) / np.maximum(lineups, 1),
+        'unique%':userTable['unique%']
+    })
+
+    exposures = pd.DataFrame(getfieldExposure(slots, players))
+    exposures['TOTAL'] = exposures['CPT'] + exposures['FLEX']
+    exposures.insert(0, 'contest', contest)
+
+    summary = pd.DataFrame({
+        'contest':[contest],
+        'lineups':[len(df)],
+        'users':[len(users)],
+        'distinct':[df['lineup_key'].nunique()],
+        'uniques':[df['unique'].sum()],
+        'unique%':[round(df['unique'].mean() * 100,2)],
+        'avg_dupes':[df['dupes'].mean()],
+        'max_dupes':[df['dupes'].max()]
+    })
+
+    return {'contests':summary, 'users':users, 'exposures':exposures}
+
+def crossSlateUsers(users):
+    '''
+    Combines per-contest user tables into one profile per user.
+
+            Parameters:
+                    users (pandas DataFrame): Concatenated per-contest user tables
+
+            Returns:
+                    profiles (pandas DataFrame): One row per user across every slate
+    '''
+
+    profiles = (users
+    .groupby('user')
+    .agg(
+        slates=('contest','nunique'),
+        lineups=('lineups','sum'),
+        avg_lineups=('lineups','mean'),
+        uniques=('uniques','sum'),
+        avg_unique_pct=('unique%','mean'),
+        avg_dupes=('avg_dupes','mean'))
+    .reset_index())
+
+    profiles['unique%'] = round((profiles['uniques'] / profiles['lineups']) * 100,2)
+
+    return profiles.sort_values('lineups', ascending=False).reset_index(drop=True)
+
+def runBatch(paths, workers=None):
+    '''
+    Summarizes contest exports in parallel across a process pool.
+
+            Parameters:
+                    paths (list): Paths to raw DraftKings NFL Showdown contest CSVs, in slate order
+                    workers (int): Number of processes, defaults to the number of cores
+
+            Returns:
+                    tables (dict): contests, users and exposures tables across every
+                    contest, plus the cross-slate user profiles
+    '''
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = list(pool.map(summarizeContest, paths))
+
+    tables = {
+        i:pd.concat([s[i] for s in summaries], ignore_index=True)
+        for i in ['contests','users','exposures']
+    }
+
+    tables['profiles'] = crossSlateUsers(tables['users'])
+
+    return tables
+
+def contestPaths(directory):
+    '''
+    Contest exports in a directory. Other CSVs (e.g. the summaries of an earlier
+    batch) are skipped by their header.
+
+            Parameters:
+                    directory (str): Directory of contest CSVs (or zipped exports)
+
+            Returns:
+                    paths (list): Paths of the files with a DraftKings NFL Showdown contest header, sorted
+    '''
+
+    paths = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.csv')) + glob.glob(os.path.join(directory, '*.zip'))):
+        try:
+            columns = readHeader(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            columns = None
+
+        if columns == CONTEST_COLUMNS:
+            paths.append(path)
+        else:
+            LOGGER.warning('skipped %s: not a contest export', path)
+
+    return paths
+
+def addArguments(parser):
+    parser.add_argument('directory', help='Directory of contest CSVs (or zipped exports)')
+    parser.add_argument('--out', default='batch_summaries', help='Directory to write the summary CSVs to')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+
+def run(args, parser):
+    paths = contestPaths(args.directory)
+
+    if not paths:
+        parser.error(f'no contest CSV or zip files found in {args.directory}')
+
+    tables = runBatch(paths, args.workers)
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, table in tables.items():
+        table.to_csv(os.path.join(args.out, f'{name}.csv'), index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize a directory of DraftKings Showdown contest CSVs.')
+    addArguments(parser)
+    run(parser.parse_args(argv), parser)
+
+if __name__ == '__main__':
+    main()
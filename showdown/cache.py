@@ -0,0 +1,230 @@
+'''
+Content-addressed on-disk cache of cleaned contests.
+'''
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import PLAYER_COLUMNS, cleanData, streamContest, assembleContest, isZipped
+from showdown.instrument import stage
+
+# on-disk cache of cleaned contests, shared by every worker process on the machine
+CACHE_DIR = os.environ.get('SHOWDOWN_CACHE_DIR', '.showdown_cache')
+CACHE_MAX_BYTES = int(os.environ.get('SHOWDOWN_CACHE_MB', 1024)) * 1024 * 1024
+
+# layout of a cache entry, bumped whenever the files, meta.json or the cleaning rules change
+CACHE_VERSION = 5
+
+# CONTEST CACHE FUNCS -------------------------------------------------------------------------
+
+def contestKey(file):
+    '''
+    Hashes the raw bytes of an uploaded contest.
+
+            Parameters:
+                    file (file-like): Raw DraftKings NFL Showdown contest CSV, opened in binary mode
+
+            Returns:
+                    key (str): Hex digest identifying the contest's contents
+    '''
+
+    h = hashlib.blake2b(digest_size=16)
+
+    file.seek(0)
+    for block in iter(lambda: file.read(1 << 20), b''):
+        h.update(block)
+    file.seek(0)
+
+    return h.hexdigest()
+
+def entryPath(key, cacheDir=CACHE_DIR):
+    '''
+    Directory of a contest's cache entry. Entries of another cache version are never read
+    and age out through eviction.
+    '''
+
+    return os.path.join(cacheDir, f'{key}-v{CACHE_VERSION}')
+
+def loadContest(key, cacheDir=CACHE_DIR, malformed=None, side=None):
+    '''
+    Loads a cleaned contest from the on-disk cache. The slot matrix is
+    memory-mapped read-only so processes share a single copy.
+
+            Parameters:
+                    key (str): Contest key from contestKey
+                    cacheDir (str): Cache directory
+                    malformed (list): Collects the lineups skipped when the contest was cleaned
+                    side (list): Collects the contest's player side table
+
+            Returns:
+                    (df, userTable, players, slots) as returned by cleanData, or None on a cache miss
+    '''
+
+    path = entryPath(key, cacheDir)
+
+    if not os.path.isdir(path):
+        return None
+
+    # an entry of another version, or one that can't be read, is a miss and is dropped so it gets rewritten
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        if meta.get('version') != CACHE_VERSION:
+            raise ValueError(f'cache version {meta.get("version")}')
+
+        slots = np.load(os.path.join(path, 'slots.npy'), mmap_mode='r')
+        users = np.load(os.path.join(path, 'users.npy'), mmap_mode='r')
+        userEntries = np.load(os.path.join(path, 'user_entries.npy'))
+
+        df, userTable = assembleContest(slots, users, meta['users'], userEntries, meta['players'])
+        players = meta['players']
+        skipped = meta['malformed']
+        sideRows = pd.DataFrame(meta['side'], columns=PLAYER_COLUMNS).astype({'FPTS':float})
+
+    except Exception:
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+
+    # mark as recently used for LRU eviction
+    os.utime(path)
+
+    if malformed is not None:
+        malformed.extend(skipped)
+    if side is not None:
+        side.append(sideRows)
+
+    return df, userTable, players, slots
+
+def saveContest(key, df, userTable, players, slots, cacheDir=CACHE_DIR, maxBytes=CACHE_MAX_BYTES, malformed=None, side=None):
+    '''
+    Writes a cleaned contest to the on-disk cache, then evicts the least
+    recently used contests until the cache fits in maxBytes.
+
+            Parameters:
+                    key (str): Contest key from contestKey
+                    df (pandas DataFrame): Cleaned contest
+                    userTable (pandas DataFrame): Per-user table of the contest
+                    players (list): Player dictionary
+                    slots (numpy array): N x 6 matrix of player ids
+                    cacheDir (str): Cache directory
+                    maxBytes (int): Size cap of the cache directory
+                    malformed (list): Lineups skipped while cleaning, as collected by cleanData
+                    side (pandas DataFrame): Player side table, see showdown.contest.sideTable
+    '''
+
+    os.makedirs(cacheDir, exist_ok=True)
+
+    users = df['user'].cat.codes.to_numpy()
+    userNames = userTable['user']
+    userEntries = userTable['user_entries'].to_numpy()
+
+    # write to a scratch directory and rename, so readers never see a partial entry
+    tmp = tempfile.mkdtemp(dir=cacheDir, prefix='.tmp-')
+    np.save(os.path.join(tmp, 'slots.npy'), np.ascontiguousarray(slots))
+    np.save(os.path.join(tmp, 'users.npy'), users.astype(np.int32))
+    np.save(os.path.join(tmp, 'user_entries.npy'), userEntries)
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({'version':CACHE_VERSION, 'players':list(players), 'users':[str(i) for i in userNames],
+                   'malformed':malformed or [], 'side':[] if side is None else side.values.tolist()},
+                  f, default=lambda i: i.item())
+
+    try:
+        os.rename(tmp, entryPath(key, cacheDir))
+    except OSError:
+        # another process cached the same contest first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    evictContests(cacheDir, maxBytes)
+
+def evictContests(cacheDir=CACHE_DIR, maxBytes=CACHE_MAX_BYTES):
+    '''
+    Deletes least recently used contests until the cache fits in maxBytes.
+
+            Parameters:
+                    cacheDir (str): Cache directory
+                    maxBytes (int): Size cap of the cache directory
+    '''
+
+    entries = []
+    for name in os.listdir(cacheDir):
+        path = os.path.join(cacheDir, name)
+        if name.startswith('.tmp-') or not os.path.isdir(path):
+            continue
+        size = sum(os.path.getsize(os.path.join(path, i)) for i in os.listdir(path))
+        entries.append((os.path.getmtime(path), size, path))
+
+    total = sum(i[1] for i in entries)
+
+    for _, size, path in sorted(entries):
+        if total <= maxBytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+def readContest(file, streaming=False, cacheDir=CACHE_DIR, maxBytes=CACHE_MAX_BYTES, malformed=None, side=None):
+    '''
+    Cleans a raw contest CSV, going through the on-disk cache. Zipped exports
+    are always decompressed straight into streamContest.
+
+            Parameters:
+                    file (str or file-like): Path to, or binary file of, a raw DraftKings NFL Showdown contest CSV
+                    or the zip it is exported in
+                    streaming (bool): Clean with streamContest instead of cleanData
+                    cacheDir (str): Cache directory, None to skip the cache
+                    maxBytes (int): Size cap of the cache directory
+                    malformed (list): Collects the lineups that couldn't be parsed, also on a cache hit
+                    side (list): Collects the player side table, also on a cache hit
+
+            Returns:
+                    (df, userTable, players, slots) as returned by cleanData
+    '''
+
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            return readContest(f, streaming, cacheDir, maxBytes, malformed, side)
+
+    with stage('contest key'):
+        key = contestKey(file) if cacheDir else None
+
+    if key:
+        with stage('cache load') as record:
+            cached = loadContest(key, cacheDir, malformed, side)
+            record['rows'] = None if cached is None else len(cached[0])
+        if cached is not None:
+            return cached
+
+    file.seek(0)
+
+    # collected here too so the cache entry records them
+    skipped, sideRows = [], []
+
+    if streaming or isZipped(file):
+        with stage('streamContest') as record:
+            contest = streamContest(file, malformed=skipped, side=sideRows)
+            record['rows'] = len(contest[0])
+
+    else:
+        with stage('read_csv') as record:
+            data = pd.read_csv(file)
+            record['rows'] = len(data)
+        with stage('cleanData', len(data)):
+            contest = cleanData(data, skipped, sideRows)
+        del data
+
+    if key:
+        with stage('cache save', len(contest[0])):
+            saveContest(key, *contest, cacheDir=cacheDir, maxBytes=maxBytes, malformed=skipped, side=sideRows[0])
+
+    if malformed is not None:
+        malformed.extend(skipped)
+    if side is not None:
+        side.extend(sideRows)
+
+    return contest
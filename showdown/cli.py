@@ -0,0 +1,156 @@
+'''
+Command line interface.
+
+    python -m showdown analyze contest.csv --exposures --leaders --chalk
+    python -m showdown analyze contest.csv --user bigecg26 --compare Field
+    python -m showdown analyze contest.csv --near --min-entries 20
+    python -m showdown analyze contest.csv --sims 10000
+    python -m showdown analyze contest.csv --profile profile.json
+    python -m showdown analyze contest.csv --out tables/ --format arrow --lineups
+    python -m showdown batch contests/ --out summaries/
+    python -m showdown history --add contests/*.csv
+    python -m showdown history --user bigecg26 --player "Najee Harris" --slot CPT --min-rate 30
+    python -m showdown generate contest.csv --entries 100000
+'''
+
+import os
+import argparse
+
+from showdown import batch, history
+from showdown.synthetic import generateContest, writeContest
+from showdown.cache import CACHE_DIR, readContest
+from showdown.instrument import startProfile, stopProfile, stage, profileJson
+from showdown.exposure import getuserExposureMatrix
+from showdown.ownership import playerStats, getlineupMetrics
+from showdown.neardupes import getnearIndex, getnearClusters, getportfolioOverlap
+from showdown.simulate import getsimResults, getsimUsers
+from showdown.export import EXPORT_FORMATS, getlineupMatrix, getplayerTable, exportFormats, tableBytes
+from showdown.analysis import (
+    getexposureTable, getleaders, getchalk, getuserLineups, getexposureComparison
+    )
+
+def analyze(args):
+    '''
+    Runs the requested analyses on one contest and prints or writes the tables.
+    '''
+
+    with stage('read contest') as record:
+        side = []
+        df, userTable, players, slots = readContest(args.contest, args.stream, None if args.no_cache else CACHE_DIR,
+                                                    side=side)
+        record['rows'] = len(df)
+
+    with stage('lineup metrics', len(df)):
+        stats = playerStats(side[0], players)
+        metrics = getlineupMetrics(slots, stats)
+        df = df.assign(**{i:metrics[i].to_numpy() for i in metrics})
+
+    everything = not (args.exposures or args.leaders or args.chalk or args.user or args.near or args.sims)
+    tables = {}
+
+    if args.exposures or everything:
+        with stage('exposures', len(df)):
+            tables['exposures'] = getexposureTable(slots, players)
+
+    if args.leaders or everything:
+        with stage('leaders', len(userTable)):
+            tables['leaders'] = getleaders(userTable, args.top)
+
+    if args.chalk or everything:
+        with stage('chalk', len(df)):
+            tables['chalk'] = getchalk(df, slots, players, args.top)[['FLEX','CPT','dupes','own','fpts','leverage']]
+
+    if args.user:
+        with stage('user lineups', len(df)):
+            tables['user_lineups'] = getuserLineups(df, slots, players, args.user)[['FLEX','CPT','unique','dupes','own','fpts','leverage']]
+
+        if args.compare:
+            with stage('exposure comparison', len(df)):
+                userMatrix = getuserExposureMatrix(df, slots, players)
+                compFLEX, compCPT, comp = getexposureComparison(userMatrix, slots, players, args.user, args.compare)
+                tables['compare_flex'] = compFLEX
+                tables['compare_cpt'] = compCPT
+                if comp is not None:
+                    tables['compare'] = comp
+
+    if args.near:
+        with stage('near-duplicate clusters', len(df)):
+            nearIndex = getnearIndex(df, slots, players)
+            tables['near_clusters'] = getnearClusters(df, nearIndex, players, args.top)
+
+        with stage('portfolio overlap', len(df)):
+            tables['portfolio_overlap'] = getportfolioOverlap(df, nearIndex, args.min_entries, args.top)
+
+    if args.sims:
+        with stage('simulation', len(df)):
+            tables['simulated_users'] = getsimUsers(df, getsimResults(df, slots, stats, args.sims, args.seed)).head(args.top)
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name, table in tables.items():
+            with open(os.path.join(args.out, f'{name}.{EXPORT_FORMATS[args.format]["extension"]}'), 'wb') as f:
+                f.write(tableBytes(table, args.format))
+
+        if args.lineups:
+            for name, table in [('lineup_matrix', getlineupMatrix(df, slots)), ('players', getplayerTable(players))]:
+                with open(os.path.join(args.out, f'{name}.{EXPORT_FORMATS[args.format]["extension"]}'), 'wb') as f:
+                    f.write(tableBytes(table, args.format))
+
+    else:
+        for name, table in tables.items():
+            print(f'\n{name}\n')
+            print(table.to_string(index=False))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='showdown', description='DraftKings NFL Showdown contest analytics.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyzeParser = commands.add_parser('analyze', help='Analyze one contest CSV')
+    analyzeParser.add_argument('contest', help='Raw DraftKings NFL Showdown contest CSV')
+    analyzeParser.add_argument('--exposures', action='store_true', help='Field roster rates')
+    analyzeParser.add_argument('--leaders', action='store_true', help='User unique leaders')
+    analyzeParser.add_argument('--chalk', action='store_true', help='Most duplicated lineups')
+    analyzeParser.add_argument('--user', help='Lineups of this user')
+    analyzeParser.add_argument('--compare', help="Compare --user's exposures with this user or 'Field'")
+    analyzeParser.add_argument('--near', action='store_true', help='Near-duplicate clusters and user portfolio overlap')
+    analyzeParser.add_argument('--min-entries', type=int, default=20, help='Smallest portfolio in the --near overlap table')
+    analyzeParser.add_argument('--sims', type=int, help='Simulate the contest this many times: win, top-1% and payout equity per user')
+    analyzeParser.add_argument('--seed', type=int, default=0, help='Random seed of --sims')
+    analyzeParser.add_argument('--top', type=int, default=25, help='Rows in the leaders, chalk, --near and --sims tables')
+    analyzeParser.add_argument('--stream', action='store_true', help='Low-memory streaming ingestion')
+    analyzeParser.add_argument('--no-cache', action='store_true', help='Skip the on-disk contest cache')
+    analyzeParser.add_argument('--out', help='Directory to write the tables to instead of printing')
+    analyzeParser.add_argument('--format', choices=exportFormats(), default='csv', help='File format of the --out tables')
+    analyzeParser.add_argument('--lineups', action='store_true', help='Also write the encoded lineup matrix and player ids to --out')
+    analyzeParser.add_argument('--profile', help='Write wall time, peak memory and rows of each stage to this JSON file')
+
+    batchParser = commands.add_parser('batch', help='Summarize a directory of contest CSVs')
+    batch.addArguments(batchParser)
+
+    historyParser = commands.add_parser('history', help='Append contests to, or query, the multi-slate history store')
+    history.addArguments(historyParser)
+
+    generateParser = commands.add_parser('generate', help='Write a synthetic contest CSV')
+    generateParser.add_argument('path', help='CSV to write')
+    generateParser.add_argument('--entries', type=int, default=100000, help='Number of entries')
+    generateParser.add_argument('--format', choices=['CPT', 'FLEX'], default='CPT', help='Lineup format')
+    generateParser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'analyze':
+        if args.profile:
+            startProfile(command='analyze', contest=args.contest)
+
+        try:
+            analyze(args)
+        finally:
+            if args.profile:
+                with open(args.profile, 'w') as f:
+                    f.write(profileJson(stopProfile()))
+    elif args.command == 'batch':
+        batch.run(args, batchParser)
+    elif args.command == 'history':
+        history.run(args, historyParser)
+    else:
+        writeContest(generateContest(args.entries, args.format, seed=args.seed), args.path)
@@ -0,0 +1,225 @@
+'''
+Two player combo counts and multi-player lineup queries.
+'''
+
+import numpy as np
+import pandas as pd
+
+# COMBO FUNCS ------------------------------------------------------------------------------
+
+def pairKeys(slots, nPlayers):
+    '''
+    Encodes every player pair in each lineup as an integer key. The 5 CPT/FLEX
+    pairs are keyed cpt * nPlayers + flex, and the 10 FLEX/FLEX pairs are
+    keyed nPlayers**2 + low * nPlayers + high.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    nPlayers (int): Number of players in the player dictionary
+
+            Returns:
+                    keys (numpy array): N x 15 matrix of pair keys
+    '''
+
+    slots = slots.astype(np.int64)
+    cpt, flex = slots[:,:1], slots[:,1:]
+
+    i, j = np.triu_indices(5, k=1)
+    low = np.minimum(flex[:,i], flex[:,j])
+    high = np.maximum(flex[:,i], flex[:,j])
+
+    return np.hstack([cpt * nPlayers + flex, nPlayers**2 + low * nPlayers + high])
+
+def comboKey(player1, player1Pos, player2, player2Pos, nPlayers):
+    '''
+    Returns the pair key of a two player combo, or None if the combo is
+    impossible (two CPTs or the same player twice).
+    '''
+
+    if player1 == player2 or player1Pos == player2Pos == 'CPT':
+        return None
+
+    if player1Pos == 'CPT':
+        return player1 * nPlayers + player2
+
+    if player2Pos == 'CPT':
+        return player2 * nPlayers + player1
+
+    return nPlayers**2 + min(player1, player2) * nPlayers + max(player1, player2)
+
+def getcomboIndex(df, slots, players):
+    '''
+    Precomputes CPT x FLEX and FLEX x FLEX co-occurrence counts for
+    the contest, plus an index from each pair to the distinct lineups containing it.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    comboIndex (dict): Lineup and unique lineup counts per pair key,
+                    and the rows of df holding each pair's distinct lineups
+    '''
+
+    nKeys = 2 * len(players)**2
+    keys = pairKeys(slots, len(players))
+
+    counts = np.bincount(keys.ravel(), minlength=nKeys)
+    uniques = np.bincount(keys.ravel(), weights=np.repeat(df['unique'].to_numpy(), keys.shape[1]), minlength=nKeys)
+
+    # index only the first row of each distinct lineup
+    _, first = np.unique(df['lineup_key'].to_numpy(), return_index=True)
+    distinctKeys = keys[first].ravel()
+    order = np.argsort(distinctKeys, kind='stable')
+
+    comboIndex = {
+    'counts':counts,
+    'uniques':uniques.astype(int),
+    'offsets':np.concatenate([[0], np.cumsum(np.bincount(distinctKeys, minlength=nKeys))]),
+    'rows':np.repeat(first, keys.shape[1])[order]
+    }
+
+    return comboIndex
+
+def getcombo(comboIndex, key):
+    '''
+    Looks up a two player combo in the combo index.
+
+            Parameters:
+                    comboIndex (dict): Output of getcomboIndex
+                    key (int): Pair key from comboKey, or None
+
+            Returns:
+                    lineups (int): Number of lineups with the combo
+                    uniques (int): Number of those lineups that are unique
+                    rows (numpy array): Rows of df holding each distinct lineup with the combo
+    '''
+
+    if key is None:
+        return 0, 0, np.zeros(0, dtype=int)
+
+    rows = comboIndex['rows'][comboIndex['offsets'][key]:comboIndex['offsets'][key+1]]
+
+    return int(comboIndex['counts'][key]), int(comboIndex['uniques'][key]), rows
+
+# LINEUP QUERY FUNCS -------------------------------------------------------------------------
+
+# set bits in every possible byte, for counting bits in packed bitmaps
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# rows unpacked at a time while building bitmaps, a multiple of 8
+PACK_CHUNK_ROWS = 2 ** 16
+
+def packRows(ids, rows, nIds, nRows, chunk=PACK_CHUNK_ROWS):
+    '''
+    Builds one packed bitmap per id, with bit r set when row r has that id.
+    Rows are unpacked a chunk at a time, so memory is bounded by nIds x chunk
+    bytes rather than nIds x nRows.
+
+            Parameters:
+                    ids (numpy array): Id of each (row, id) pair
+                    rows (numpy array): Row of each (row, id) pair
+                    nIds (int): Number of ids
+                    nRows (int): Number of rows
+                    chunk (int): Rows unpacked at a time, a multiple of 8
+
+            Returns:
+                    bitmaps (numpy array): nIds x ceil(nRows / 8) uint8 bitmaps
+    '''
+
+    bitmaps = np.zeros((nIds, (nRows + 7) // 8), dtype=np.uint8)
+
+    if len(rows) and (rows[1:] < rows[:-1]).any():
+        order = np.argsort(rows, kind='stable')
+        ids, rows = ids[order], rows[order]
+
+    starts = np.arange(0, nRows, chunk)
+    bounds = np.searchsorted(rows, np.append(starts, nRows))
+    bits = np.zeros((nIds, min(chunk, nRows)), dtype=bool)
+
+    for i, start in enumerate(starts):
+        width = min(chunk, nRows - start)
+        bits[:] = False
+        bits[ids[bounds[i]:bounds[i+1]], rows[bounds[i]:bounds[i+1]] - start] = True
+        bitmaps[:,start // 8:(start + width + 7) // 8] = np.packbits(bits[:,:width], axis=1)
+
+    return bitmaps
+
+def getbitmapIndex(df, slots, players):
+    '''
+    Builds an inverted index from each player and slot to a
+    packed bitmap of the lineups (rows of df) rostering them.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    bitmapIndex (dict): CPT and FLEX bitmaps per player id, a bitmap
+                    of unique lineups and the distinct lineup id of each row
+    '''
+
+    n = len(slots)
+    rows = np.arange(n)
+
+    bitmapIndex = {
+    'n':n,
+    'CPT':packRows(slots[:,0], rows, len(players), n),
+    'FLEX':packRows(slots[:,1:].ravel(), np.repeat(rows, 5), len(players), n),
+    'unique':np.packbits(df['unique'].to_numpy() == 1),
+    'lineupIds':pd.factorize(df['lineup_key'])[0],
+    'all':np.packbits(np.ones(n, dtype=bool))
+    }
+
+    return bitmapIndex
+
+def lineupQuery(bitmapIndex, players, terms, mask=None):
+    '''
+    Finds the lineups matching a list of player conditions. Terms are
+    combined left to right, e.g. [('', 'Najee Harris', 'CPT'), ('AND', 'Diontae Johnson', 'FLEX'),
+    ('AND NOT', 'Steelers', 'ANY')].
+
+            Parameters:
+                    bitmapIndex (dict): Output of getbitmapIndex
+                    players (list): Player dictionary
+                    terms (list): (operator, player, slot) tuples. Operators are '', 'NOT',
+                    'AND', 'OR', 'AND NOT' and 'OR NOT', slots are 'CPT', 'FLEX' and 'ANY'
+                    mask (numpy array): Optional boolean array of rows to restrict the query to
+
+            Returns:
+                    result (dict): Matching lineups, unique lineups and distinct lineups,
+                    and the rows of df holding each distinct matching lineup
+    '''
+
+    bitmap = bitmapIndex['all']
+
+    for op, player, slot in terms:
+        i = players.index(player)
+
+        if slot == 'ANY':
+            term = bitmapIndex['CPT'][i] | bitmapIndex['FLEX'][i]
+        else:
+            term = bitmapIndex[slot][i]
+
+        if op.endswith('NOT'):
+            term = ~term & bitmapIndex['all']
+
+        bitmap = bitmap | term if op.startswith('OR') else bitmap & term
+
+    if mask is not None:
+        bitmap = bitmap & np.packbits(mask)
+
+    # keep the first matching row of each distinct lineup
+    rows = np.flatnonzero(np.unpackbits(bitmap, count=bitmapIndex['n']))
+    rows = rows[np.unique(bitmapIndex['lineupIds'][rows], return_index=True)[1]]
+
+    result = {
+    'lineups':int(POPCOUNT[bitmap].sum()),
+    'uniques':int(POPCOUNT[bitmap & bitmapIndex['unique']].sum()),
+    'distinct':len(rows),
+    'rows':rows
+    }
+
+    return result
@@ -0,0 +1,604 @@
+'''
+Cleaning and encoding of DraftKings NFL Showdown contest CSVs.
+'''
+
+import sys
+import logging
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# lineup slots in the order they are stored in the encoded slot matrix
+SLOTS = ['CPT','FLEX1','FLEX2','FLEX3','FLEX4','FLEX5']
+
+# header of a DraftKings Showdown contest export
+CONTEST_COLUMNS = ['Rank', 'EntryId', 'EntryName', 'TimeRemaining', 'Points', 'Lineup',
+       'Unnamed: 6', 'Player', 'Roster Position', '%Drafted', 'FPTS']
+
+# columns of the player side table kept with a contest
+PLAYER_COLUMNS = ['Player', 'Roster Position', 'FPTS']
+
+# published memory targets of a cleaned contest: row frame plus slot matrix per entry, and user
+# names plus user table per user (sampleContest.csv: about 27 and 201). Only the player dictionary,
+# a few KB for any slate, is left out
+TARGET_BYTES_PER_ENTRY = 32
+TARGET_BYTES_PER_USER = 256
+
+# tokens that open a lineup slot
+MARKERS = ('CPT', 'FLEX')
+
+LOGGER = logging.getLogger('showdown')
+
+# rows per chunk in streaming ingestion
+STREAM_CHUNKSIZE = 50000
+
+# first bytes of a zip archive, the format DraftKings ships exports in
+ZIP_MAGIC = b'PK\x03\x04'
+
+# EXPORT FILE FUNCS ------------------------------------------------------------------------------
+
+def isZipped(file):
+    '''
+    Whether a raw export (path or binary file) is a zip archive.
+    '''
+
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            return f.read(4) == ZIP_MAGIC
+
+    file.seek(0)
+    magic = file.read(4)
+    file.seek(0)
+
+    return magic == ZIP_MAGIC
+
+def openExport(file):
+    '''
+    Opens the CSV of a raw export for pd.read_csv. A zipped export is decompressed
+    as it is read, with no temporary file and no decompressed copy in memory.
+
+            Parameters:
+                    file (str or file-like): Path to, or binary file of, a raw DraftKings
+                    NFL Showdown contest CSV or the zip it is exported in
+
+            Returns:
+                    stream (str or file-like): file itself (rewound) for a CSV,
+                    or a decompressing stream of the CSV in a zip, to be closed by the caller
+    '''
+
+    if not isZipped(file):
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        return file
+
+    archive = zipfile.ZipFile(file)
+    members = [i for i in archive.namelist() if i.lower().endswith('.csv')]
+
+    if not members:
+        archive.close()
+        raise ValueError('The zip archive holds no CSV')
+
+    # the member keeps the archive's file open until it is closed itself
+    stream = archive.open(members[0])
+    archive.close()
+
+    return stream
+
+def readHeader(file):
+    '''
+    Column names of a raw export (CSV or zip), read without parsing the body.
+    '''
+
+    stream = openExport(file)
+    columns = list(pd.read_csv(stream, nrows=0).columns)
+
+    if stream is not file:
+        stream.close()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+    return columns
+
+# LINEUP TOKENIZER FUNCS ------------------------------------------------------------------------
+
+def normalizeNames(values):
+    '''
+    Strips player names and collapses runs of spaces inside them.
+
+            Parameters:
+                    values (pandas Series): Player names
+
+            Returns:
+                    names (pandas Series): Normalized player names
+    '''
+
+    return values.astype(str).str.split().str.join(' ')
+
+def sideTable(rows):
+    '''
+    The player side table of a raw export, kept with the contest so the
+    players' points are not read from the export again. Players listed at CPT
+    have their FPTS with the 1.5x CPT bonus, which is taken back out.
+
+            Parameters:
+                    rows (pandas DataFrame): Rows of a raw export with the PLAYER_COLUMNS
+
+            Returns:
+                    side (pandas DataFrame): Normalized Player name, Roster Position and
+                    base FPTS of each listed player
+    '''
+
+    rows = rows.dropna(subset=['Player'])
+    position = rows['Roster Position'].astype(str).str.strip().to_numpy()
+    fpts = rows['FPTS'].astype(float).to_numpy()
+
+    side = pd.DataFrame({
+        'Player':normalizeNames(rows['Player']).to_numpy(),
+        'Roster Position':position,
+        'FPTS':np.where(position == 'CPT', fpts / 1.5, fpts)
+    })
+
+    return side
+
+def markerPrefixes(ids):
+    '''
+    Leading parts of known player names that end in a slot marker (CPT or FLEX),
+    so a name like "Joe FLEX Smith" is not split at its middle word and one like
+    "CPT Kirk" does not open a second slot.
+    '''
+
+    prefixes = set()
+    for name in ids:
+        tokens = name.split()
+        for i in range(len(tokens)):
+            if tokens[i] in MARKERS:
+                prefixes.add(' '.join(tokens[:i + 1]))
+
+    return prefixes
+
+def parseLineup(lineup, prefixes):
+    '''
+    Token by token parse of a lineup the fast path in tokenizeLineups rejected.
+    Slots can come in any order.
+
+            Parameters:
+                    lineup (str): Raw DraftKings lineup string
+                    prefixes (set): Output of markerPrefixes
+
+            Returns:
+                    names (list): CPT then FLEX player names, None if malformed
+                    reason (str): Why the lineup is malformed, None if it parsed
+    '''
+
+    if not isinstance(lineup, str):
+        return None, 'lineup is not text'
+
+    slots = []
+    for token in lineup.split():
+        if token in MARKERS and not (slots and ' '.join(slots[-1][1] + [token]) in prefixes):
+            slots.append((token, []))
+        elif not slots:
+            return None, 'text before the first slot'
+        else:
+            slots[-1][1].append(token)
+
+    cpt = [' '.join(name) for marker, name in slots if marker == 'CPT']
+    flex = [' '.join(name) for marker, name in slots if marker == 'FLEX']
+
+    if len(cpt) != 1:
+        return None, f'{len(cpt)} CPT slots'
+
+    if len(flex) != 5:
+        return None, f'{len(flex)} FLEX slots'
+
+    return cpt + flex, None
+
+def tokenizeLineups(lineups, ids):
+    '''
+    Parses raw lineup strings in a single pass each, detecting CPT-first or
+    FLEX-first per row, and resolves player names straight to integer ids.
+    Rows that can't be parsed are reported rather than failing the whole contest.
+
+            Parameters:
+                    lineups (pandas Series): Raw DraftKings lineup strings
+                    ids (dict): Normalized player name to id dictionary, rows naming a player
+                    it doesn't hold are reported as malformed
+
+            Returns:
+                    slots (numpy array): N x 6 matrix of player ids (CPT, FLEX1-5), -1 on malformed rows
+                    malformed (pandas DataFrame): row (index label), Lineup and reason of each malformed row
+    '''
+
+    lines = lineups.tolist()
+    names = []
+    bad = {}
+    prefixes = None
+
+    for i, lineup in enumerate(lines):
+        text = isinstance(lineup, str)
+
+        # fast path: CPT first, or the old format with FLEX first and CPT last
+        if text and lineup[:4] == 'CPT ':
+            parts = lineup[4:].split(' FLEX ')
+            if len(parts) == 6 and ' CPT ' not in lineup:
+                names.extend(parts)
+                continue
+
+        elif text and lineup[:5] == 'FLEX ':
+            head, marker, cpt = lineup[5:].rpartition(' CPT ')
+            parts = head.split(' FLEX ')
+            if marker and len(parts) == 5:
+                names.append(cpt)
+                names.extend(parts)
+                continue
+
+        if prefixes is None:
+            prefixes = markerPrefixes(ids)
+
+        parts, reason = parseLineup(lineup, prefixes)
+        if reason is not None:
+            bad[i] = reason
+            parts = [''] * 6
+        names.extend(parts)
+
+    # names are resolved once per distinct string, not once per slot
+    codes, uniques = pd.factorize(np.array(names, dtype=object))
+    codes = codes.reshape(-1, 6)
+    normalized = [' '.join(i.split()) for i in uniques]
+
+    slots = np.array([ids.get(i, -1) for i in normalized], dtype=np.int32)[codes]
+
+    empty = np.array([not i for i in normalized], dtype=bool)
+    for i in np.flatnonzero(empty[codes].any(axis=1)):
+        bad.setdefault(i, 'empty player name')
+
+    # a name outside the dictionary is a misparse or a player the export doesn't list
+    for i in np.flatnonzero((slots < 0).any(axis=1)):
+        bad.setdefault(i, 'unknown player')
+
+    rows = np.array(sorted(bad), dtype=int)
+    slots[rows] = -1
+
+    malformed = pd.DataFrame({
+        'row':lineups.index[rows],
+        'Lineup':[lines[i] for i in rows],
+        'reason':[bad[i] for i in rows]
+    })
+
+    return slots, malformed
+
+def reportMalformed(malformed, entries, sink=None):
+    '''
+    Logs malformed lineups and adds them to sink.
+
+            Parameters:
+                    malformed (pandas DataFrame): Output of tokenizeLineups
+                    entries (pandas Series): EntryName of the rows, by index label
+                    sink (list): Collects one dict per malformed row, None to only log
+    '''
+
+    if malformed.empty:
+        return
+
+    malformed = malformed.assign(EntryName=entries.reindex(malformed['row']).to_numpy())
+    malformed = malformed[['row', 'EntryName', 'Lineup', 'reason']]
+
+    LOGGER.warning('skipped %d malformed lineups, e.g. row %s: %s',
+                   len(malformed), malformed['row'].iloc[0], malformed['reason'].iloc[0])
+
+    if sink is not None:
+        sink.extend(malformed.to_dict('records'))
+
+def splitLineups(lineups):
+    '''
+    Splits raw lineup strings into one stripped player name per slot with a regex.
+    Every row must share one format. Superseded by tokenizeLineups, kept as its benchmark baseline.
+
+            Parameters:
+                    lineups (pandas Series): Raw DraftKings lineup strings
+
+            Returns:
+                    names (pandas DataFrame): Player names with SLOTS as columns
+    '''
+
+    split = lineups.str.split('FLEX|CPT',expand=True)
+
+    # this logic allows old contest CSV to work in the app (CPT used to be listed last)
+    if (lineups.str[:3] == 'CPT').all():
+        split = split.rename(columns={1:'CPT', 2:'FLEX1', 3:'FLEX2', 4:'FLEX3', 5:'FLEX4', 6:'FLEX5'})
+
+    elif (lineups.str[:3] == 'FLE').all():
+        split = split.rename(columns={1:'FLEX1', 2:'FLEX2', 3:'FLEX3', 4:'FLEX4', 5:'FLEX5', 6:'CPT'})
+
+    else:
+        raise ValueError('Lineups mix CPT-first and FLEX-first formats')
+
+    return split[SLOTS].apply(lambda c: c.str.strip())
+
+# CLEANING FUNC ------------------------------------------------------------------------------
+
+def lineupKeys(slots, nPlayers):
+    '''
+    Computes an order-invariant 64-bit key per lineup from its CPT id and sorted FLEX ids.
+    Slates with up to 1024 players are packed exactly (10 bits per slot), larger ones are hashed.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    nPlayers (int): Number of players in the player dictionary
+
+            Returns:
+                    keys (numpy array): uint64 key of each lineup
+    '''
+
+    ids = np.hstack([slots[:,:1], np.sort(slots[:,1:], axis=1)]).astype(np.uint64)
+    bits = max(int(nPlayers - 1).bit_length(), 1)
+
+    if 6 * bits <= 64:
+        keys = np.zeros(len(ids), dtype=np.uint64)
+        for i in range(6):
+            keys = (keys << np.uint64(bits)) | ids[:,i]
+
+        return keys
+
+    # FNV-1a over the six ids
+    keys = np.full(len(ids), 14695981039346656037, dtype=np.uint64)
+    for i in range(6):
+        keys = (keys ^ ids[:,i]) * np.uint64(1099511628211)
+
+    return keys
+
+def sortPlayers(ids):
+    '''
+    Sorts a grown name to id dictionary.
+
+            Returns:
+                    players (list): Sorted player dictionary
+                    remap (numpy array): New id of each old id
+    '''
+
+    players = sorted(ids)
+    dtype = np.int16 if len(players) <= np.iinfo(np.int16).max else np.int32
+    remap = np.zeros(max(len(ids), 1), dtype=dtype)
+    remap[list(ids.values())] = pd.Index(players).get_indexer(list(ids.keys()))
+
+    return players, remap
+
+def cleanData(df, malformed=None, side=None):
+    '''
+    Cleans a raw DraftKings NFL Showdown contest CSV.
+
+            Parameters:
+                    df (pandas DataFrame): Raw DraftKings NFL Showdown contest
+                    malformed (list): Collects each lineup that couldn't be parsed (and was skipped), None to only log them
+                    side (list): Collects the player side table, see sideTable, None to skip it
+
+            Returns:
+                    df (pandas DataFrame): Cleaned DraftKings NFL Showdown contest, one compact row per lineup
+                    userTable (pandas DataFrame): Per-user aggregates, row i is the user with code i
+                    players (list): Player dictionary, a player's id is its position in the list
+                    slots (numpy array): N x 6 matrix of player ids (CPT, FLEX1-5), one row per lineup in df
+    '''
+
+    # the player dictionary is the Player column, lineups naming anyone else are reported as malformed
+    ids = {name:i for i, name in enumerate(pd.unique(normalizeNames(df['Player'].dropna())))}
+
+    if side is not None:
+        side.append(sideTable(df))
+
+    df = df[['EntryName', 'Lineup']].dropna()
+
+    slots, bad = tokenizeLineups(df['Lineup'], ids)
+    reportMalformed(bad, df['EntryName'], malformed)
+
+    keep = (slots >= 0).all(axis=1)
+    df = df[keep]
+
+    players, remap = sortPlayers(ids)
+    slots = remap[slots[keep]]
+
+    users, userNames = pd.factorize(df['EntryName'].str.split(' ').str[0])
+
+    entries = (df['EntryName']
+    .str.extract(r"\((.*?)\)", expand=False)
+    .str.split('/').str[1]
+    .fillna(1)
+    .astype(int)
+    .to_numpy())
+
+    userEntries = np.zeros(len(userNames), dtype=int)
+    np.maximum.at(userEntries, users, entries)
+
+    df, userTable = assembleContest(slots, users, list(userNames), userEntries, players)
+
+    return df, userTable, players, slots
+
+# STREAMING INGESTION FUNCS --------------------------------------------------------------------
+
+def encodeNames(values, ids):
+    '''
+    Encodes names as integer ids, adding unseen names to the dictionary.
+
+            Parameters:
+                    values (pandas Series): Names to encode
+                    ids (dict): Name to id dictionary, grown in place
+
+            Returns:
+                    codes (numpy array): Integer id of each name
+    '''
+
+    for name in pd.unique(values):
+        ids.setdefault(name, len(ids))
+
+    return values.map(ids).to_numpy()
+
+def assembleContest(slots, users, userNames, userEntries, players):
+    '''
+    Builds the cleaned contest from encoded lineups. Rows only hold the user code,
+    lineup key and dupe counts; per-user aggregates go to a separate table and
+    display strings are left to displayLineups.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    users (numpy array): User id of each lineup
+                    userNames (list): User dictionary
+                    userEntries (numpy array): Max entries of each user id
+                    players (list): Player dictionary
+
+            Returns:
+                    df (pandas DataFrame): user (categorical), lineup_key, unique and dupes per lineup
+                    userTable (pandas DataFrame): user, user_entries, user_uniques, <10_dupes and unique% per user
+    '''
+
+    keys = lineupKeys(slots, len(players))
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+
+    dupes = counts[inverse.ravel()].astype(np.int32)
+    unique = (dupes == 1).astype(np.int8)
+
+    df = pd.DataFrame({
+        'user':pd.Categorical.from_codes(users, userNames),
+        'lineup_key':keys,
+        'unique':unique,
+        'dupes':dupes
+    })
+
+    userTable = pd.DataFrame({
+        'user':userNames,
+        'user_entries':np.asarray(userEntries, dtype=int),
+        'user_uniques':np.bincount(users, weights=unique, minlength=len(userNames)).astype(int),
+        '<10_dupes':np.bincount(users, weights=dupes < 10, minlength=len(userNames)).astype(int)
+    })
+
+    userTable['unique%'] = round((userTable['user_uniques'] / userTable['user_entries']) * 100,2)
+
+    return df, userTable
+
+def displayLineups(frame, slots, players):
+    '''
+    Adds FLEX and CPT display strings to a slice of the cleaned contest.
+    Strings are only built for the rows passed in.
+
+            Parameters:
+                    frame (pandas DataFrame): Rows of the cleaned contest, still indexed by row position
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    frame (pandas DataFrame): Copy of frame with FLEX and CPT columns
+    '''
+
+    names = np.array(players, dtype=object)
+    ids = slots[frame.index.to_numpy()]
+
+    flex = names[ids[:,1]]
+    for i in range(2, 6):
+        flex = flex + ', ' + names[ids[:,i]]
+
+    frame = frame.copy()
+    frame['FLEX'] = flex
+    frame['CPT'] = names[ids[:,0]]
+
+    return frame
+
+def contestBytes(df, userTable, players, slots):
+    '''
+    Memory held by a cleaned contest.
+
+            Returns:
+                    sizes (dict): Bytes of the row frame (without the user names), user names,
+                    slot matrix, user table and player dictionary, the row frame plus slot matrix
+                    per entry (see TARGET_BYTES_PER_ENTRY) and the user names plus user table
+                    per user (see TARGET_BYTES_PER_USER)
+    '''
+
+    # a categorical's deep size is its codes plus its categories, so the names are split out
+    userNames = int(df['user'].cat.categories.memory_usage(deep=True))
+
+    sizes = {
+    'frame':int(df.memory_usage(index=True, deep=True).sum()) - userNames,
+    'user_names':userNames,
+    'slots':int(slots.nbytes),
+    'user_table':int(userTable.memory_usage(index=True, deep=True).sum()),
+    'players':int(sum(sys.getsizeof(i) for i in players))
+    }
+
+    sizes['total'] = sum(sizes.values())
+    sizes['per_entry'] = (sizes['frame'] + sizes['slots']) / max(len(df), 1)
+    sizes['per_user'] = (sizes['user_names'] + sizes['user_table']) / max(len(userTable), 1)
+
+    return sizes
+
+def streamContest(file, chunksize=STREAM_CHUNKSIZE, malformed=None, side=None):
+    '''
+    Cleans a raw DraftKings NFL Showdown contest CSV chunk by chunk,
+    so peak memory is bounded by the chunk size rather than the contest size.
+
+            Parameters:
+                    file (str or file-like): Raw DraftKings NFL Showdown contest CSV, or the zip it is exported in
+                    chunksize (int): Rows read per chunk
+                    malformed (list): Collects each lineup that couldn't be parsed, as in cleanData
+                    side (list): Collects the player side table, as in cleanData
+
+            Returns:
+                    (df, userTable, players, slots) as returned by cleanData
+    '''
+
+    playerIds, userIds = {}, {}
+    userEntries = np.zeros(0, dtype=int)
+    slotChunks, userChunks, sideChunks = [], [], []
+
+    cols = ['EntryName', 'Lineup'] + (PLAYER_COLUMNS if side is not None else ['Player'])
+    stream = openExport(file)
+
+    for chunk in pd.read_csv(stream, usecols=cols, dtype=dict.fromkeys(cols, str), chunksize=chunksize):
+        # the player/ownership side table runs alongside the first rows of the lineup block,
+        # well within the first chunk, so players are known before their lineups are tokenized
+        for name in pd.unique(normalizeNames(chunk['Player'].dropna())):
+            playerIds.setdefault(name, len(playerIds))
+
+        if side is not None and chunk['Player'].notna().any():
+            sideChunks.append(sideTable(chunk))
+
+        chunk = chunk.dropna(subset=['EntryName', 'Lineup'])
+
+        if chunk.empty:
+            continue
+
+        slots, bad = tokenizeLineups(chunk['Lineup'], playerIds)
+        reportMalformed(bad, chunk['EntryName'], malformed)
+
+        keep = (slots >= 0).all(axis=1)
+        chunk = chunk[keep]
+        slotChunks.append(slots[keep])
+
+        users = encodeNames(chunk['EntryName'].str.split(' ').str[0], userIds)
+        userChunks.append(users)
+
+        entries = (chunk['EntryName']
+        .str.extract(r"\((.*?)\)", expand=False)
+        .str.split('/').str[1]
+        .fillna(1)
+        .astype(int)
+        .to_numpy())
+
+        if len(userIds) > len(userEntries):
+            userEntries = np.concatenate([userEntries, np.zeros(len(userIds) - len(userEntries), dtype=int)])
+        np.maximum.at(userEntries, users, entries)
+
+    if stream is not file:
+        stream.close()
+
+    if side is not None:
+        sideChunks.append(sideTable(pd.DataFrame(columns=PLAYER_COLUMNS)))
+        side.append(pd.concat(sideChunks, ignore_index=True))
+
+    # re-number players so ids follow the sorted dictionary cleanData uses
+    players, remap = sortPlayers(playerIds)
+
+    slots = remap[np.concatenate(slotChunks)] if slotChunks else np.zeros((0, 6), dtype=remap.dtype)
+    users = np.concatenate(userChunks) if userChunks else np.zeros(0, dtype=int)
+
+    df, userTable = assembleContest(slots, users, list(userIds), userEntries, players)
+
+    return df, userTable, players, slots
@@ -0,0 +1,125 @@
+'''
+Serialization of analysis tables and the encoded lineup matrix to CSV, Parquet and Arrow IPC.
+Parquet and Arrow need pyarrow; without it only CSV is offered.
+'''
+
+import io
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# file extension and mime type of each export format
+EXPORT_FORMATS = {
+    'csv':{'extension':'csv', 'mime':'text/csv'},
+    'parquet':{'extension':'parquet', 'mime':'application/vnd.apache.parquet'},
+    'arrow':{'extension':'arrow', 'mime':'application/vnd.apache.arrow.file'}
+}
+
+# EXPORT TABLE FUNCS ------------------------------------------------------------------------------
+
+def getlineupMatrix(df, slots):
+    '''
+    The encoded lineups as a flat table: the user and the 6 player ids of every
+    entry (CPT first), with its dupes and unique flag.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+
+            Returns:
+                    lineupMatrix (pandas DataFrame): user, CPT, FLEX1-FLEX5, dupes and unique per row
+    '''
+
+    lineupMatrix = pd.DataFrame({'user':df['user'].reset_index(drop=True)})
+
+    for j, slot in enumerate(['CPT', 'FLEX1', 'FLEX2', 'FLEX3', 'FLEX4', 'FLEX5']):
+        lineupMatrix[slot] = slots[:,j]
+
+    lineupMatrix['dupes'] = df['dupes'].to_numpy()
+    lineupMatrix['unique'] = df['unique'].to_numpy()
+
+    return lineupMatrix
+
+def getplayerTable(players):
+    '''
+    The player dictionary as a table, to decode the ids of getlineupMatrix.
+    '''
+
+    return pd.DataFrame({'id':range(len(players)), 'Player':players})
+
+# SERIALIZATION FUNCS ------------------------------------------------------------------------------
+
+def exportFormats():
+    '''
+    Export formats available with the installed packages.
+    '''
+
+    return ['csv'] + (['parquet', 'arrow'] if pa is not None else [])
+
+def tableBytes(table, fmt='csv'):
+    '''
+    Serializes a table. Labelled indexes (e.g. a heatmap's rows) become columns.
+
+            Parameters:
+                    table (pandas DataFrame or dict): Table to serialize, dicts of columns as returned by
+                    getfieldExposure are accepted
+                    fmt (str): 'csv', 'parquet' or 'arrow' (an uncompressed Arrow IPC file, which
+                    readers can memory-map without copying)
+
+            Returns:
+                    data (bytes): The serialized table
+    '''
+
+    if fmt not in exportFormats():
+        raise ValueError(f'unsupported export format: {fmt}' + ('' if fmt not in EXPORT_FORMATS else ' (needs pyarrow)'))
+
+    table = pd.DataFrame(table)
+
+    if not isinstance(table.index, pd.RangeIndex) or table.index.name is not None:
+        table = table.reset_index()
+
+    if fmt == 'csv':
+        return table.to_csv(index=False).encode('utf-8')
+
+    arrowTable = pa.Table.from_pandas(table, preserve_index=False)
+    sink = io.BytesIO()
+
+    if fmt == 'parquet':
+        pq.write_table(arrowTable, sink)
+    else:
+        with pa.ipc.new_file(sink, arrowTable.schema) as writer:
+            writer.write_table(arrowTable)
+
+    return sink.getvalue()
+
+def readExport(path, fmt=None):
+    '''
+    Reads an exported table back. Arrow files are memory-mapped, so their
+    columns are read without copying them into memory.
+
+            Parameters:
+                    path (str): Exported file
+                    fmt (str): 'csv', 'parquet' or 'arrow', None to go by the extension
+
+            Returns:
+                    table (pandas DataFrame or pyarrow Table): pandas for CSV and Parquet,
+                    a memory-mapped pyarrow Table for Arrow
+    '''
+
+    fmt = fmt or path.rsplit('.', 1)[-1]
+
+    if fmt == 'csv':
+        return pd.read_csv(path)
+
+    if pa is None:
+        raise ValueError(f'reading {fmt} exports needs pyarrow')
+
+    if fmt == 'parquet':
+        return pq.read_table(path).to_pandas()
+
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
@@ -0,0 +1,146 @@
+'''
+Player exposures (roster rates) for the field, users and every user at once.
+'''
+
+import numpy as np
+import pandas as pd
+
+# EXPOSURE FUNCS ------------------------------------------------------------------------------
+
+def slotCounts(slots, nPlayers):
+    '''
+    Counts how many lineups roster each player at CPT and at FLEX.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    nPlayers (int): Number of players in the player dictionary
+
+            Returns:
+                    cpt (numpy array): CPT count per player id
+                    flex (numpy array): FLEX count per player id
+    '''
+
+    cpt = np.bincount(slots[:,0], minlength=nPlayers)
+    flex = np.bincount(slots[:,1:].ravel(), minlength=nPlayers)
+
+    return cpt, flex
+
+def getfieldExposure(slots, players):
+    '''
+    Calculates the roster rate of each player 
+    on the slate for the entire field.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    exps (dict): Dictionary of player 
+                    roster rates for the entire field
+    '''
+
+    cpt, flex = slotCounts(slots, len(players))
+
+    exps = {
+    'Player':players,
+    'CPT':list(cpt / max(len(slots),1) * 100),
+    'FLEX':list(flex / max(len(slots),1) * 100)
+    }
+
+    return exps
+
+def getuserExposureMatrix(df, slots, players):
+    '''
+    Counts how many lineups each user rostered each player in,
+    at CPT and at FLEX, with a single group-by over the encoded lineups.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    userMatrix (dict): users (pandas Index), lineups per user,
+                    and users x players CPT and FLEX count planes
+    '''
+
+    users, userNames = pd.factorize(df['user'])
+    nUsers, nPlayers = len(userNames), len(players)
+
+    # entries are capped at 150 per user, so counts fit comfortably in uint16
+    cpt = np.bincount(users * nPlayers + slots[:,0], minlength=nUsers * nPlayers)
+    flex = np.bincount((users[:,None] * nPlayers + slots[:,1:]).ravel(), minlength=nUsers * nPlayers)
+
+    userMatrix = {
+    'users':pd.Index(userNames),
+    'lineups':np.bincount(users, minlength=nUsers),
+    'CPT':cpt.reshape(nUsers, nPlayers).astype(np.uint16),
+    'FLEX':flex.reshape(nUsers, nPlayers).astype(np.uint16)
+    }
+
+    return userMatrix
+
+def getuserExposure(user, userMatrix, players):
+    '''
+    Calculates the roster rate of each player 
+    on the slate for a given user.
+
+            Parameters:
+                    user (str): String of the user to be analyzed
+                    userMatrix (dict): Output of getuserExposureMatrix
+                    players (list): Player dictionary
+
+            Returns:
+                    userExps (dict): Dictionary of player 
+                    roster rates for the given user
+    '''
+
+    i = userMatrix['users'].get_loc(user)
+    lineups = userMatrix['lineups'][i]
+
+    userExps = {
+    'Player':players,
+    f'{user}_FLEX':list(userMatrix['FLEX'][i] / lineups * 100),
+    f'{user}_CPT':list(userMatrix['CPT'][i] / lineups * 100),
+    f'{user}_Lineups':lineups
+    }
+
+    return userExps
+
+def getfieldDistance(userMatrix, slots, players, minLineups=1):
+    '''
+    Measures how far every user's exposures are from the field's.
+    Distances are the share of a user's CPT (or FLEX) roster spots that
+    would have to change to match the field, from 0 to 100.
+
+            Parameters:
+                    userMatrix (dict): Output of getuserExposureMatrix
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+                    minLineups (int): Users with fewer lineups are left out
+
+            Returns:
+                    distances (pandas DataFrame): One row per user, most different first,
+                    empty when the contest has no lineups
+    '''
+
+    if len(slots) == 0:
+        return pd.DataFrame(columns=['User', 'Lineups', 'CPT_Diff', 'FLEX_Diff', 'Diff'])
+
+    cpt, flex = slotCounts(slots, len(players))
+    lineups = userMatrix['lineups']
+    keep = lineups >= minLineups
+
+    userCPT = userMatrix['CPT'][keep] / lineups[keep,None] * 100
+    userFLEX = userMatrix['FLEX'][keep] / lineups[keep,None] * 100
+
+    distances = pd.DataFrame({
+        'User':userMatrix['users'][keep],
+        'Lineups':lineups[keep],
+        'CPT_Diff':np.abs(userCPT - cpt / len(slots) * 100).sum(axis=1) / 2,
+        'FLEX_Diff':np.abs(userFLEX - flex / len(slots) * 100).sum(axis=1) / 10
+    })
+
+    distances['Diff'] = (distances['CPT_Diff'] + distances['FLEX_Diff']) / 2
+
+    return distances.sort_values('Diff', ascending=False).reset_index(drop=True)
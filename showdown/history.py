@@ -0,0 +1,355 @@
+'''
+Local multi-slate history: cleaned contests appended to an SQLite store and
+queried across slates.
+
+    python -m showdown history --add contests/*.csv
+    python -m showdown history --user bigecg26 --player "Najee Harris" --slot CPT --min-rate 30
+    python -m showdown history --player "Najee Harris" --slot CPT
+'''
+
+import os
+import time
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import streamContest
+from showdown.cache import contestKey
+from showdown.exposure import getuserExposureMatrix
+from showdown.instrument import stage
+
+# the history store, one file shared by the dashboard and the command line
+HISTORY_PATH = os.environ.get('SHOWDOWN_HISTORY', 'showdown_history.db')
+
+# slot codes stored for CPT and FLEX
+SLOT_CODES = {'CPT':0, 'FLEX':1}
+
+# lineups are stored once per user with their entries, as global player ids with the FLEX sorted;
+# exposures are stored as counts so a rate is one indexed lookup plus a division
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS slates (
+    slate_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    key TEXT UNIQUE,
+    added REAL,
+    entries INTEGER,
+    users INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (player_id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS lineups (
+    slate_id INTEGER, user_id INTEGER,
+    cpt INTEGER, flex1 INTEGER, flex2 INTEGER, flex3 INTEGER, flex4 INTEGER, flex5 INTEGER,
+    entries INTEGER, dupes INTEGER
+);
+CREATE INDEX IF NOT EXISTS lineups_user ON lineups (user_id, slate_id);
+CREATE INDEX IF NOT EXISTS lineups_slate ON lineups (slate_id, cpt);
+CREATE TABLE IF NOT EXISTS user_slates (
+    user_id INTEGER, slate_id INTEGER, entries INTEGER, uniques INTEGER,
+    PRIMARY KEY (user_id, slate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS user_slates_slate ON user_slates (slate_id);
+CREATE TABLE IF NOT EXISTS user_exposures (
+    user_id INTEGER, player_id INTEGER, slot INTEGER, slate_id INTEGER, lineups INTEGER,
+    PRIMARY KEY (user_id, player_id, slot, slate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS user_exposures_player ON user_exposures (player_id, slot, slate_id);
+CREATE TABLE IF NOT EXISTS field_exposures (
+    player_id INTEGER, slot INTEGER, slate_id INTEGER, lineups INTEGER,
+    PRIMARY KEY (player_id, slot, slate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS field_exposures_slate ON field_exposures (slate_id);
+'''
+
+# HISTORY STORE FUNCS ------------------------------------------------------------------------------
+
+def openHistory(path=HISTORY_PATH):
+    '''
+    Opens (creating if needed) the history store.
+
+            Parameters:
+                    path (str): SQLite file
+
+            Returns:
+                    conn (sqlite3 Connection): Connection to the store
+    '''
+
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+
+    return conn
+
+def storeNames(conn, table, names):
+    '''
+    Global ids of player or user names, adding the names the store hasn't seen.
+
+            Parameters:
+                    conn (sqlite3 Connection): Output of openHistory
+                    table (str): 'players' or 'users'
+                    names (list): Names to encode
+
+            Returns:
+                    ids (numpy array): Global id of each name
+    '''
+
+    column = 'player_id' if table == 'players' else 'user_id'
+    names = [str(i) for i in names]
+
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS new_names (name TEXT)')
+    conn.execute('DELETE FROM temp.new_names')
+    conn.executemany('INSERT INTO temp.new_names VALUES (?)', [(i,) for i in names])
+    conn.execute(f'INSERT OR IGNORE INTO {table} (name) SELECT name FROM temp.new_names')
+
+    known = pd.read_sql_query(f'SELECT name, {column} FROM {table} WHERE name IN (SELECT name FROM temp.new_names)', conn)
+
+    return known.set_index('name')[column].reindex(names).to_numpy(dtype=np.int64)
+
+def appendContest(conn, name, key, df, userTable, players, slots):
+    '''
+    Appends a cleaned contest to the history store. A contest already in the
+    store (same fingerprint) isn't appended again.
+
+            Parameters:
+                    conn (sqlite3 Connection): Output of openHistory
+                    name (str): Slate name, e.g. the export's file name
+                    key (str): Contest fingerprint from contestKey
+                    df, userTable, players, slots: Cleaned contest, as returned by cleanData
+
+            Returns:
+                    slate (int): The slate's id in the store
+    '''
+
+    found = conn.execute('SELECT slate_id FROM slates WHERE key = ?', (key,)).fetchone()
+    if found is not None:
+        return found[0]
+
+    with conn:
+        playerIds = storeNames(conn, 'players', players)
+
+        userMatrix = getuserExposureMatrix(df, slots, players)
+        userIds = storeNames(conn, 'users', userMatrix['users'])
+
+        slate = conn.execute('INSERT INTO slates (name, key, added, entries, users) VALUES (?, ?, ?, ?, ?)',
+                             (name, key, time.time(), len(df), len(userIds))).lastrowid
+
+        # distinct lineups of each user, with the entries they used on it
+        users = pd.Index(userMatrix['users']).get_indexer(df['user'])
+        lineupCodes, distinct = pd.factorize(df['lineup_key'])
+        _, first, entries = np.unique(users.astype(np.int64) * len(distinct) + lineupCodes,
+                                      return_index=True, return_counts=True)
+
+        ids = playerIds[slots[first]]
+        ids[:,1:] = np.sort(ids[:,1:], axis=1)
+
+        conn.executemany('INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', zip(
+            [slate] * len(first), userIds[users[first]].tolist(), *ids.T.tolist(),
+            entries.tolist(), df['dupes'].to_numpy()[first].tolist()))
+
+        uniques = userTable.set_index('user')['user_uniques'].reindex(userMatrix['users']).fillna(0).astype(int)
+
+        conn.executemany('INSERT INTO user_slates VALUES (?, ?, ?, ?)', zip(
+            userIds.tolist(), [slate] * len(userIds), userMatrix['lineups'].tolist(), uniques.tolist()))
+
+        for slot, code in SLOT_CODES.items():
+            user, player = np.nonzero(userMatrix[slot])
+
+            conn.executemany('INSERT INTO user_exposures VALUES (?, ?, ?, ?, ?)', zip(
+                userIds[user].tolist(), playerIds[player].tolist(), [code] * len(user), [slate] * len(user),
+                userMatrix[slot][user, player].tolist()))
+
+            field = userMatrix[slot].sum(axis=0, dtype=np.int64)
+            player = np.flatnonzero(field)
+
+            conn.executemany('INSERT INTO field_exposures VALUES (?, ?, ?, ?)', zip(
+                playerIds[player].tolist(), [code] * len(player), [slate] * len(player), field[player].tolist()))
+
+    return slate
+
+def removeSlate(conn, slate):
+    '''
+    Deletes a slate and everything stored for it.
+    '''
+
+    with conn:
+        for table in ['lineups', 'user_slates', 'user_exposures', 'field_exposures', 'slates']:
+            conn.execute(f'DELETE FROM {table} WHERE slate_id = ?', (slate,))
+
+def addContests(conn, paths):
+    '''
+    Cleans contest exports with streaming ingestion and appends them to the store, in order.
+
+            Parameters:
+                    conn (sqlite3 Connection): Output of openHistory
+                    paths (list): Paths to raw DraftKings NFL Showdown contest CSVs (or zips)
+
+            Returns:
+                    slates (list): Slate id of each contest
+    '''
+
+    slates = []
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            key = contestKey(f)
+
+        with stage('history append') as record:
+            df, userTable, players, slots = streamContest(path)
+            slates.append(appendContest(conn, os.path.splitext(os.path.basename(path))[0], key,
+                                        df, userTable, players, slots))
+            record['rows'] = len(df)
+
+    return slates
+
+# HISTORY QUERY FUNCS ------------------------------------------------------------------------------
+
+def getslates(conn):
+    '''
+    The slates in the store, in the order they were added.
+
+            Returns:
+                    slates (pandas DataFrame): slate_id, name, key, added, entries and users
+    '''
+
+    return pd.read_sql_query('SELECT * FROM slates ORDER BY slate_id', conn)
+
+def getuserHistory(conn, user):
+    '''
+    A user's entries and uniques on every slate they played.
+
+            Parameters:
+                    conn (sqlite3 Connection): Output of openHistory
+                    user (str): User name
+
+            Returns:
+                    history (pandas DataFrame): slate, entries, uniques and unique%, by slate
+    '''
+
+    history = pd.read_sql_query('''
+        SELECT s.name AS slate, us.entries, us.uniques, ROUND(us.uniques * 100.0 / us.entries, 2) AS "unique%"
+        FROM user_slates us
+        JOIN users u ON u.user_id = us.user_id
+        JOIN slates s ON s.slate_id = us.slate_id
+        WHERE u.name = ?
+        ORDER BY us.slate_id''', conn, params=(user,))
+
+    return history
+
+def getexposureHistory(conn, player=None, slot=None, user=None, minRate=0):
+    '''
+    Roster rates across slates, of one user or of the field, e.g. every slate where a
+    user was over 30% on a player at CPT.
+
+            Parameters:
+                    conn (sqlite3 Connection): Output of openHistory
+                    player (str): Only this player, None for every player
+                    slot (str): 'CPT' or 'FLEX', None for both
+                    user (str): Rates of this user, None for the field
+                    minRate (float): Only rates of at least this many percent
+
+            Returns:
+                    history (pandas DataFrame): slate, Player, slot, lineups and rate (%), by slate
+    '''
+
+    if user is None:
+        source = '''field_exposures e JOIN slates s ON s.slate_id = e.slate_id'''
+        entries = 's.entries'
+        where, params = [], []
+    else:
+        source = '''user_exposures e
+        JOIN user_slates us ON us.user_id = e.user_id AND us.slate_id = e.slate_id
+        JOIN slates s ON s.slate_id = e.slate_id'''
+        entries = 'us.entries'
+        where, params = ['e.user_id = (SELECT user_id FROM users WHERE name = ?)'], [user]
+
+    if player is not None:
+        where.append('e.player_id = (SELECT player_id FROM players WHERE name = ?)')
+        params.append(player)
+
+    if slot is not None:
+        where.append('e.slot = ?')
+        params.append(SLOT_CODES[slot])
+
+    if minRate:
+        where.append(f'e.lineups * 100.0 / {entries} >= ?')
+        params.append(minRate)
+
+    history = pd.read_sql_query(f'''
+        SELECT s.name AS slate, p.name AS Player, CASE e.slot WHEN 0 THEN 'CPT' ELSE 'FLEX' END AS slot,
+               e.lineups, ROUND(e.lineups * 100.0 / {entries}, 2) AS rate
+        FROM {source}
+        JOIN players p ON p.player_id = e.player_id
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY e.slate_id, e.slot, rate DESC''', conn, params=params)
+
+    return history
+
+def getuserSeasonExposure(conn, user, slates=None):
+    '''
+    Calculates the roster rate of each player across the given slates
+    for a given user, like getuserExposure for a single slate.
+
+            Parameters:
+                    conn (sqlite3 Connection): Output of openHistory
+                    user (str): String of the user to be analyzed
+                    slates (list): Slate ids, None for every slate
+
+            Returns:
+                    userExps (dict): Dictionary of player
+                    roster rates for the given user
+    '''
+
+    scope = '' if slates is None else f'AND e.slate_id IN ({", ".join("?" * len(slates))})'
+    params = [user] + list(slates or [])
+
+    lineups = conn.execute(f'''
+        SELECT COALESCE(SUM(e.entries), 0) FROM user_slates e
+        WHERE e.user_id = (SELECT user_id FROM users WHERE name = ?) {scope}''', params).fetchone()[0]
+
+    counts = pd.read_sql_query(f'''
+        SELECT p.name AS Player, e.slot, SUM(e.lineups) AS lineups
+        FROM user_exposures e JOIN players p ON p.player_id = e.player_id
+        WHERE e.user_id = (SELECT user_id FROM users WHERE name = ?) {scope}
+        GROUP BY p.name, e.slot''', conn, params=params)
+
+    counts = counts.pivot(index='Player', columns='slot', values='lineups').reindex(columns=[0, 1]).fillna(0)
+
+    userExps = {
+    'Player':list(counts.index),
+    f'{user}_FLEX':list(counts[1] / max(lineups, 1) * 100),
+    f'{user}_CPT':list(counts[0] / max(lineups, 1) * 100),
+    f'{user}_Lineups':lineups
+    }
+
+    return userExps
+
+# COMMAND LINE FUNCS ------------------------------------------------------------------------------
+
+def addArguments(parser):
+    parser.add_argument('--db', default=HISTORY_PATH, help='History store (SQLite file)')
+    parser.add_argument('--add', nargs='+', metavar='CONTEST', help='Contest CSVs (or zips) to append, in slate order')
+    parser.add_argument('--user', help='Rates of this user rather than the field')
+    parser.add_argument('--player', help='Only this player')
+    parser.add_argument('--slot', choices=list(SLOT_CODES), help='Only this slot')
+    parser.add_argument('--min-rate', type=float, default=0, help='Only rates of at least this many percent')
+
+def run(args, parser):
+    conn = openHistory(args.db)
+
+    try:
+        if args.add:
+            for path, slate in zip(args.add, addContests(conn, args.add)):
+                print(f'{path}: slate {slate}')
+
+        elif args.user and not (args.player or args.slot or args.min_rate):
+            print(getuserHistory(conn, args.user).to_string(index=False))
+
+        elif args.user or args.player:
+            print(getexposureHistory(conn, args.player, args.slot, args.user, args.min_rate).to_string(index=False))
+
+        else:
+            print(getslates(conn).to_string(index=False))
+    finally:
+        conn.close()
@@ -0,0 +1,178 @@
+'''
+Opt-in wall time, peak memory and row count instrumentation of pipeline stages.
+'''
+
+import json
+import time
+import uuid
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# structured log of finished profiles, one JSON object per stage
+LOGGER = logging.getLogger('showdown.profile')
+
+# the profile being recorded by each thread (each dashboard session runs in its own thread)
+_active = threading.local()
+
+# tracemalloc is process-wide, so concurrent profiles share one tracing session
+_tracing = {'users':0, 'lock':threading.Lock()}
+
+# PROFILE FUNCS ------------------------------------------------------------------------------
+
+def startProfile(memory=True, **context):
+    '''
+    Starts recording stages on the current thread.
+
+            Parameters:
+                    memory (bool): Also trace peak memory, which slows allocation-heavy stages
+                    **context: Fields added to every logged stage, e.g. the contest fingerprint
+
+            Returns:
+                    profile (dict): id, start time, context and the recorded stages
+    '''
+
+    profile = {'id':uuid.uuid4().hex, 'started':time.time(), 'memory':memory,
+               'context':context, 'stages':[], 'open':[]}
+
+    if memory:
+        with _tracing['lock']:
+            if _tracing['users'] == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _tracing['users'] += 1
+
+    _active.profile = profile
+
+    return profile
+
+def stopProfile():
+    '''
+    Stops recording on the current thread.
+
+            Returns:
+                    profile (dict): The finished profile, None if none was recording
+    '''
+
+    profile = getattr(_active, 'profile', None)
+    _active.profile = None
+
+    if profile is not None and profile['memory']:
+        with _tracing['lock']:
+            _tracing['users'] -= 1
+            if _tracing['users'] == 0:
+                tracemalloc.stop()
+
+    return profile
+
+def startStage(name, rows=None):
+    '''
+    Opens a stage of the current thread's profile. Stages nest.
+
+            Parameters:
+                    name (str): Stage name
+                    rows (int): Rows the stage processes, if known up front
+
+            Returns:
+                    record (dict): The stage's record, set record['rows'] before endStage
+                    if the row count is only known afterwards
+    '''
+
+    profile = getattr(_active, 'profile', None)
+    record = {'stage':name, 'rows':rows}
+
+    if profile is None:
+        return record
+
+    record['depth'] = len(profile['open'])
+
+    if profile['memory'] and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+
+        # keep the enclosing stage's peak before resetting it for this one
+        if profile['open']:
+            profile['open'][-1]['_peak'] = max(profile['open'][-1]['_peak'], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+        record['_base'] = current
+        record['_peak'] = current
+
+    # stages are listed in the order they start
+    profile['open'].append(record)
+    profile['stages'].append(record)
+    record['_start'] = time.perf_counter()
+
+    return record
+
+def endStage(record):
+    '''
+    Closes a stage opened by startStage, recording its wall time and peak memory.
+    '''
+
+    profile = getattr(_active, 'profile', None)
+
+    if profile is None or '_start' not in record:
+        return
+
+    record['seconds'] = time.perf_counter() - record.pop('_start')
+
+    if '_base' in record:
+        peak = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0)
+        record['peak_mb'] = max(peak - record.pop('_base'), 0) / 1e6
+
+        if len(profile['open']) > 1:
+            profile['open'][-2]['_peak'] = max(profile['open'][-2]['_peak'], peak)
+
+    profile['open'].remove(record)
+
+@contextmanager
+def stage(name, rows=None):
+    '''
+    Records the enclosed block as a stage of the current thread's profile.
+    Does nothing when no profile is recording.
+    '''
+
+    record = startStage(name, rows)
+
+    try:
+        yield record
+    finally:
+        endStage(record)
+
+def profileTable(profile):
+    '''
+    Recorded stages in the order they started.
+
+            Returns:
+                    table (pandas DataFrame): Stage (indented by nesting), Seconds, Peak MB and Rows
+    '''
+
+    stages = profile['stages']
+
+    table = pd.DataFrame({
+        'Stage':['  ' * i['depth'] + i['stage'] for i in stages],
+        'Seconds':[i.get('seconds') for i in stages],
+        'Peak MB':[i.get('peak_mb') for i in stages],
+        'Rows':[i['rows'] for i in stages]
+    })
+
+    return table
+
+def profileJson(profile):
+    '''
+    A finished profile as a JSON document.
+    '''
+
+    return json.dumps({i:profile[i] for i in ['id', 'started', 'memory', 'context', 'stages']}, indent=2, default=str)
+
+def logProfile(profile, logger=LOGGER):
+    '''
+    Emits one structured (JSON) log line per stage, tagged with the profile id and context,
+    for aggregating across sessions.
+    '''
+
+    for record in profile['stages']:
+        logger.info(json.dumps({'profile':profile['id'], **profile['context'], **record}, default=str))
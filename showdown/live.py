@@ -0,0 +1,347 @@
+'''
+Incremental updates of a live contest from repeated exports.
+'''
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import lineupKeys, cleanData, sideTable, tokenizeLineups, reportMalformed
+
+# LIVE CONTEST FUNCS ------------------------------------------------------------------------------
+
+def entryRows(data):
+    '''
+    Rows of a raw export that cleanData keeps (entries with a user and a lineup).
+    '''
+
+    return data.dropna(subset=['EntryName', 'Lineup'])
+
+def parseEntries(rows):
+    '''
+    User names and max entries of raw export rows, parsed as cleanData does.
+
+            Returns:
+                    users (numpy array): User name of each row
+                    entries (numpy array): Max entries of each row's user
+    '''
+
+    users = rows['EntryName'].str.split(' ').str[0].to_numpy()
+
+    entries = (rows['EntryName']
+    .str.extract(r"\((.*?)\)", expand=False)
+    .str.split('/').str[1]
+    .fillna(1)
+    .astype(int)
+    .to_numpy())
+
+    return users, entries
+
+def startLive(data):
+    '''
+    Cleans a first live export and sets up the state that later exports are diffed against.
+
+            Parameters:
+                    data (pandas DataFrame): Raw DraftKings NFL Showdown contest
+
+            Returns:
+                    state (dict): Encoded lineups, lineup-key counts, per-user counters,
+                    exposure counts, current points/ranks and their history, the latest
+                    player side table, the malformed lineups cleanData skipped and the raw
+                    lineup of each EntryId reported as malformed, and a version bumped
+                    whenever lineups change
+    '''
+
+    malformed, side = [], []
+    df, userTable, players, slots = cleanData(data, malformed, side)
+    rows = entryRows(data).drop(index=[i['row'] for i in malformed])
+
+    users = np.array(df['user'].cat.codes, dtype=int)
+    userNames = userTable['user']
+    userEntries = np.array(userTable['user_entries'])
+
+    keys = np.array(df['lineup_key'])
+    dupes = df['dupes'].to_numpy()
+
+    state = {
+    'players':players,
+    'slots':slots,
+    'keys':keys,
+    'users':users,
+    'userIds':pd.Index(userNames),
+    'userEntries':userEntries,
+    'entryIds':pd.Index(rows['EntryId'].to_numpy()),
+    'lineups':np.array(rows['Lineup'], dtype=object),
+    'keyCounts':pd.Series(keys).value_counts(),
+    'userUniques':np.bincount(users, weights=dupes == 1, minlength=len(userNames)).astype(int),
+    'userU10':np.bincount(users, weights=dupes < 10, minlength=len(userNames)).astype(int),
+    'CPT':np.bincount(slots[:,0], minlength=len(players)),
+    'FLEX':np.bincount(slots[:,1:].ravel(), minlength=len(players)),
+    'points':np.array(rows['Points'], dtype=float),
+    'rank':np.array(rows['Rank'], dtype=float),
+    'prevRank':np.array(rows['Rank'], dtype=float),
+    'timeRemaining':np.array(rows['TimeRemaining'], dtype=float),
+    'refreshes':0,
+    'history':[pd.DataFrame({'refresh':0, 'EntryId':rows['EntryId'].to_numpy(),
+                             'Points':rows['Points'].to_numpy(), 'Rank':rows['Rank'].to_numpy()})],
+    'df':(df, userTable),
+    'side':side[0],
+    'malformed':malformed,
+    'reported':dict(zip(entryRows(data).loc[[i['row'] for i in malformed], 'EntryId'], [i['Lineup'] for i in malformed])),
+    'version':0
+    }
+
+    return state
+
+def sameContest(state, data, sample=100):
+    '''
+    Whether an export is a re-export of the live contest, judged by its EntryIds.
+    '''
+
+    ids = data['EntryId'].dropna().to_numpy()[:sample]
+
+    return len(ids) > 0 and (state['entryIds'].get_indexer(ids) >= 0).mean() > .5
+
+def userCounts(state, mask, sign):
+    '''
+    Adds (sign=1) or removes (sign=-1) the unique and <10 dupes contributions of the masked rows.
+    '''
+
+    counts = state['keyCounts'].reindex(state['keys'][mask]).to_numpy()
+    users = state['users'][mask]
+
+    np.add.at(state['userUniques'], users, sign * (counts == 1))
+    np.add.at(state['userU10'], users, sign * (counts < 10))
+
+def applyLineups(state, rows, slots, users, entries, entryIds, lineups):
+    '''
+    Applies changed and new lineups to the lineup-key counts, per-user counters and exposure counts.
+
+            Parameters:
+                    state (dict): Output of startLive
+                    rows (numpy array): State row of each changed lineup, -1 for new entries
+                    slots (numpy array): N x 6 matrix of player ids of each lineup
+                    users (numpy array): User name of each lineup
+                    entries (numpy array): Max entries of each lineup's user
+                    entryIds (numpy array): EntryId of each lineup
+                    lineups (numpy array): Raw lineup strings
+    '''
+
+    slots = slots.astype(state['slots'].dtype)
+    keys = lineupKeys(slots, len(state['players']))
+
+    new = rows < 0
+    affected = np.union1d(state['keys'][rows[~new]], keys)
+
+    # take the affected keys' rows out of the per-user counters before their counts change
+    userCounts(state, np.isin(state['keys'], affected), -1)
+
+    old = state['slots'][rows[~new]]
+    np.subtract.at(state['CPT'], old[:,0], 1)
+    np.subtract.at(state['FLEX'], old[:,1:].ravel(), 1)
+    np.add.at(state['CPT'], slots[:,0], 1)
+    np.add.at(state['FLEX'], slots[:,1:].ravel(), 1)
+
+    counts = state['keyCounts']
+    counts = counts.sub(pd.Series(state['keys'][rows[~new]]).value_counts(), fill_value=0)
+    counts = counts.add(pd.Series(keys).value_counts(), fill_value=0)
+    state['keyCounts'] = counts[counts > 0].astype(int)
+
+    # changed lineups are overwritten in place, new entries are appended
+    state['slots'][rows[~new]] = slots[~new]
+    state['keys'][rows[~new]] = keys[~new]
+    state['lineups'][rows[~new]] = lineups[~new]
+
+    if new.any():
+        userIds = state['userIds'].append(pd.Index(pd.unique(users[new])).difference(state['userIds']))
+        state['userEntries'] = np.concatenate([state['userEntries'], np.zeros(len(userIds) - len(state['userIds']), dtype=int)])
+        state['userUniques'] = np.concatenate([state['userUniques'], np.zeros(len(userIds) - len(state['userIds']), dtype=int)])
+        state['userU10'] = np.concatenate([state['userU10'], np.zeros(len(userIds) - len(state['userIds']), dtype=int)])
+        state['userIds'] = userIds
+
+        newUsers = userIds.get_indexer(users[new])
+        np.maximum.at(state['userEntries'], newUsers, entries[new])
+
+        state['slots'] = np.concatenate([state['slots'], slots[new]])
+        state['keys'] = np.concatenate([state['keys'], keys[new]])
+        state['users'] = np.concatenate([state['users'], newUsers])
+        state['lineups'] = np.concatenate([state['lineups'], lineups[new]])
+        state['entryIds'] = state['entryIds'].append(pd.Index(entryIds[new]))
+
+        for i in ['points', 'rank', 'prevRank', 'timeRemaining']:
+            state[i] = np.concatenate([state[i], np.full(new.sum(), np.nan)])
+
+    userCounts(state, np.isin(state['keys'], affected), 1)
+
+    state['df'] = None
+    state['version'] += 1
+
+def updateLive(state, data):
+    '''
+    Diffs a new export against the live state by EntryId and applies only what changed.
+    Refreshes that only move points and ranks touch just the changed entries and the side table;
+    changed or new lineups update the dupe, unique and exposure counters by delta.
+    Changed lineups that can't be parsed (including ones naming a player outside the
+    dictionary, which would shift every key) are added to the malformed lineups and the
+    entry keeps its last lineup; new entries that can't be parsed are skipped. Either is
+    reported once, and skipped on later refreshes while its lineup stays the same.
+
+            Parameters:
+                    state (dict): Output of startLive, updated in place
+                    data (pandas DataFrame): Raw DraftKings NFL Showdown contest
+
+            Returns:
+                    changed (dict): Number of entries whose score and whose lineup changed, and new entries
+    '''
+
+    rows = entryRows(data)
+    ids = rows['EntryId'].to_numpy()
+    pos = state['entryIds'].get_indexer(ids)
+    known = pos >= 0
+
+    lineups = np.array(rows['Lineup'], dtype=object)
+    lineupChanged = ~known
+    lineupChanged[known] = lineups[known] != state['lineups'][pos[known]]
+
+    # lineups already reported as malformed are not parsed (or reported) again
+    reported = state['reported']
+    if reported and lineupChanged.any():
+        changedRows = np.flatnonzero(lineupChanged)
+        lineupChanged[changedRows] = [reported.get(ids[i]) != lineups[i] for i in changedRows]
+
+    if lineupChanged.any():
+        playerIds = dict(zip(state['players'], range(len(state['players']))))
+        slots, bad = tokenizeLineups(rows['Lineup'][lineupChanged], playerIds)
+        reportMalformed(bad, rows['EntryName'], state['malformed'])
+
+        valid = (slots >= 0).all(axis=1)
+        changedRows = np.flatnonzero(lineupChanged)
+
+        for i in ids[changedRows[valid]]:
+            reported.pop(i, None)
+        reported.update(zip(ids[changedRows[~valid]], lineups[changedRows[~valid]]))
+
+        # known entries keep their last lineup and their score updates
+        lineupChanged[changedRows[~valid]] = False
+        slots = slots[valid]
+
+    # new entries that couldn't be parsed are dropped
+    keep = known | lineupChanged
+    rows, ids, pos, known = rows[keep], ids[keep], pos[keep], known[keep]
+    lineups, lineupChanged = lineups[keep], lineupChanged[keep]
+
+    changed = {'scores':0, 'lineups':int(lineupChanged[known].sum()), 'new':int((~known).sum())}
+
+    if lineupChanged.any():
+        users, entries = parseEntries(rows[lineupChanged])
+        applyLineups(state, np.where(known, pos, -1)[lineupChanged], slots, users, entries,
+                     ids[lineupChanged], lineups[lineupChanged])
+        pos = state['entryIds'].get_indexer(ids)
+
+    points = rows['Points'].to_numpy(dtype=float)
+    rank = rows['Rank'].to_numpy(dtype=float)
+    moved = (points != state['points'][pos]) | (rank != state['rank'][pos])
+    moved = np.flatnonzero(moved)
+
+    state['refreshes'] += 1
+    state['side'] = sideTable(data)
+    state['prevRank'][pos[moved]] = state['rank'][pos[moved]]
+    state['points'][pos[moved]] = points[moved]
+    state['rank'][pos[moved]] = rank[moved]
+    state['timeRemaining'][pos[moved]] = rows['TimeRemaining'].to_numpy(dtype=float)[moved]
+
+    state['history'].append(pd.DataFrame({'refresh':state['refreshes'], 'EntryId':ids[moved],
+                                          'Points':points[moved], 'Rank':rank[moved]}))
+
+    changed['scores'] = len(moved)
+
+    return changed
+
+def liveContest(state):
+    '''
+    The live contest as (df, userTable, players, slots), as returned by cleanData.
+    After lineups have changed the frames are rebuilt from the maintained
+    lineup-key counts and per-user counters, without recounting the field.
+    '''
+
+    if state['df'] is None:
+        dupes = state['keyCounts'].reindex(state['keys']).to_numpy().astype(np.int32)
+        userNames = list(state['userIds'])
+
+        # copies, since later refreshes overwrite changed lineups in place
+        df = pd.DataFrame({
+            'user':pd.Categorical.from_codes(state['users'].copy(), userNames),
+            'lineup_key':state['keys'].copy(),
+            'unique':(dupes == 1).astype(np.int8),
+            'dupes':dupes
+        })
+
+        userTable = pd.DataFrame({
+            'user':userNames,
+            'user_entries':state['userEntries'].astype(int),
+            'user_uniques':state['userUniques'].astype(int),
+            '<10_dupes':state['userU10'].astype(int)
+        })
+
+        userTable['unique%'] = round((userTable['user_uniques'] / userTable['user_entries']) * 100,2)
+
+        state['df'] = (df, userTable)
+
+    return state['df'] + (state['players'], state['slots'])
+
+def liveExposure(state):
+    '''
+    Field roster rates from the incrementally maintained exposure counts,
+    in the same format as getfieldExposure.
+    '''
+
+    n = max(len(state['slots']), 1)
+
+    exps = {
+    'Player':state['players'],
+    'CPT':list(state['CPT'] / n * 100),
+    'FLEX':list(state['FLEX'] / n * 100)
+    }
+
+    return exps
+
+def liveStandings(state, n=25):
+    '''
+    The current top n entries with their rank movement since each entry's previous update.
+
+            Returns:
+                    standings (pandas DataFrame): EntryId, user, points, rank and movement
+    '''
+
+    rank = np.nan_to_num(state['rank'], nan=np.inf)
+    top = np.argpartition(rank, min(n, len(rank)) - 1)[:n] if len(rank) > n else np.arange(len(rank))
+
+    standings = pd.DataFrame({
+        'EntryId':state['entryIds'][top],
+        'User':state['userIds'][state['users'][top]],
+        'Points':state['points'][top],
+        'Rank':state['rank'][top],
+        'Move':state['prevRank'][top] - state['rank'][top],
+        'TimeRemaining':state['timeRemaining'][top]
+    })
+
+    return standings.sort_values('Rank').reset_index(drop=True)
+
+def liveUserHistory(state, user):
+    '''
+    Best rank and points of a user's entries at every refresh.
+
+            Returns:
+                    history (pandas DataFrame): One row per refresh, best Rank and max Points
+    '''
+
+    entries = state['entryIds'][state['users'] == state['userIds'].get_loc(user)]
+    history = pd.concat(state['history'], ignore_index=True)
+    history = history.loc[history['EntryId'].isin(entries)]
+
+    # carry each entry's last score forward through refreshes where it didn't move
+    wide = (history
+    .pivot_table(index='refresh', columns='EntryId', values=['Rank','Points'])
+    .reindex(range(state['refreshes'] + 1))
+    .ffill())
+
+    return pd.DataFrame({'Rank':wide['Rank'].min(axis=1), 'Points':wide['Points'].max(axis=1)})
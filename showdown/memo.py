@@ -0,0 +1,174 @@
+'''
+Bounded in-memory LRU cache of analysis results, keyed by contest fingerprint and small parameters.
+'''
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# memory budget of the process-wide result cache
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('SHOWDOWN_RESULT_CACHE_MB', 512)) * 1024 * 1024
+
+# RESULT CACHE FUNCS ------------------------------------------------------------------------------
+
+def newCache(maxBytes=RESULT_CACHE_MAX_BYTES):
+    '''
+    Creates an empty result cache.
+
+            Parameters:
+                    maxBytes (int): Memory budget, least recently used results are evicted past it
+
+            Returns:
+                    cache (dict): Entries in LRU order, their sizes, the results being computed,
+                    the budget and hit/miss/eviction counters
+    '''
+
+    cache = {
+    'entries':OrderedDict(),
+    'pending':{},
+    'sizes':{},
+    'bytes':0,
+    'maxBytes':maxBytes,
+    'hits':0,
+    'misses':0,
+    'evictions':0,
+    'lock':threading.Lock()
+    }
+
+    return cache
+
+def sizeOf(value):
+    '''
+    Approximate memory held by a result, in bytes.
+    '''
+
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+
+    if isinstance(value, dict):
+        # a result cache referenced by a result accounts for its own entries
+        if 'entries' in value and 'lock' in value:
+            return 0
+        return sys.getsizeof(value) + sum(sizeOf(i) for i in value.values())
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeOf(i) for i in value)
+
+    # a chart holds the table it plots
+    if isinstance(getattr(value, 'data', None), pd.DataFrame):
+        return sys.getsizeof(value) + sizeOf(value.data)
+
+    return sys.getsizeof(value)
+
+def cachePut(cache, key, value):
+    '''
+    Stores a result as most recently used, then evicts least recently used
+    results until the cache is within budget. Results larger than the whole
+    budget are not stored.
+    '''
+
+    size = sizeOf(value)
+
+    with cache['lock']:
+        if key in cache['entries']:
+            cache['bytes'] -= cache['sizes'].pop(key)
+            del cache['entries'][key]
+
+        if size > cache['maxBytes']:
+            return
+
+        cache['entries'][key] = value
+        cache['sizes'][key] = size
+        cache['bytes'] += size
+
+        while cache['bytes'] > cache['maxBytes']:
+            old, _ = cache['entries'].popitem(last=False)
+            cache['bytes'] -= cache['sizes'].pop(old)
+            cache['evictions'] += 1
+
+def memoize(cache, key, func, *args):
+    '''
+    Cached result of func(*args) under key, computing and storing it on a miss.
+
+            Parameters:
+                    cache (dict): Output of newCache
+                    key (tuple): Contest fingerprint plus the small parameters the result depends on
+                    func (function): Computes the result
+                    *args: Arguments of func, not hashed
+
+            Returns:
+                    value: The result
+    '''
+
+    while True:
+        with cache['lock']:
+            if key in cache['entries']:
+                cache['entries'].move_to_end(key)
+                cache['hits'] += 1
+                return cache['entries'][key]
+
+            # single flight: a thread already computing the key is waited for, not repeated
+            pending = cache['pending'].get(key)
+            if pending is None:
+                cache['misses'] += 1
+                pending = cache['pending'][key] = {'done':threading.Event(), 'value':None, 'error':None}
+                break
+
+        pending['done'].wait()
+
+        if pending['error'] is not None:
+            raise pending['error']
+
+        # the result may have been too large to keep, the computing thread hands it over anyway
+        if pending['value'] is not None:
+            with cache['lock']:
+                cache['hits'] += 1
+            return pending['value']
+
+    try:
+        value = pending['value'] = func(*args)
+        cachePut(cache, key, value)
+    except Exception as e:
+        pending['error'] = e
+        raise
+    finally:
+        with cache['lock']:
+            del cache['pending'][key]
+        pending['done'].set()
+
+    return value
+
+def cacheGet(cache, key, default=None):
+    '''
+    A cached result without computing it on a miss. Doesn't count as a hit or miss.
+    '''
+
+    with cache['lock']:
+        return cache['entries'].get(key, default)
+
+def cacheStats(cache):
+    '''
+    Counters and memory use of a result cache.
+
+            Returns:
+                    stats (dict): entries, bytes, maxBytes, hits, misses and evictions
+    '''
+
+    with cache['lock']:
+        stats = {i:cache[i] for i in ['bytes', 'maxBytes', 'hits', 'misses', 'evictions']}
+        stats['entries'] = len(cache['entries'])
+
+    return stats
+
+# process-wide cache shared by every dashboard session
+RESULTS = newCache()
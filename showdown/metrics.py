@@ -0,0 +1,264 @@
+'''
+Registry of derived contest tables, computed on first access and memoized per contest.
+'''
+
+import time
+
+import pandas as pd
+
+from showdown.memo import memoize, cacheGet
+from showdown.instrument import stage
+from showdown.exposure import getfieldExposure, getuserExposureMatrix
+from showdown.combos import getcomboIndex, getbitmapIndex
+from showdown.analysis import getexposureTable, getleaders, getchalk, getpairCounts
+from showdown.ownership import playerStats, getlineupMetrics, getuserMetrics
+from showdown.neardupes import getnearIndex, getnearMetrics, getnearClusters, getportfolioOverlap
+from showdown.simulate import getsimResults, getsimLineups, getsimUsers
+from showdown.export import getlineupMatrix, getplayerTable, tableBytes
+
+# inputs every contest is opened with
+BASE_INPUTS = ('df', 'userTable', 'players', 'slots', 'side', 'malformed')
+
+# metric name -> dependencies (inputs or other metrics) and the function computing it from them
+METRICS = {}
+
+# METRIC REGISTRY FUNCS ------------------------------------------------------------------------------
+
+def registerMetric(name, deps, func):
+    '''
+    Adds a derived table to the registry.
+
+            Parameters:
+                    name (str): Metric name
+                    deps (list): Names of the inputs or metrics it is computed from
+                    func (function): Called with the dependencies' values, in order
+    '''
+
+    unknown = [i for i in deps if i not in BASE_INPUTS and i not in METRICS]
+    if unknown:
+        raise ValueError(f'{name} depends on unregistered metrics: {unknown}')
+
+    METRICS[name] = {'deps':tuple(deps), 'func':func}
+
+def lineupFrame(df, lineupMetrics):
+    '''
+    The cleaned contest with each lineup's ownership, points and leverage alongside.
+    '''
+
+    return df.assign(**{i:lineupMetrics[i].to_numpy() for i in lineupMetrics})
+
+registerMetric('fieldExposure', ['slots', 'players'], getfieldExposure)
+registerMetric('exposureTable', ['slots', 'players', 'fieldExposure'],
+               lambda slots, players, exps: getexposureTable(slots, players, exps=exps))
+registerMetric('leaders', ['userTable'], getleaders)
+registerMetric('userMatrix', ['df', 'slots', 'players'], getuserExposureMatrix)
+registerMetric('comboIndex', ['df', 'slots', 'players'], getcomboIndex)
+registerMetric('bitmapIndex', ['df', 'slots', 'players'], getbitmapIndex)
+registerMetric('pairCounts', ['slots', 'players'], getpairCounts)
+registerMetric('playerStats', ['side', 'players'], playerStats)
+registerMetric('lineupMetrics', ['slots', 'playerStats'], getlineupMetrics)
+registerMetric('lineupFrame', ['df', 'lineupMetrics'], lineupFrame)
+registerMetric('userMetrics', ['df', 'lineupMetrics'], getuserMetrics)
+registerMetric('chalk', ['lineupFrame', 'slots', 'players'], getchalk)
+registerMetric('nearIndex', ['df', 'slots', 'players'], getnearIndex)
+registerMetric('nearMetrics', ['nearIndex'], getnearMetrics)
+registerMetric('nearClusters', ['df', 'nearIndex', 'players'], getnearClusters)
+registerMetric('portfolioOverlap', ['df', 'nearIndex'], getportfolioOverlap)
+registerMetric('simResults', ['df', 'slots', 'playerStats'], getsimResults)
+registerMetric('simLineups', ['simResults'], getsimLineups)
+registerMetric('simUsers', ['df', 'simResults'], getsimUsers)
+registerMetric('lineupMatrix', ['df', 'slots'], getlineupMatrix)
+registerMetric('playerTable', ['players'], getplayerTable)
+
+def openContest(df, userTable, players, slots, side=None, key=None, cache=None, malformed=None, known=None):
+    '''
+    Wraps a cleaned contest so its derived tables are computed lazily.
+
+            Parameters:
+                    df, userTable, players, slots: Cleaned contest, as returned by cleanData
+                    side (pandas DataFrame): Player side table captured while cleaning, see showdown.contest.sideTable,
+                    None for a contest without one (its player stats then raise)
+                    key (tuple): Contest fingerprint, required with a cache
+                    cache (dict): Result cache from showdown.memo.newCache to memoize metrics in,
+                    None to memoize them on the contest itself
+                    malformed (list): Lineups skipped while cleaning, as collected by cleanData
+                    known (dict): Metric values already maintained elsewhere (e.g. a live contest's
+                    exposure counts), used instead of computing them
+
+            Returns:
+                    contest (dict): Inputs and materialized values by name, the seconds
+                    each metric took, and the fingerprint and result cache
+    '''
+
+    contest = {
+    'values':{'df':df, 'userTable':userTable, 'players':players, 'slots':slots, 'side':side,
+              'malformed':malformed or [], **(known or {})},
+    'seconds':{},
+    'key':key,
+    'cache':cache
+    }
+
+    return contest
+
+def computeMetric(contest, name):
+    '''
+    Computes a metric from its dependencies, recording how long it took.
+    '''
+
+    deps = [getMetric(contest, i) for i in METRICS[name]['deps']]
+
+    with stage(f'metric {name}', len(contest['values']['df'])):
+        start = time.perf_counter()
+        value = METRICS[name]['func'](*deps)
+        contest['seconds'][name] = time.perf_counter() - start
+
+    return value
+
+def getMetric(contest, name):
+    '''
+    Value of a metric, computing it and any missing dependencies on first access.
+
+            Parameters:
+                    contest (dict): Output of openContest
+                    name (str): Input or registered metric name
+
+            Returns:
+                    value: The metric, memoized in the contest or its result cache
+    '''
+
+    values = contest['values']
+
+    if name in values:
+        return values[name]
+
+    if name not in METRICS:
+        raise ValueError(f'unknown metric: {name}')
+
+    if contest['cache'] is not None:
+        return memoize(contest['cache'], contest['key'] + (name,), computeMetric, contest, name)
+
+    values[name] = computeMetric(contest, name)
+
+    return values[name]
+
+def peekMetric(contest, name):
+    '''
+    Value of a metric if it has already been materialized (e.g. by a background job), else None.
+    '''
+
+    values = contest['values']
+
+    if name in values:
+        return values[name]
+
+    if contest['cache'] is not None:
+        return cacheGet(contest['cache'], contest['key'] + (name,))
+
+    return None
+
+def dependsOn(name, inputs):
+    '''
+    Whether a metric is computed, directly or through its dependencies, from any of inputs.
+    '''
+
+    if name in inputs:
+        return True
+
+    return name in METRICS and any(dependsOn(i, inputs) for i in METRICS[name]['deps'])
+
+def carryMetrics(old, new, changed):
+    '''
+    Hands the metrics old has already materialized to new, a contest whose inputs
+    only differ in changed (e.g. a live refresh that only moved scores).
+
+            Parameters:
+                    old (dict): Output of openContest
+                    new (dict): Output of openContest, updated in place
+                    changed (list): Names of the inputs that differ
+    '''
+
+    for name in METRICS:
+        if name not in new['values'] and not dependsOn(name, changed):
+            value = peekMetric(old, name)
+            if value is not None:
+                new['values'][name] = value
+
+def getResult(contest, key, func, *args):
+    '''
+    A parameterized result (a user's lineups, a comparison, a heatmap threshold)
+    memoized under the contest fingerprint plus key.
+
+            Parameters:
+                    contest (dict): Output of openContest
+                    key (tuple): Result name and the small parameters it depends on
+                    func (function): Computes the result
+                    *args: Arguments of func
+
+            Returns:
+                    value: The result
+    '''
+
+    if contest['cache'] is None:
+        return func(*args)
+
+    return memoize(contest['cache'], contest['key'] + tuple(key), func, *args)
+
+def peekResult(contest, key):
+    '''
+    A parameterized result if it has already been computed, else None.
+    '''
+
+    if contest['cache'] is None:
+        return None
+
+    return cacheGet(contest['cache'], contest['key'] + tuple(key))
+
+def getExport(contest, key, fmt='csv', func=None, *args):
+    '''
+    A table serialized for download, memoized under the contest fingerprint
+    so reruns and repeated downloads reuse the bytes.
+
+            Parameters:
+                    contest (dict): Output of openContest
+                    key (tuple): Metric name, or the result key of a parameterized table
+                    fmt (str): 'csv', 'parquet' or 'arrow', see showdown.export.tableBytes
+                    func (function): Computes the table, None when key names a metric
+                    *args: Arguments of func
+
+            Returns:
+                    data (bytes): The serialized table
+    '''
+
+    if func is None:
+        func, args = getMetric, (contest, key[0])
+
+    return getResult(contest, ('export', fmt) + tuple(key), lambda: tableBytes(func(*args), fmt))
+
+def metricGraph(contest=None):
+    '''
+    The registry as a table, with what a contest has materialized so far.
+
+            Parameters:
+                    contest (dict): Output of openContest, None for just the graph
+
+            Returns:
+                    graph (pandas DataFrame): Metric, Depends On, Materialized and Seconds
+    '''
+
+    def materialized(name):
+        if contest is None:
+            return False
+        if contest['cache'] is not None:
+            return contest['key'] + (name,) in contest['cache']['entries']
+        return name in contest['values']
+
+    seconds = contest['seconds'] if contest else {}
+
+    graph = pd.DataFrame({
+        'Metric':list(METRICS),
+        'Depends On':[', '.join(METRICS[i]['deps']) for i in METRICS],
+        'Materialized':[materialized(i) for i in METRICS],
+        'Seconds':[seconds.get(i) for i in METRICS]
+    })
+
+    return graph
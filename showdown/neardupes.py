@@ -0,0 +1,289 @@
+'''
+Near-duplicate lineups: lineups one or two roster swaps apart, and users whose portfolios overlap.
+'''
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from showdown.analysis import topRows
+
+# users sharing a lineup core above which the core is treated as chalk rather than a shared build
+MAX_CORE_USERS = 20
+
+# NEAR-DUPLICATE INDEX FUNCS ------------------------------------------------------------------------------
+
+def lineupTokens(slots, nPlayers):
+    '''
+    Encodes each lineup as a sorted set of 6 roster tokens, FLEX players as
+    their id and the CPT as nPlayers + id. Two lineups are k swaps apart
+    when they share 6 - k tokens (half their bitset Hamming distance).
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    nPlayers (int): Number of players in the player dictionary
+
+            Returns:
+                    tokens (numpy array): N x 6 matrix of sorted tokens
+    '''
+
+    tokens = slots.astype(np.int64)
+    tokens[:,0] += nPlayers
+
+    return np.sort(tokens, axis=1)
+
+def subsetKeys(tokens, k, nTokens):
+    '''
+    Keys every k-token subset of each lineup, so lineups sharing k tokens share a key.
+    Subsets are packed exactly when they fit in 64 bits, hashed otherwise.
+
+            Parameters:
+                    tokens (numpy array): Output of lineupTokens
+                    k (int): Subset size
+                    nTokens (int): Number of possible tokens
+
+            Returns:
+                    keys (numpy array): N x C(6, k) matrix of uint64 subset keys
+                    cols (list): Token columns of each subset
+    '''
+
+    cols = list(combinations(range(6), k))
+    bits = max(int(nTokens - 1).bit_length(), 1)
+    tokens = tokens.astype(np.uint64)
+
+    keys = np.zeros((len(tokens), len(cols)), dtype=np.uint64)
+
+    for j, subset in enumerate(cols):
+        if k * bits <= 64:
+            for i in subset:
+                keys[:,j] = (keys[:,j] << np.uint64(bits)) | tokens[:,i]
+        else:
+            # FNV-1a over the k tokens
+            keys[:,j] = np.uint64(14695981039346656037)
+            for i in subset:
+                keys[:,j] = (keys[:,j] ^ tokens[:,i]) * np.uint64(1099511628211)
+
+    return keys, cols
+
+def sortedUnique(keys):
+    '''
+    Sorted distinct values of a large integer key array, with a single sort.
+    '''
+
+    keys = np.sort(keys)
+
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+def getnearIndex(df, slots, players):
+    '''
+    Indexes the distinct lineups by every 5 and 4 token subset (their cores).
+    Lineups sharing a 5-token core are exactly one swap apart and lineups
+    sharing a 4-token core at most two, so neighbours are counted per core
+    in linear time instead of comparing every pair of lineups.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+
+            Returns:
+                    nearIndex (dict): Distinct lineup of each row, each distinct lineup's
+                    first row, tokens and entries, and its 5-token cores with their entries
+                    and distinct lineup counts
+    '''
+
+    nPlayers = len(players)
+
+    _, first, inverse, entries = np.unique(df['lineup_key'].to_numpy(), return_index=True,
+                                           return_inverse=True, return_counts=True)
+    tokens = lineupTokens(slots[first], nPlayers)
+
+    keys, cols = subsetKeys(tokens, 5, 2 * nPlayers)
+    _, coreFirst, cores, coreLineups = np.unique(keys.ravel(), return_index=True,
+                                                 return_inverse=True, return_counts=True)
+
+    nearIndex = {
+    'nPlayers':nPlayers,
+    'lineups':inverse.ravel(),
+    'first':first,
+    'tokens':tokens,
+    'entries':entries,
+    'cores':cores.ravel().reshape(keys.shape),
+    'coreCols':cols,
+    'coreFirst':coreFirst,
+    'coreLineups':coreLineups,
+    'coreEntries':np.bincount(cores.ravel(), weights=np.repeat(entries, keys.shape[1])).astype(int)
+    }
+
+    return nearIndex
+
+def getnearMetrics(nearIndex):
+    '''
+    Nearest neighbour distance of every lineup, and how many other entries sit one
+    and two swaps away.
+
+            Parameters:
+                    nearIndex (dict): Output of getnearIndex
+
+            Returns:
+                    nearMetrics (pandas DataFrame): Per row of the cleaned contest, nearest
+                    (swaps to the closest other entry, 0 for exact dupes and 3 for three or more),
+                    near1 and near2 (entries exactly one and two swaps away)
+    '''
+
+    entries = nearIndex['entries']
+
+    # a one swap neighbour shares exactly one 5-token core
+    near1 = (nearIndex['coreEntries'][nearIndex['cores']] - entries[:,None]).sum(axis=1)
+
+    # a two swap neighbour shares exactly one 4-token core, a one swap neighbour shares five
+    keys, _ = subsetKeys(nearIndex['tokens'], 4, 2 * nearIndex['nPlayers'])
+    _, cores = np.unique(keys.ravel(), return_inverse=True)
+    coreEntries = np.bincount(cores.ravel(), weights=np.repeat(entries, keys.shape[1])).astype(int)
+    near2 = (coreEntries[cores.ravel().reshape(keys.shape)] - entries[:,None]).sum(axis=1) - 5 * near1
+
+    nearest = np.select([entries > 1, near1 > 0, near2 > 0], [0, 1, 2], 3).astype(np.int8)
+
+    lineups = nearIndex['lineups']
+
+    nearMetrics = pd.DataFrame({
+        'nearest':nearest[lineups],
+        'near1':near1[lineups].astype(np.int32),
+        'near2':near2[lineups].astype(np.int32)
+    })
+
+    return nearMetrics
+
+def coreNames(nearIndex, cores, players):
+    '''
+    Display string of each 5-token core, e.g. "CPT A | FLEX B, C, D, E".
+    '''
+
+    names = np.array(players, dtype=object)
+    nPlayers = nearIndex['nPlayers']
+    nCols = len(nearIndex['coreCols'])
+
+    labels = []
+    for core in cores:
+        position = nearIndex['coreFirst'][core]
+        tokens = nearIndex['tokens'][position // nCols, list(nearIndex['coreCols'][position % nCols])]
+        cpt = [names[i - nPlayers] for i in tokens if i >= nPlayers]
+        flex = [names[i] for i in tokens if i < nPlayers]
+        labels.append(' | '.join(([f'CPT {cpt[0]}'] if cpt else ['CPT (any)']) + ['FLEX ' + ', '.join(flex)]))
+
+    return labels
+
+def getnearClusters(df, nearIndex, players, n=25):
+    '''
+    The largest near-duplicate clusters: groups of distinct lineups sharing 5 of their
+    6 roster spots, so every lineup in a cluster is one swap from every other.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    nearIndex (dict): Output of getnearIndex
+                    players (list): Player dictionary
+                    n (int): Number of clusters to return
+
+            Returns:
+                    clusters (pandas DataFrame): Core (the 5 shared spots), Lineups (distinct),
+                    Entries and Users of the n clusters with the most entries
+    '''
+
+    entries = np.where(nearIndex['coreLineups'] > 1, nearIndex['coreEntries'], 0)
+    top = topRows(entries, n)
+    top = top[entries[top] > 0]
+
+    # distinct users over the rows of each selected core (a lineup can sit in several)
+    selected = np.zeros(len(entries), dtype=bool)
+    selected[top] = True
+
+    rowCores = nearIndex['cores'][nearIndex['lineups']]
+    users = np.repeat(df['user'].cat.codes.to_numpy(), rowCores.shape[1])
+    member = selected[rowCores.ravel()]
+
+    pairs = pd.DataFrame({'core':rowCores.ravel()[member], 'user':users[member]})
+    coreUsers = pairs.drop_duplicates().groupby('core').size().reindex(top, fill_value=0).to_numpy()
+
+    clusters = pd.DataFrame({
+        'Core':coreNames(nearIndex, top, players),
+        'Lineups':nearIndex['coreLineups'][top],
+        'Entries':nearIndex['coreEntries'][top],
+        'Users':coreUsers
+    })
+
+    return clusters
+
+def getportfolioOverlap(df, nearIndex, minEntries=20, n=100, maxUsers=MAX_CORE_USERS):
+    '''
+    User-to-user portfolio overlap: the share of a user's distinct lineups with one of
+    another user's lineups at most one swap away (including identical lineups).
+    Cores played by more than maxUsers users are chalk rather than shared builds
+    and are skipped, which also bounds the work to maxUsers per lineup.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    nearIndex (dict): Output of getnearIndex
+                    minEntries (int): Only users with at least this many distinct lineups
+                    n (int): Number of user pairs to return
+                    maxUsers (int): Skip cores played by more users than this
+
+            Returns:
+                    overlap (pandas DataFrame): User, Other, Shared (user's lineups near one
+                    of other's), Lineups (user's distinct lineups) and Overlap%, most overlap first
+    '''
+
+    users = df['user'].cat.codes.to_numpy().astype(np.int64)
+    userNames = df['user'].cat.categories
+    nUsers, nDistinct = len(userNames), len(nearIndex['entries'])
+
+    # each user's distinct lineups
+    owned = sortedUnique(users * nDistinct + nearIndex['lineups'])
+    ownedUsers, ownedLineups = owned // nDistinct, owned % nDistinct
+
+    userLineups = np.bincount(ownedUsers, minlength=nUsers)
+    keep = userLineups[ownedUsers] >= minEntries
+    ownedUsers, ownedLineups = ownedUsers[keep], ownedLineups[keep]
+
+    # (user, lineup, core) triples, and the distinct users of each core sorted by core
+    nCols = nearIndex['cores'].shape[1]
+    tripleUsers = np.repeat(ownedUsers, nCols)
+    tripleLineups = np.repeat(ownedLineups, nCols)
+    tripleCores = nearIndex['cores'][ownedLineups].ravel().astype(np.int64)
+
+    coreUsers = sortedUnique(tripleCores * nUsers + tripleUsers)
+    coreOf, userOf = coreUsers // nUsers, coreUsers % nUsers
+
+    size = np.bincount(coreOf, minlength=len(nearIndex['coreLineups']))
+    start = np.concatenate([[0], np.cumsum(size)])[:-1]
+
+    shared = (size[tripleCores] > 1) & (size[tripleCores] <= maxUsers)
+    tripleUsers, tripleLineups, tripleCores = tripleUsers[shared], tripleLineups[shared], tripleCores[shared]
+
+    # pair each user's lineup with every user of its cores
+    counts = size[tripleCores]
+    expand = np.repeat(np.arange(len(tripleCores)), counts)
+    offset = np.arange(len(expand)) - np.repeat(np.cumsum(counts) - counts, counts)
+    others = userOf[start[tripleCores][expand] + offset]
+
+    mine = tripleUsers[expand]
+    other = others != mine
+
+    # count each of a user's lineups once per other user, however many cores they share
+    near = sortedUnique((mine[other] * nUsers + others[other]) * nDistinct + tripleLineups[expand][other])
+    pairs, sharedLineups = np.unique(near // nDistinct, return_counts=True)
+
+    pairUsers, pairOthers = pairs // nUsers, pairs % nUsers
+    overlapPct = sharedLineups / userLineups[pairUsers] * 100
+
+    top = np.lexsort((-sharedLineups, -overlapPct))[:n]
+
+    overlap = pd.DataFrame({
+        'User':userNames[pairUsers[top]],
+        'Other':userNames[pairOthers[top]],
+        'Shared':sharedLineups[top],
+        'Lineups':userLineups[pairUsers[top]],
+        'Overlap%':np.round(overlapPct[top], 2)
+    })
+
+    return overlap
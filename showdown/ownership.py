@@ -0,0 +1,138 @@
+'''
+Lineup ownership, points and leverage from the export's player side table.
+'''
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import PLAYER_COLUMNS, sideTable, openExport
+from showdown.exposure import slotCounts
+
+# OWNERSHIP FUNCS ------------------------------------------------------------------------------
+
+def playerStats(side, players):
+    '''
+    Joins the export's player side table onto the player dictionary.
+
+            Parameters:
+                    side (pandas DataFrame): Output of showdown.contest.sideTable, as captured at ingestion
+                    players (list): Player dictionary
+
+            Returns:
+                    stats (pandas DataFrame): One row per player id with Player and FPTS (base points,
+                    without the CPT bonus)
+    '''
+
+    if side is None:
+        raise ValueError('the contest has no player side table (clean it with side=[] and pass it to openContest)')
+
+    ids = pd.Index(players).get_indexer(side['Player'])
+    keep = ids >= 0
+
+    fpts = np.zeros(len(players))
+    fpts[ids[keep]] = side['FPTS'].to_numpy()[keep]
+
+    stats = pd.DataFrame({'Player':players, 'FPTS':fpts})
+
+    return stats
+
+def readPlayerStats(file, players, chunksize=1000):
+    '''
+    Reads only the player side table from a raw export, for a contest cleaned
+    without capturing it. The table fills the first rows, so reading stops at
+    the first chunk where it ends.
+
+            Parameters:
+                    file (str, bytes or file-like): Raw DraftKings NFL Showdown contest CSV, or the zip it is exported in.
+                    Bytes are read through a fresh buffer, so threads can read the same export at once
+                    players (list): Player dictionary
+                    chunksize (int): Rows read per chunk
+
+            Returns:
+                    stats (pandas DataFrame): Output of playerStats
+    '''
+
+    if isinstance(file, bytes):
+        file = io.BytesIO(file)
+
+    stream = openExport(file)
+
+    side = []
+    reader = pd.read_csv(stream, usecols=PLAYER_COLUMNS, dtype={'Player':str, 'Roster Position':str}, chunksize=chunksize)
+    for chunk in reader:
+        side.append(chunk)
+        if chunk['Player'].isna().any():
+            break
+
+    # closing explicitly detaches the reader from an uploaded file rather than closing it
+    reader.close()
+
+    if stream is not file:
+        stream.close()
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+    return playerStats(sideTable(pd.concat(side)), players)
+
+def getlineupMetrics(slots, stats):
+    '''
+    Ownership, points and leverage of every lineup, gathered over the slot matrix.
+    Ownership is slot specific: a player's CPT rate at CPT and FLEX rate at FLEX.
+
+            Parameters:
+                    slots (numpy array): N x 6 matrix of player ids
+                    stats (pandas DataFrame): Output of playerStats
+
+            Returns:
+                    metrics (pandas DataFrame): One row per lineup with
+                    own (cumulative ownership, %), own_prod (product of ownership fractions),
+                    fpts (lineup points, CPT at 1.5x) and leverage (points z-score minus ownership z-score)
+    '''
+
+    cpt, flex = slotCounts(slots, len(stats))
+    n = max(len(slots), 1)
+    cptOwn, flexOwn = cpt / n, flex / n
+    fpts = stats['FPTS'].to_numpy()
+
+    flexShare = flexOwn[slots[:,1:]]
+    own = (cptOwn[slots[:,0]] + flexShare.sum(axis=1)) * 100
+    points = fpts[slots[:,0]] * 1.5 + fpts[slots[:,1:]].sum(axis=1)
+
+    def zscore(x):
+        return (x - x.mean()) / (x.std() or 1)
+
+    metrics = pd.DataFrame({
+        'own':own,
+        'own_prod':cptOwn[slots[:,0]] * flexShare.prod(axis=1),
+        'fpts':points,
+        'leverage':zscore(points) - zscore(own) if len(slots) else points
+    }).astype(np.float32)
+
+    return metrics
+
+def getuserMetrics(df, metrics):
+    '''
+    Averages lineup metrics per user.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    metrics (pandas DataFrame): Output of getlineupMetrics
+
+            Returns:
+                    userMetrics (pandas DataFrame): Mean own, own_prod, fpts and leverage, and max fpts, per user
+    '''
+
+    users, userNames = pd.factorize(df['user'])
+    lineups = np.bincount(users, minlength=len(userNames))
+
+    userMetrics = pd.DataFrame({'user':userNames})
+    for i in ['own', 'own_prod', 'fpts', 'leverage']:
+        userMetrics[i] = np.bincount(users, weights=metrics[i].to_numpy(), minlength=len(userNames)) / lineups
+
+    best = np.full(len(userNames), -np.inf)
+    np.maximum.at(best, users, metrics['fpts'].to_numpy())
+    userMetrics['max_fpts'] = best
+
+    return userMetrics
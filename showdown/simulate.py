@@ -0,0 +1,261 @@
+'''
+Monte Carlo contest simulation: correlated player scores drawn around their FPTS,
+every lineup in the field scored per draw, and win, top-1% and payout equity per user.
+'''
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# simulations run by default
+SIMS = 10000
+
+# lineup scores (simulations x distinct lineups) held per chunk, bounds each worker's memory
+SIM_CHUNK_CELLS = 2 ** 22
+
+# SCORE MODEL FUNCS ------------------------------------------------------------------------------
+
+def scoreModel(stats, cv=0.6, minSd=2.0, rho=0.2, corr=None):
+    '''
+    Mean, standard deviation and correlation of each player's fantasy points.
+    By default players share one game-environment factor, so every pair is rho correlated.
+
+            Parameters:
+                    stats (pandas DataFrame): Output of playerStats, whose FPTS are base points
+                    (CPT-listed players without their 1.5x bonus)
+                    cv (float): Standard deviation as a share of FPTS
+                    minSd (float): Smallest standard deviation, for players projected near 0
+                    rho (float): Correlation of every pair of players
+                    corr (numpy array): Player x player correlation matrix, replaces rho
+
+            Returns:
+                    model (dict): mean and sd per player id, and the Cholesky factor of their correlation
+    '''
+
+    mean = stats['FPTS'].to_numpy(dtype=np.float64)
+    sd = np.maximum(np.abs(mean) * cv, minSd)
+
+    if corr is None:
+        corr = np.full((len(mean), len(mean)), rho)
+        np.fill_diagonal(corr, 1)
+
+    model = {'mean':mean, 'sd':sd, 'chol':np.linalg.cholesky(corr)}
+
+    return model
+
+def drawScores(model, n, rng):
+    '''
+    n correlated draws of every player's fantasy points.
+
+            Returns:
+                    scores (numpy array): n x players matrix of points
+    '''
+
+    z = rng.standard_normal((n, len(model['mean']))) @ model['chol'].T
+
+    return model['mean'] + z * model['sd']
+
+def payoutCurve(entries, rake=0.15, paid=0.2, minCash=1.5):
+    '''
+    A top-heavy GPP payout table in entry fees: the prize pool left after the rake,
+    minCash to every paid place and the rest decaying with finishing position.
+
+            Parameters:
+                    entries (int): Entries in the contest
+                    rake (float): Share of the entry fees kept by the site
+                    paid (float): Share of entries that cash
+                    minCash (float): Smallest prize, in entry fees
+
+            Returns:
+                    prizes (numpy array): Prize of each paid finishing position, first place first
+    '''
+
+    places = max(int(entries * paid), 1)
+    pool = entries * (1 - rake)
+    minCash = min(minCash, pool / places)
+
+    weights = 1 / np.arange(1, places + 1) ** 1.1
+
+    return minCash + (pool - minCash * places) * weights / weights.sum()
+
+# SIMULATION FUNCS ------------------------------------------------------------------------------
+
+def simulateChunk(model, n, rng, slots, entries, cumPrizes, topEntries, k):
+    '''
+    Scores n draws of every distinct lineup and tallies each one's win, top-1% and
+    payout equity per entry. Only the k best lineups of each draw, which hold every
+    entry that can finish in the money or the top 1%, are ranked.
+
+            Parameters:
+                    model (dict): Output of scoreModel
+                    n (int): Simulations in the chunk
+                    rng (numpy Generator): The chunk's random stream
+                    slots (numpy array): Distinct lineups x 6 matrix of player ids
+                    entries (numpy array): Entries of each distinct lineup
+                    cumPrizes (numpy array): Prizes won by the first i places, for every i up to the entries
+                    topEntries (int): Entries in the top 1%
+                    k (int): Distinct lineups ranked per draw
+
+            Returns:
+                    totals (numpy array): 3 x distinct lineups sums of win, top-1% and payout equity
+    '''
+
+    scores = drawScores(model, n, rng)
+
+    # batched gather over the slot matrix, CPT at 1.5x
+    points = scores[:,slots[:,0]] * 1.5
+    for j in range(1, 6):
+        points += scores[:,slots[:,j]]
+
+    top = np.argpartition(-points, k - 1, axis=1)[:,:k]
+    points = np.take_along_axis(points, top, axis=1)
+    order = np.argsort(-points, axis=1)
+    top, points = np.take_along_axis(top, order, axis=1), np.take_along_axis(points, order, axis=1)
+
+    # a lineup's dupes split the places after every higher scoring entry
+    start = entries[top]
+    size = start.copy()
+    np.cumsum(start, axis=1, out=start)
+    start -= size
+
+    # so do distinct lineups that happen to score the same
+    tied = points[:,1:] == points[:,:-1]
+    if tied.any():
+        group = np.cumsum(np.concatenate([np.ones((n, 1), dtype=bool), ~tied], axis=1).ravel()) - 1
+        first = np.flatnonzero(np.diff(group, prepend=-1))
+        size = np.add.reduceat(size.ravel(), first)[group].reshape(n, k)
+        start = start.ravel()[first][group].reshape(n, k)
+
+    # places are at least the column, so the top 1% is in the first topEntries columns
+    kTop = min(topEntries, k)
+    topShare = np.clip(topEntries - start[:,:kTop], 0, size[:,:kTop]) / size[:,:kTop]
+    payout = (cumPrizes[start + size] - cumPrizes[start]) / size
+
+    totals = np.zeros((3, len(entries)))
+    totals[0] = np.bincount(top[start == 0], weights=1 / size[start == 0], minlength=len(entries))
+    totals[1] = np.bincount(top[:,:kTop].ravel(), weights=topShare.ravel(), minlength=len(entries))
+    totals[2] = np.bincount(top.ravel(), weights=payout.ravel(), minlength=len(entries))
+
+    return totals
+
+def getsimResults(df, slots, stats, sims=SIMS, seed=0, prizes=None, workers=None, **model):
+    '''
+    Simulates the contest: each draw scores every distinct lineup in the field, in
+    chunks of simulations spread over worker threads.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    slots (numpy array): N x 6 matrix of player ids
+                    stats (pandas DataFrame): Output of playerStats
+                    sims (int): Number of simulations
+                    seed (int): Random seed, the results don't depend on the number of workers
+                    prizes (numpy array): Prize of each finishing position, in entry fees,
+                    None for payoutCurve
+                    workers (int): Threads to spread the chunks over, None for one per core
+                    **model: Arguments of scoreModel
+
+            Returns:
+                    simResults (dict): Simulations, the distinct lineup of each row, and each
+                    distinct lineup's entries and per entry win, top-1% and payout equity
+    '''
+
+    _, first, inverse, entries = np.unique(df['lineup_key'].to_numpy(), return_index=True,
+                                           return_inverse=True, return_counts=True)
+    distinct = slots[first]
+
+    if prizes is None:
+        prizes = payoutCurve(len(df))
+
+    # prizes of the first i places, flat past the last paid place
+    cumPrizes = np.zeros(len(df) + 1)
+    paid = min(len(prizes), len(df))
+    cumPrizes[1:paid + 1] = np.cumsum(prizes[:paid])
+    cumPrizes[paid + 1:] = cumPrizes[paid]
+
+    topEntries = max(int(np.ceil(len(df) * 0.01)), 1)
+    k = min(max(paid, topEntries), len(first))
+    scoreParams = scoreModel(stats, **model)
+
+    chunk = max(SIM_CHUNK_CELLS // max(len(first), 1), 1)
+    sizes = [min(chunk, sims - i) for i in range(0, sims, chunk)]
+    streams = [np.random.default_rng(i) for i in np.random.SeedSequence(seed).spawn(len(sizes))]
+
+    # numpy releases the GIL in the gathers, partitions and sorts, so threads use every core
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        totals = sum(pool.map(lambda i: simulateChunk(scoreParams, sizes[i], streams[i], distinct,
+                                                      entries, cumPrizes, topEntries, k), range(len(sizes))),
+                     np.zeros((3, len(first))))
+
+    simResults = {
+    'sims':sims,
+    'lineups':inverse.ravel(),
+    'entries':entries,
+    'win':totals[0] / sims,
+    'top1':totals[1] / sims,
+    'payout':totals[2] / sims
+    }
+
+    return simResults
+
+def getsimLineups(simResults):
+    '''
+    Simulated equity of every entry.
+
+            Parameters:
+                    simResults (dict): Output of getsimResults
+
+            Returns:
+                    simLineups (pandas DataFrame): Per row of the cleaned contest, win% and top1%
+                    (chance the entry finishes first and in the top 1%, ties split) and
+                    payout (expected prize in entry fees)
+    '''
+
+    lineups = simResults['lineups']
+
+    simLineups = pd.DataFrame({
+        'win%':simResults['win'][lineups] * 100,
+        'top1%':simResults['top1'][lineups] * 100,
+        'payout':simResults['payout'][lineups]
+    })
+
+    return simLineups
+
+def getsimUsers(df, simResults):
+    '''
+    Simulated equity of every user's entries together.
+
+            Parameters:
+                    df (pandas DataFrame): Cleaned contest
+                    simResults (dict): Output of getsimResults
+
+            Returns:
+                    simUsers (pandas DataFrame): user, entries, win% (chance one of their entries wins),
+                    top1 (expected entries in the top 1%), payout (expected prizes in entry fees)
+                    and roi%, best expected payout first
+    '''
+
+    users = df['user'].cat.codes.to_numpy()
+    nUsers = len(df['user'].cat.categories)
+    lineups = simResults['lineups']
+
+    def total(values):
+        return np.bincount(users, weights=values[lineups], minlength=nUsers)
+
+    userEntries = np.bincount(users, minlength=nUsers)
+    payout = total(simResults['payout'])
+
+    simUsers = (pd.DataFrame({
+        'user':df['user'].cat.categories,
+        'entries':userEntries,
+        'win%':total(simResults['win']) * 100,
+        'top1':total(simResults['top1']),
+        'payout':payout,
+        'roi%':(payout / np.maximum(userEntries, 1) - 1) * 100
+    })
+    .loc[lambda x: x['entries'] > 0]
+    .sort_values('payout', ascending=False, kind='stable')
+    .reset_index(drop=True))
+
+    return simUsers
@@ -0,0 +1,172 @@
+'''
+Synthetic DraftKings NFL Showdown contest exports for benchmarking.
+
+    python -m showdown generate contest.csv --entries 100000 --format FLEX
+'''
+
+import numpy as np
+import pandas as pd
+
+from showdown.contest import CONTEST_COLUMNS
+
+# entries per user and how often users enter with that many
+ENTRY_SIZES = np.array([1, 2, 3, 5, 10, 20, 50, 150])
+ENTRY_WEIGHTS = np.array([.45, .12, .10, .08, .08, .09, .04, .04])
+
+# SYNTHETIC CONTEST FUNCS ------------------------------------------------------------------------------
+
+def generateSlate(nPlayers=44, seed=0):
+    '''
+    Generates a slate of players with skewed ownership and projections.
+
+            Parameters:
+                    nPlayers (int): Number of players, including the two DSTs
+                    seed (int): Random seed
+
+            Returns:
+                    slate (pandas DataFrame): Player, CPT and FLEX ownership weights, and FPTS
+    '''
+
+    rng = np.random.default_rng(seed)
+
+    # team defenses carry a trailing space, as in real exports
+    names = [f'Player {i:02d}' for i in range(nPlayers - 2)] + ['Home ', 'Away ']
+
+    # a few studs own most of the field, then a long tail
+    flex = rng.lognormal(mean=0, sigma=1.3, size=nPlayers)
+    cpt = flex ** 1.6 * rng.uniform(.5, 1.5, size=nPlayers)
+
+    slate = pd.DataFrame({
+        'Player':names,
+        'CPT':cpt / cpt.sum(),
+        'FLEX':flex / flex.sum(),
+        'FPTS':np.round(np.sqrt(flex) * rng.gamma(2, 4, size=nPlayers), 2)
+    })
+
+    return slate
+
+def generateLineups(slate, n, rng, chunksize=100000):
+    '''
+    Draws lineups from the slate's ownership weights.
+
+            Parameters:
+                    slate (pandas DataFrame): Output of generateSlate
+                    n (int): Number of lineups
+                    rng (numpy Generator): Random generator
+                    chunksize (int): Lineups drawn per batch
+
+            Returns:
+                    slots (numpy array): n x 6 matrix of slate row ids (CPT, FLEX1-5)
+    '''
+
+    cptWeights = slate['CPT'].to_numpy()
+    logFlex = np.log(slate['FLEX'].to_numpy())
+    slots = np.empty((n, 6), dtype=np.int16)
+
+    for start in range(0, n, chunksize):
+        size = min(chunksize, n - start)
+        cpt = rng.choice(len(slate), size=size, p=cptWeights)
+
+        # Gumbel top-k draws 5 distinct FLEX players by weight, skipping the CPT
+        scores = logFlex + rng.gumbel(size=(size, len(slate)))
+        scores[np.arange(size), cpt] = -np.inf
+        flex = np.argpartition(-scores, 5, axis=1)[:,:5]
+
+        slots[start:start + size, 0] = cpt
+        slots[start:start + size, 1:] = flex
+
+    return slots
+
+def generateContest(nEntries, lineupFormat='CPT', dupeRate=.6, nPlayers=44, seed=0):
+    '''
+    Generates a raw DraftKings NFL Showdown contest export.
+
+            Parameters:
+                    nEntries (int): Number of entries
+                    lineupFormat (str): 'CPT' for CPT-first lineups, 'FLEX' for the old FLEX-first format
+                    dupeRate (float): Share of entries copying a popular lineup
+                    nPlayers (int): Number of players on the slate
+                    seed (int): Random seed
+
+            Returns:
+                    df (pandas DataFrame): Contest with the 11 export columns
+    '''
+
+    rng = np.random.default_rng(seed)
+    slate = generateSlate(nPlayers, seed)
+
+    # popular lineups are drawn again by a Zipf-like weight to produce chalk duplicates,
+    # tuned to roughly match the uniqueness and average dupes of real contests
+    pool = generateLineups(slate, max(nEntries // 5, 1), rng)
+    slots = generateLineups(slate, nEntries, rng)
+    dupes = rng.random(nEntries) < dupeRate
+    poolWeights = 1 / np.sqrt(np.arange(1, len(pool) + 1))
+    slots[dupes] = pool[rng.choice(len(pool), size=dupes.sum(), p=poolWeights / poolWeights.sum())]
+
+    # shuffle FLEX order within each lineup, as DraftKings does
+    slots[:,1:] = np.take_along_axis(slots[:,1:], rng.random((nEntries, 5)).argsort(axis=1), axis=1)
+
+    # users enter in blocks of 1 to 150 entries
+    sizes = rng.choice(ENTRY_SIZES, size=nEntries, p=ENTRY_WEIGHTS)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), nEntries) + 1]
+    sizes[-1] -= sizes.sum() - nEntries
+    users = np.repeat(np.arange(len(sizes)), sizes)
+    entry = np.arange(nEntries) - np.repeat(np.cumsum(sizes) - sizes, sizes) + 1
+    maxEntries = np.repeat(sizes, sizes)
+
+    entryName = np.array([f'user{i}' for i in range(len(sizes))], dtype=object)[users]
+    multi = maxEntries > 1
+    entryName[multi] = (entryName[multi] + ' (' + entry[multi].astype(str).astype(object) +
+                        '/' + maxEntries[multi].astype(str).astype(object) + ')')
+
+    names = slate['Player'].to_numpy(dtype=object)
+    if lineupFormat == 'CPT':
+        lineup = 'CPT ' + names[slots[:,0]]
+        for i in range(1, 6):
+            lineup = lineup + ' FLEX ' + names[slots[:,i]]
+    else:
+        lineup = 'FLEX ' + names[slots[:,1]]
+        for i in range(2, 6):
+            lineup = lineup + ' FLEX ' + names[slots[:,i]]
+        lineup = lineup + ' CPT ' + names[slots[:,0]]
+
+    fpts = slate['FPTS'].to_numpy()
+    points = np.round(fpts[slots[:,0]] * 1.5 + fpts[slots[:,1:]].sum(axis=1), 2)
+
+    df = pd.DataFrame({
+        'Rank':pd.Series(points).rank(method='min', ascending=False).astype(int),
+        'EntryId':np.arange(nEntries) + 3000000000,
+        'EntryName':entryName,
+        'TimeRemaining':0,
+        'Points':points,
+        'Lineup':lineup,
+        'Unnamed: 6':np.nan
+    })
+
+    # a handful of entries are left blank
+    df.loc[rng.random(nEntries) < .002, 'Lineup'] = np.nan
+
+    df = df.sort_values('Rank', kind='stable').reset_index(drop=True)
+
+    # the player/ownership side table runs alongside the first rows
+    drafted = (np.bincount(slots.ravel(), minlength=len(slate)) / nEntries * 100)
+    side = pd.DataFrame({
+        'Player':slate['Player'],
+        'Roster Position':'FLEX',
+        '%Drafted':[f'{i:.2f}%' for i in drafted],
+        'FPTS':slate['FPTS']
+    }).sort_values('%Drafted', key=lambda c: c.str[:-1].astype(float), ascending=False).head(nEntries)
+
+    for i in side.columns:
+        df[i] = np.nan
+        df[i] = df[i].astype(object)
+        df.loc[:len(side) - 1, i] = side[i].to_numpy()
+
+    return df[CONTEST_COLUMNS]
+
+def writeContest(df, path):
+    '''
+    Writes a generated contest as DraftKings does, with a blank 7th header.
+    '''
+
+    df.rename(columns={'Unnamed: 6':''}).to_csv(path, index=False)
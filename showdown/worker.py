@@ -0,0 +1,167 @@
+'''
+Background jobs that ingest a contest and materialize its first metrics off the
+dashboard's script thread, one shared job per contest fingerprint.
+'''
+
+import io
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from showdown.cache import readContest
+from showdown.memo import RESULTS, cachePut, cacheGet
+from showdown.metrics import openContest, getMetric
+from showdown.instrument import startProfile, stopProfile, logProfile
+
+# metrics the Slate-Wide view shows, materialized in this order after ingestion
+PRELOAD = ('exposureTable', 'leaders', 'chalk')
+
+# background threads shared by every dashboard session
+WORKERS = int(os.environ.get('SHOWDOWN_WORKERS', 2))
+
+# in-flight jobs by key, finished jobs are dropped once their result is cached
+JOBS = {}
+
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='showdown-worker')
+
+# JOB FUNCS ------------------------------------------------------------------------------
+
+def submitJob(key, stages, func, *args):
+    '''
+    Starts func(job, *args) on a worker thread, or returns the job already
+    running under key so concurrent sessions share a single one.
+
+            Parameters:
+                    key (tuple): Job key, e.g. the contest fingerprint
+                    stages (list): Names of the stages the job will report, in order
+                    func (function): Runs the job, reporting progress with setStage
+                    *args: Arguments of func
+
+            Returns:
+                    job (dict): Key, stage names, current stage, finished stages with their
+                    seconds, result, error and done flag
+    '''
+
+    with _lock:
+        if key in JOBS:
+            return JOBS[key]
+
+        job = {'key':key, 'stages':list(stages), 'stage':None, 'finished':[],
+               'started':time.time(), 'result':None, 'error':None, 'done':False}
+        JOBS[key] = job
+
+    _pool.submit(runJob, job, func, *args)
+
+    return job
+
+def runJob(job, func, *args):
+    '''
+    Runs a job on a worker thread, recording its result or error.
+    '''
+
+    try:
+        job['result'] = func(job, *args)
+    except Exception as e:
+        job['error'] = e
+    finally:
+        setStage(job, None)
+        job['done'] = True
+        with _lock:
+            JOBS.pop(job['key'], None)
+
+def setStage(job, name):
+    '''
+    Marks the job's current stage finished and starts the next one.
+    '''
+
+    now = time.perf_counter()
+
+    if job['stage'] is not None:
+        job['finished'].append((job['stage'], now - job['_start']))
+
+    job['stage'] = name
+    job['_start'] = now
+
+def jobProgress(job):
+    '''
+    Share of the job's stages that have finished, between 0 and 1.
+    '''
+
+    return 1.0 if job['done'] else len(job['finished']) / max(len(job['stages']), 1)
+
+# CONTEST JOB FUNCS ------------------------------------------------------------------------------
+
+def buildContest(job, data, streaming, key, cache, preload):
+    '''
+    Ingests a contest, publishes it to the result cache as soon as it is cleaned,
+    then materializes the preloaded metrics one by one.
+
+            Parameters:
+                    job (dict): The running job
+                    data (bytes or str): Raw export bytes (or a path)
+                    streaming (bool): Clean with streaming ingestion
+                    key (tuple): Contest fingerprint
+                    cache (dict): Result cache the contest and its metrics go to
+                    preload (list): Metrics to materialize after ingestion
+
+            Returns:
+                    contest (dict): Output of openContest
+    '''
+
+    # the job's pipeline stages are profiled on the worker thread and logged like a session's
+    job['profile'] = startProfile(memory=False, contest=key[0], job=True)
+
+    try:
+        setStage(job, 'contest')
+
+        # the worker reads its own copy, the session keeps seeking the upload on every rerun
+        malformed, side = [], []
+        contest = openContest(*readContest(io.BytesIO(data) if isinstance(data, bytes) else data, streaming,
+                              malformed=malformed, side=side), side=side[0], key=key, cache=cache, malformed=malformed)
+
+        cachePut(cache, key + ('contest',), contest)
+
+        # the contest is usable from here on, so sessions can show metrics as they land
+        job['result'] = contest
+
+        for name in preload:
+            setStage(job, name)
+            getMetric(contest, name)
+    finally:
+        logProfile(stopProfile())
+
+    return contest
+
+def submitContest(file, key, streaming=False, cache=RESULTS, preload=PRELOAD):
+    '''
+    The background job building the contest under key, joining one already
+    running. A contest that is already cached comes back as a finished job.
+
+            Parameters:
+                    file (file-like or str): Raw export upload (or path)
+                    key (tuple): Contest fingerprint
+                    streaming (bool): Clean with streaming ingestion
+                    cache (dict): Result cache the contest and its metrics go to
+                    preload (list): Metrics to materialize after ingestion
+
+            Returns:
+                    job (dict): Output of submitJob, already done when the contest was cached
+    '''
+
+    with _lock:
+        job = JOBS.get(key)
+
+    if job is not None:
+        return job
+
+    contest = cacheGet(cache, key + ('contest',))
+
+    if contest is not None:
+        return {'key':key, 'stages':['contest'] + list(preload), 'stage':None, 'finished':[],
+                'started':None, 'result':contest, 'error':None, 'done':True}
+
+    data = file if isinstance(file, str) else file.getvalue()
+
+    return submitJob(key, ['contest'] + list(preload), buildContest, data, streaming, key, cache, preload)
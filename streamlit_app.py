@@ -1,9 +1,27 @@
 # IMPORTS --------------------------------------------------------------------------------
 
+import time
+import uuid
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import altair as alt
+
+import showdown
+from showdown import (
+    CONTEST_COLUMNS, openExport, readHeader, getfieldDistance, comboKey, getcombo, lineupQuery,
+    getuserLineups, getuserSummary, getexposureComparison,
+    contestKey, displayLineups, orderRows, openContest, getMetric, peekMetric, carryMetrics, getResult, metricGraph,
+    peekResult, getExport, EXPORT_FORMATS, exportFormats, RESULTS, memoize, cacheStats
+    )
+from showdown.instrument import (
+    startProfile, stopProfile, startStage, endStage, stage, profileTable, profileJson, logProfile
+    )
+from showdown.worker import submitContest, jobProgress
+from showdown.history import openHistory, appendContest, getslates, getuserHistory, getexposureHistory
+from showdown.live import (
+    startLive, sameContest, updateLive, liveContest, liveExposure, liveStandings, liveUserHistory
+    )
 
 # OPTIONS --------------------------------------------------------------------------------
 
@@ -19,84 +37,282 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CLEANING FUNC ------------------------------------------------------------------------------
+# upload size (bytes) above which streaming ingestion is on by default
+STREAM_THRESHOLD = 50 * 1024 * 1024
+
+# rows rendered per page of a large table
+PAGE_ROWS = 100
 
-@st.cache
-def cleanData(df):
+# seconds between reruns while a background job is running
+POLL_SECONDS = 1
+
+# CHART FUNCS --------------------------------------------------------------------------
+
+def heatmapChart(m, kind):
     '''
-    Cleans a raw DraftKings NFL Showdown contest CSV.
+    Interactive heatmap of the share of lineups with each pairing.
 
             Parameters:
-                    df (pandas DataFrame): Raw DraftKings NFL Showdown contest
+                    m (pandas DataFrame): Output of showdown.corrPlot
+                    kind (str): 'CPT' for CPT x FLEX, 'FLEX' for FLEX x FLEX
 
             Returns:
-                    df (pandas DataFrame): Cleaned DraftKings NFL Showdown contest
+                    chart (altair Chart): Heatmap with a tooltip per cell
     '''
 
-    df = df.drop(['Rank', 'EntryId', 'TimeRemaining', 'Points','Unnamed: 6', 'Player', 'Roster Position', '%Drafted', 'FPTS'], axis = 1)
-
-    df['entry_new'] = df['EntryName'].str.split(' ').str[0]
-    
-    df = df.dropna()
-    
-    df['unique'] = df['Lineup'].map(df.groupby("Lineup").count()['entry_new'] == 1).astype(int)
-    
-    df['dupes'] = df.groupby('Lineup')['Lineup'].transform('count')
-    
-    df['user_entries'] = df['EntryName'].str.extract(r"\((.*?)\)", expand=False)
-    
-    df['user_entries'] = df['user_entries'].str.split('/').str[1]
-    
-    df.user_entries = df.user_entries.fillna(1)
-    
-    df['user_uniques'] = df.groupby('entry_new')['unique'].transform('sum')
-
-    df['<10_dupes'] = (df['dupes'] < 10).groupby(df['entry_new']).transform('sum')
-    
-    df = df.drop(['EntryName'], axis=1)
-
-    df['user_entries'] = df['user_entries'].astype(int)
-
-    df['unique%'] = round((df['user_uniques'] / df['user_entries']) * 100,2)
-  
-    df=df.rename(columns={'entry_new':'user','Lineup':'lineup'})
-
-    split = df.lineup.str.split('FLEX|CPT',expand=True)
-     
-    # df = (pd
-    # .merge(df, split, left_index=True, right_index=True)
-    # .rename(columns={1:'CPT', 2:'FLEX1', 3:'FLEX2', 4:'FLEX3', 5:'FLEX4', 6:'FLEX5'})
-    # .drop([0],axis=1)
-    # )
-
-    # this logic allows old contest CSV to work in the app (CPT used to be listed last)
-    if (df.lineup.str[:3] == 'CPT').all():
-        df = (pd
-        .merge(df, split, left_index=True, right_index=True)
-        .rename(columns={1:'CPT', 2:'FLEX1', 3:'FLEX2', 4:'FLEX3', 5:'FLEX4', 6:'FLEX5'})
-        .drop([0],axis=1)
-        )
+    long = (m
+    .rename_axis(index='Row', columns='Column')
+    .stack()
+    .rename('Share')
+    .reset_index())
+
+    long['Lineups%'] = (long['Share'] * 100).round(2)
+
+    chart = (alt.Chart(long)
+    .mark_rect()
+    .encode(
+        x=alt.X('Column:N', title='FLEX', sort=list(m.columns)),
+        y=alt.Y('Row:N', title=kind, sort=list(m.index)),
+        color=alt.Color('Share:Q', scale=alt.Scale(scheme='redyellowblue', reverse=True), legend=alt.Legend(format='.2f')),
+        tooltip=[alt.Tooltip('Row:N', title=kind), alt.Tooltip('Column:N', title='FLEX'), 'Lineups%:Q'])
+    .properties(height=700))
+
+    return chart
+
+# TABLE FUNCS --------------------------------------------------------------------------
+
+def exportButton(contest, key, name, export=None, label='table'):
+    '''
+    Download of a table in the export format picked in the sidebar. The file is
+    only built when asked for, then cached under the contest fingerprint, so
+    reruns and repeated downloads don't serialize it again.
+
+            Parameters:
+                    contest (dict): Output of showdown.openContest
+                    key (tuple): Metric name, or the result key of the table
+                    name (str): Widget key prefix and download file name
+                    export (function): The whole table, unstyled, None when key names a metric
+                    label (str): What the button prepares
+    '''
 
-    elif (df.lineup.str[:3] == 'FLE').all():
-        df = (pd
-        .merge(df, split, left_index=True, right_index=True)
-        .rename(columns={1:'FLEX1', 2:'FLEX2', 3:'FLEX3', 4:'FLEX4', 5:'FLEX5', 6:'CPT'})
-        .drop([0],axis=1)
+    fmt = st.session_state.get('exportFormat', 'csv')
+
+    if peekResult(contest, ('export', fmt) + tuple(key)) is None:
+        if not st.button(f'Prepare {fmt.upper()} of {label}', key=f'{name}Export'):
+            return
+
+    st.download_button(
+        label=f'Download {fmt.upper()}',
+        data=getExport(contest, key, fmt, export),
+        file_name=f'{name}.{EXPORT_FORMATS[fmt]["extension"]}',
+        mime=EXPORT_FORMATS[fmt]['mime'],
+        key=f'{name}Download'
         )
 
-    cols = ['FLEX1','FLEX2','FLEX3','FLEX4','FLEX5','CPT']
-    
-    for i in cols:
-        df[i] = df[i].str.rstrip().str.lstrip()
+def pagedTable(n, name, page, export, contest, key, **kwargs):
+    '''
+    Shows one page of a large table. Only the visible page is built and styled;
+    the whole table is only built when a download is asked for.
+
+            Parameters:
+                    n (int): Rows in the whole table
+                    name (str): Widget key prefix and download file name
+                    page (function): Styled rows [start, stop) of the table
+                    export (function): The whole table, unstyled
+                    contest (dict): Output of showdown.openContest, caches the download
+                    key (tuple): Result key of the whole table
+                    **kwargs: Passed to st.dataframe
+    '''
+
+    pages = max(-(-n // PAGE_ROWS), 1)
+
+    current = st.number_input(f'Page (of {pages})', min_value=1, max_value=pages, value=1,
+                              key=f'{name}Page') if pages > 1 else 1
+
+    start = (int(current) - 1) * PAGE_ROWS
+    stop = min(start + PAGE_ROWS, n)
+
+    st.caption(f'Rows {min(start + 1, n)}-{stop} of {n}')
+
+    st.dataframe(page(start, stop), **kwargs)
+
+    exportButton(contest, key, name, export, f'all {n} rows')
+
+def lineupTable(df_, rows, slots, players, name, contest, key):
+    '''
+    Paged table of query results, most duplicated first, with
+    display strings built only for the rows on the page.
+
+            Parameters:
+                    df_ (pandas DataFrame): Cleaned contest
+                    rows (numpy array): Row positions of the results
+                    slots (numpy array): N x 6 matrix of player ids
+                    players (list): Player dictionary
+                    name (str): Widget key prefix and download file name
+                    contest (dict): Output of showdown.openContest, caches the download
+                    key (tuple): Result key of the query
+    '''
+
+    rows = orderRows(df_, rows, 'dupes')
+    dupes = df_['dupes'].to_numpy()[rows]
+
+    def lineups(start, stop):
+        return (displayLineups(df_.iloc[rows[start:stop]], slots, players)
+        .reset_index(drop=True)
+        [['FLEX','CPT','unique','dupes']]
+        .rename(columns={'unique':'Unique','dupes':'Dupes'}))
+
+    pagedTable(len(rows), name,
+    lambda start, stop: (lineups(start, stop)
+        .style
+        .background_gradient(cmap='RdYlBu',subset='Dupes',vmin=dupes.min(initial=0),vmax=dupes.max(initial=0))
+        .set_precision(2)),
+    lambda: lineups(0, len(rows)),
+    contest, key,
+    height=1200,
+    width=1500)
+
+def readBytes(path):
+    '''
+    The raw bytes of a file.
+    '''
+
+    with open(path, 'rb') as f:
+        return f.read()
+
+# LIVE FUNCS --------------------------------------------------------------------------
+
+def getliveContest(file):
+    '''
+    Starts the session's live contest from an uploaded export, or applies
+    a fresh export of the same contest to it incrementally.
+
+            Parameters:
+                    file (file-like): Raw DraftKings NFL Showdown contest CSV
+
+            Returns:
+                    state (dict): Live contest state, see showdown.live.startLive
+    '''
+
+    key = getfingerprint(file)
+    state = st.session_state.get('live')
+
+    # reruns without a new upload leave the state alone
+    if state is None or state['upload'] != key:
+        stream = openExport(file)
+        data = pd.read_csv(stream)
+        if stream is not file:
+            stream.close()
+
+        if state is not None and sameContest(state, data):
+            st.session_state['liveChanges'] = updateLive(state, data)
+        else:
+            state = startLive(data)
+            st.session_state['liveChanges'] = None
+
+        state['upload'] = key
+        st.session_state['live'] = state
+
+    # the live state is the session's own, so its results are cached under the session
+    if 'sessionId' not in st.session_state:
+        st.session_state['sessionId'] = uuid.uuid4().hex
+
+    return state
+
+def liveMetrics(state, key):
+    '''
+    Wraps the session's live contest in the metric registry, with its field exposure
+    taken from the live counts. A refresh that only moved scores keeps every metric
+    of the previous refresh that doesn't depend on the export's scores.
+
+            Parameters:
+                    state (dict): Live contest state, see showdown.live.startLive
+                    key (tuple): Result cache key of the refresh
+
+            Returns:
+                    contest (dict): Output of showdown.openContest
+    '''
+
+    contest = openContest(*liveContest(state), side=state['side'], key=key, cache=RESULTS,
+                          malformed=state['malformed'], known={'fieldExposure':liveExposure(state)})
+
+    previous = st.session_state.get('liveContest')
+    if previous is not None and previous['version'] == state['version']:
+        carryMetrics(previous['contest'], contest, ['side'])
+
+    st.session_state['liveContest'] = {'version':state['version'], 'contest':contest}
+
+    return contest
 
-    df['FLEX'] = df.FLEX1 + ', ' + df.FLEX2 + ', ' + df.FLEX3 + ', ' + df.FLEX4 + ', ' + df.FLEX5
-        
-    df=df[
-        ['user','user_entries','user_uniques','<10_dupes',
-        'unique%','lineup','unique','dupes','FLEX','CPT']
-        ]
-    
-    return df
+# CONTEST FUNCS --------------------------------------------------------------------------
+
+def getfingerprint(file):
+    '''
+    Content key of an upload, hashed once per uploaded file rather than on every rerun.
+
+            Parameters:
+                    file (file-like): Raw DraftKings NFL Showdown contest CSV
+
+            Returns:
+                    key (str): Output of showdown.contestKey
+    '''
+
+    uploadId = getattr(file, 'id', None)
+
+    if uploadId is None or st.session_state.get('uploadId') != uploadId:
+        st.session_state['fingerprint'] = contestKey(file)
+        st.session_state['uploadId'] = uploadId
+
+    return st.session_state['fingerprint']
+
+def getcontest(file, streaming, live):
+    '''
+    The uploaded contest wrapped in the metric registry. Contests are built by a
+    background job and, with their metrics, live in the process-wide result cache
+    under the upload's fingerprint, so every session with the same export shares
+    them (and a job still running) and a view only pays for what it reads. A live
+    contest is the session's own and is cached under the session as well.
+
+            Parameters:
+                    file (file-like): Raw DraftKings NFL Showdown contest CSV
+                    streaming (bool): Clean with streaming ingestion
+                    live (bool): Go through the session's live contest
+
+            Returns:
+                    contest (dict): Output of showdown.openContest, None while the job is still reading it
+                    job (dict): The background job, see showdown.worker.submitJob (None in live mode)
+    '''
+
+    if live:
+        state = getliveContest(file)
+        key = ('live', st.session_state['sessionId'], state['upload'])
+        contest = memoize(RESULTS, key + ('contest',), liveMetrics, state, key)
+
+        return contest, None
+
+    key = (getfingerprint(file),)
+    job = st.session_state.get('job')
+
+    # the session keeps its finished job, so a contest too big for the cache isn't rebuilt every rerun
+    if job is None or job['key'] != key or job['error'] is not None:
+        job = submitContest(file, key, streaming)
+        st.session_state['job'] = job
+
+    if job['error'] is not None:
+        raise job['error']
+
+    return job['result'], job
+
+def jobMetric(contest, job, name):
+    '''
+    A metric the background job preloads, or None while it is still being computed.
+    Other metrics (and everything once the job is done) are computed on access.
+    '''
+
+    if job is None or job['done'] or name not in job['stages']:
+        return getMetric(contest, name)
+
+    return peekMetric(contest, name)
 
 # TITLE --------------------------------------------------------------------------------
 
@@ -107,96 +323,72 @@ st.markdown("---")
 # MAIN PART OF SCRIPT ------------------------------------------------------------------
 
 # file uploader
-uploaded_file = st.sidebar.file_uploader("Upload a DraftKings Showdown Contest CSV")
+uploaded_file = st.sidebar.file_uploader("Upload a DraftKings Showdown Contest CSV (or the zip it comes in)")
 
 # if a file has been uploaded
 if uploaded_file is not None:
-    data = pd.read_csv(uploaded_file)
+    streaming = st.sidebar.checkbox(
+        'Low-memory streaming ingestion',
+        value=uploaded_file.size > STREAM_THRESHOLD,
+        help='Reads the contest in chunks. Recommended for large-field contests.'
+        )
 
-    # try the following
-    try:
-        if ['Rank', 'EntryId', 'EntryName', 'TimeRemaining', 'Points', 'Lineup',
-       'Unnamed: 6', 'Player', 'Roster Position', '%Drafted', 'FPTS'] == list(data.columns):
-
-            players = list(set(data.Player.dropna()))
-
-            @st.cache
-            def getfieldExposure(df,players=players):
-                '''
-                Calculates the roster rate of each player 
-                on the slate for the entire field.
-
-                        Parameters:
-                                df (pandas DataFrame): 
-                                players (list): List of players on the slate
-
-                        Returns:
-                                exps (dict): Dictionary of player 
-                                roster rates for the entire field
-                '''
-
-                exps = {
-                'Player':players,
-                'CPT':[],
-                'FLEX':[]
-                }
-
-                for i in exps['Player']:
-                    exps['CPT'].append(
-                        (len(df.loc[df.CPT.str.contains(i)])) / len(df) * 100
-                        )
-                    exps['FLEX'].append(
-                        (len(df.loc[df.FLEX.str.contains(i)])) / len(df) * 100
-                    )
+    live = st.sidebar.checkbox(
+        'Live mode',
+        help='Upload fresh exports of the same contest during a slate to update it incrementally.'
+        )
 
-                return exps
+    diagnostics = st.sidebar.checkbox(
+        'Diagnostics',
+        help='Records wall time, peak memory and rows for each pipeline stage and view of this run.'
+        )
 
-            @st.cache
-            def getuserExposure(user, df, players=players):
-                '''
-                Calculates the roster rate of each player 
-                on the slate for a given user.
+    profile = startProfile(st.sidebar.checkbox('Trace peak memory', value=True)) if diagnostics else None
 
-                        Parameters:
-                                user (str): String of the user to be analyzed
-                                df (pandas DataFrame): 
-                                players (list): List of players on the slate
+    st.sidebar.selectbox('Export format', exportFormats(), key='exportFormat',
+                         help='Format of the table downloads. Parquet and Arrow need pyarrow installed.')
 
-                        Returns:
-                                userExps (dict): Dictionary of player 
-                                roster rates for the given user
-                '''
+    # try the following
+    try:
+        # only the header is read up front (zipped exports are decompressed just that far)
+        with stage('read header'):
+            columns = readHeader(uploaded_file)
 
-                userExps = {
-                'Player':players,
-                f'{user}_FLEX':[],
-                f'{user}_CPT':[]
-                }
+        if CONTEST_COLUMNS == columns:
 
-                userDf = df.loc[df.user==user].copy()
+            with stage('load contest'):
+                contest, job = getcontest(uploaded_file, streaming, live)
+            state = st.session_state.get('live')
 
-                for i in userExps['Player']:
-                    userExps[f'{user}_FLEX'].append(
-                        (len(userDf.loc[userDf.FLEX.str.contains(i)])) / len(userDf) * 100
-                        )
-                    userExps[f'{user}_CPT'].append(
-                        (len(userDf.loc[userDf.CPT.str.contains(i)])) / len(userDf) * 100
-                        )
-                    userExps[f'{user}_Lineups'] = len(userDf)
+            # the contest is still being read in the background, check back shortly
+            if contest is None:
+                st.progress(jobProgress(job))
+                st.caption(f'Reading the contest ({round(time.time() - job["started"])}s)...')
+                time.sleep(POLL_SECONDS)
+                st.experimental_rerun()
 
-                return userExps
+            df_, userTable, players, slots = (getMetric(contest, i) for i in ['df', 'userTable', 'players', 'slots'])
 
-            df = cleanData(data)
-            df_ = df.copy()
+            malformed = getMetric(contest, 'malformed')
+            if malformed:
+                st.warning(f'{len(malformed)} lineups could not be parsed and were left out of the analysis.')
+                with st.expander('Skipped Lineups'):
+                    st.dataframe(pd.DataFrame(malformed))
 
             select = st.sidebar.radio('Analysis',
             ('Slate-Wide Stats',
             'Individual User Stats',
             'User Exposure Comparison',
             'Player Combination Queries',
-            'Player Combination Visualizer'))
+            'Player Combination Visualizer',
+            'Lineup Queries',
+            'Near-Duplicate Lineups',
+            'Contest Simulation',
+            'Slate History') + (('Live Standings',) if live else ()))
             st.subheader(select)
 
+            view = startStage(f'view {select}', len(df_))
+
             if select == 'Slate-Wide Stats':
 
                 st.write("*If any of the dataframes are truncated, closing the sidebar may help.*")
@@ -204,78 +396,81 @@ if uploaded_file is not None:
                 col1, col2 = st.columns([1,1.5])
 
                 with col1:
-                    exposures = pd.DataFrame(getfieldExposure(df_))
-
-                    exposures['TOTAL'] = exposures['CPT'] + exposures['FLEX']
-
-                    exposures = (exposures
-                    .loc[exposures.TOTAL > .99]
-                    .round(decimals=2)
-                    .sort_values('TOTAL',ascending=False)
-                    .reset_index(drop=True))
+                    exposures = jobMetric(contest, job, 'exposureTable')
 
                     st.caption('Roster Rates (discarding blank lineups)')
 
-                    st.dataframe((exposures
-                    .style
-                    .background_gradient(cmap='RdYlBu')
-                    .set_precision(2)),
-                    width=2000,
-                    height=1000)
+                    if exposures is None:
+                        st.info('Computing roster rates...')
+                    else:
+                        st.dataframe((exposures
+                        .style
+                        .background_gradient(cmap='RdYlBu')
+                        .set_precision(2)),
+                        width=2000,
+                        height=1000)
+
+                        exportButton(contest, ('exposureTable',), 'exposures', label='roster rates')
 
                 with col2:
-                    leaders = (df_
-                    .iloc[:,:-5]
-                    .drop_duplicates(subset=['user'])
-                    .sort_values(by=['user_uniques'], ascending= False)
-                    .reset_index(drop=True)
-                    .head(25))
+                    leaders = jobMetric(contest, job, 'leaders')
 
                     st.caption('User Unique Leaders')
 
-                    st.dataframe((leaders
-                    .rename(columns={
-                        'user':'User','user_entries':'Entries','user_uniques':'Uniques',
-                        '<10_dupes':'u10Dupes','unique%':'Unique%'
-                        })
-                    .style
-                    .background_gradient(cmap='RdYlBu')
-                    .set_precision(2)),
-                    width=1500,
-                    height=1000)
+                    if leaders is None:
+                        st.info('Computing leaders...')
+                    else:
+                        st.dataframe((leaders
+                        .rename(columns={
+                            'user':'User','user_entries':'Entries','user_uniques':'Uniques',
+                            '<10_dupes':'u10Dupes','unique%':'Unique%'
+                            })
+                        .style
+                        .background_gradient(cmap='RdYlBu')
+                        .set_precision(2)),
+                        width=1500,
+                        height=1000)
 
-                chalk = (df_
-                .drop_duplicates(subset=['lineup'])
-                .sort_values(by=['dupes'], ascending= False)
-                .reset_index(drop=True)
-                .head(20))
+                        exportButton(contest, ('leaders',), 'leaders', label='leaders')
+
+                chalk = jobMetric(contest, job, 'chalk')
 
                 st.caption('Chalk Lineups')
 
-                st.dataframe((chalk[['FLEX','CPT','dupes']]
-                .rename(columns={'dupes':'Dupes'})
-                .style
-                .background_gradient(cmap='RdYlBu')),
-                height=1000,
-                width=1500)
+                if chalk is None:
+                    st.info('Computing chalk lineups...')
+                else:
+                    st.dataframe((chalk[['FLEX','CPT','dupes','own','fpts','leverage']]
+                    .rename(columns={'dupes':'Dupes','own':'Own%','fpts':'FPTS','leverage':'Leverage'})
+                    .style
+                    .background_gradient(cmap='RdYlBu')
+                    .set_precision(2)),
+                    height=1000,
+                    width=1500)
+
+                    exportButton(contest, ('chalk',), 'chalk', label='chalk lineups')
 
             elif select == 'Individual User Stats':
                 option = st.selectbox(
                 'Select a User',
-                pd.Series(sorted(df_.user.drop_duplicates()))
+                pd.Series(sorted(userTable.user))
                 )
 
-                userDf = (df_
-                .loc[df_.user==option]
-                .sort_values(by='dupes')
-                .reset_index(drop=True))
+                userDf = getResult(contest, ('userLineups', option),
+                getuserLineups, getMetric(contest, 'lineupFrame'), slots, players, option)
+                summary = getuserSummary(userTable, option)
 
-                st.markdown(f'### `{userDf.user_entries.max()}` User Entries, ' \
-                            f'`{userDf.user_uniques.max()}` Uniques, ' \
-                            f'`{userDf["<10_dupes"].max()}` u10 Dupes, ' \
-                            f'`{round((userDf["user_uniques"].max() / userDf.user_entries.median()) * 100,2)}` ' \
+                st.markdown(f'### `{summary["entries"]}` User Entries, ' \
+                            f'`{summary["uniques"]}` Uniques, ' \
+                            f'`{summary["u10_dupes"]}` u10 Dupes, ' \
+                            f'`{summary["unique%"]}` ' \
                                 'Unique Percentage')
 
+                st.markdown(f'### `{round(float(userDf.own.mean()),2)}%` Avg Ownership, ' \
+                            f'`{round(float(userDf.fpts.mean()),2)}` Avg FPTS, ' \
+                            f'`{round(float(userDf.fpts.max()),2)}` Best FPTS, ' \
+                            f'`{round(float(userDf.leverage.mean()),2)}` Avg Leverage')
+
                 st.write("*If any of the dataframes are truncated, closing the sidebar may help.*")
 
                 # st.table((pd.DataFrame(
@@ -289,22 +484,31 @@ if uploaded_file is not None:
                 #     .set_precision(2))
                 #     )
 
-                st.dataframe((userDf
-                [['FLEX','CPT','unique','dupes']]
-                .rename(columns={'unique':'Unique','dupes':'Dupes'})
-                .style
-                .background_gradient(cmap='RdYlBu_r',subset='Dupes')
-                .set_precision(2)),
+                userLineups = (userDf
+                [['FLEX','CPT','unique','dupes','own','fpts','leverage']]
+                .rename(columns={'unique':'Unique','dupes':'Dupes','own':'Own%','fpts':'FPTS','leverage':'Leverage'}))
+
+                pagedTable(len(userLineups), f'{option}-lineups',
+                lambda start, stop: (userLineups
+                    .iloc[start:stop]
+                    .style
+                    .background_gradient(cmap='RdYlBu_r',subset='Dupes',
+                    vmin=userLineups['Dupes'].min(),vmax=userLineups['Dupes'].max())
+                    .background_gradient(cmap='RdYlBu',subset='Leverage',
+                    vmin=userLineups['Leverage'].min(),vmax=userLineups['Leverage'].max())
+                    .set_precision(2)),
+                lambda: userLineups,
+                contest, ('userLineups', option),
                 height=1200,
                 width=1500)
 
             elif select == 'User Exposure Comparison':
                 comp1 = st.selectbox(
                 'Select a User',
-                pd.Series(sorted(df_.user.drop_duplicates()))
+                pd.Series(sorted(userTable.user))
                 )
 
-                s = pd.Series(sorted(df_.user.loc[df_.user != comp1].drop_duplicates()))
+                s = pd.Series(sorted(userTable.user.loc[userTable.user != comp1]))
                 s.index = s.index+1
                 s = pd.concat([pd.Series('Field'),s])
 
@@ -315,82 +519,14 @@ if uploaded_file is not None:
 
                 st.write("*If any of the dataframes are truncated, closing the sidebar may help.*")
 
-                if comp2 == 'Field':
-                    compFLEX = (pd
-                    .DataFrame(getuserExposure(comp1,df_))
-                    .merge(pd.DataFrame(getfieldExposure(df_)), on='Player')
-                    .rename(columns={'CPT':f'{comp2}_CPT','FLEX':f'{comp2}_FLEX'})
-                    [['Player',f'{comp1}_FLEX',f'{comp2}_FLEX']]
-                    )
-
-                    compFLEX['Diff'] = compFLEX[f'{comp1}_FLEX'] - compFLEX[f'{comp2}_FLEX']
-
-                    compFLEX = (compFLEX
-                    .loc[
-                        (
-                            ~(
-                                (compFLEX[f'{comp1}_FLEX'] == 0) & 
-                                (compFLEX[f'{comp2}_FLEX'] == 0)
-                                )) &
-                            (
-                                (compFLEX[f'{comp2}_FLEX'] > 1.0) |
-                                (compFLEX[f'{comp1}_FLEX'] > 0))
-                            ])
-
-                    compCPT = (pd
-                    .DataFrame(getuserExposure(comp1,df_))
-                    .merge(pd.DataFrame(getfieldExposure(df_)), on='Player')
-                    .rename(columns={'CPT':f'{comp2}_CPT','FLEX':f'{comp2}_FLEX'})
-                    [['Player',f'{comp1}_CPT',f'{comp2}_CPT']]
-                    )
-
-                    compCPT['Diff'] = compCPT[f'{comp1}_CPT'] - compCPT[f'{comp2}_CPT']
-
-                    compCPT = (compCPT
-                    .loc[
-                        (
-                            ~(
-                                (compCPT[f'{comp1}_CPT'] == 0) & 
-                                (compCPT[f'{comp2}_CPT'] == 0)
-                                )) &
-                            (
-                                (compCPT[f'{comp2}_CPT'] > 1.0) |
-                                (compCPT[f'{comp1}_CPT'] > 0))
-                            ])
-
-                else:
-                    compFLEX = (pd
-                    .DataFrame(getuserExposure(comp1,df_))
-                    .merge(pd.DataFrame(getuserExposure(comp2,df_)), on='Player')
-                    [['Player',f'{comp1}_FLEX',f'{comp2}_FLEX']]
-                    )
-
-                    compFLEX['Diff'] = compFLEX[f'{comp1}_FLEX'] - compFLEX[f'{comp2}_FLEX']
-
-                    compFLEX = (compFLEX
-                    .loc[
-                        ~(
-                            (compFLEX[f'{comp1}_FLEX'] == 0) & 
-                            (compFLEX[f'{comp2}_FLEX'] == 0)
-                            )
-                            ])
-
-                    compCPT = (pd
-                    .DataFrame(getuserExposure(comp1,df_))
-                    .merge(pd.DataFrame(getuserExposure(comp2,df_)), on='Player')
-                    [['Player',f'{comp1}_CPT',f'{comp2}_CPT']]
-                    )
-
-                    compCPT['Diff'] = compCPT[f'{comp1}_CPT'] - compCPT[f'{comp2}_CPT']
-
-                    compCPT = compCPT.loc[~((compCPT[f'{comp1}_CPT'] == 0) & (compCPT[f'{comp2}_CPT'] == 0))]
+                userMatrix = getMetric(contest, 'userMatrix')
+                compFLEX, compCPT, comp = getResult(contest, ('comparison', comp1, comp2),
+                getexposureComparison, userMatrix, slots, players, comp1, comp2)
 
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.dataframe((compFLEX
-                    .sort_values(by='Diff', ascending=False)
-                    .reset_index(drop=True)
                     .style
                     .background_gradient(cmap='RdYlBu',subset='Diff')
                     .set_precision(2)),
@@ -398,40 +534,36 @@ if uploaded_file is not None:
 
                 with col2:
                     st.dataframe((compCPT
-                    .sort_values(by='Diff', ascending=False)
-                    .reset_index(drop=True)
                     .style
                     .background_gradient(cmap='RdYlBu',subset='Diff')
                     .set_precision(2)),
                     height=1200)
 
-                if comp2 == 'Field':
-                    pass
-                
-                else:
-                    comp = (pd
-                    .DataFrame(getuserExposure(comp1,df_))
-                    .merge(pd.DataFrame(getuserExposure(comp2,df_)), on='Player')
-                    )
-
+                if comp is not None:
                     st.dataframe((comp
-                    .loc[~(
-                            (comp[f'{comp1}_FLEX'] == 0) &
-                            (comp[f'{comp1}_CPT'] == 0) &
-                            (comp[f'{comp2}_FLEX'] == 0) &
-                            (comp[f'{comp2}_CPT'] == 0)
-                            )
-                        ]
                     .style
                     .set_precision(2))
                     )
 
+                st.markdown("---")
+                st.caption('Users Most Different From the Field')
+
+                minLineups = st.number_input('Minimum lineups', min_value=1, value=20)
+
+                st.dataframe((getResult(contest, ('fieldDistance', minLineups),
+                getfieldDistance, userMatrix, slots, players, minLineups)
+                .head(25)
+                .style
+                .background_gradient(cmap='RdYlBu',subset='Diff')
+                .set_precision(2)),
+                width=1500,
+                height=1000)
+
             elif select == 'Player Combination Queries':
                 
-                exposures__ = pd.DataFrame(getfieldExposure(df_))
-                exposures__['TOTAL'] = exposures__['CPT'] + exposures__['FLEX']
+                comboIndex = getMetric(contest, 'comboIndex')
 
-                playersLst = sorted(list(exposures__.loc[exposures__.TOTAL>.99,'Player']))
+                playersLst = players
 
                 col1, col2 = st.columns(2)
 
@@ -474,14 +606,15 @@ if uploaded_file is not None:
                 #              f'and {player2} {player2Pos} `({round((len(query) / len(df_)) * 100,2)}%)`. ' \
                 #              f'`{query.unique.sum()}` are unique.')
 
-                query = df_.loc[
-                        (df_[f'{player1Pos}'].str.contains(player1)) &
-                        (df_[f'{player2Pos}'].str.contains(player2))
-                        ]
- 
-                st.markdown(f'### There are `{len(query)}` lineups with {player1} {player1Pos} ' \
-                        f'and {player2} {player2Pos} `({round((len(query) / len(df_)) * 100,2)}%)`. ' \
-                        f'`{query.unique.sum()}` are unique.')
+                lineups, uniques, rows = getcombo(comboIndex, comboKey(
+                    players.index(player1), player1Pos,
+                    players.index(player2), player2Pos,
+                    len(players)
+                    ))
+
+                st.markdown(f'### There are `{lineups}` lineups with {player1} {player1Pos} ' \
+                        f'and {player2} {player2Pos} `({round((lineups / len(df_)) * 100,2)}%)`. ' \
+                        f'`{uniques}` are unique.')
 
                     # st.table((pd.DataFrame(
                     # {
@@ -495,76 +628,265 @@ if uploaded_file is not None:
                     # )
 
                 st.write("*If the dataframe is truncated, closing the sidebar may help.*")
-                filt = (df_
-                .loc[
-                    (df_[f'{player1Pos}'].str.contains(player1)) &
-                    (df_[f'{player2Pos}'].str.contains(player2))
-                    ]
-                .sort_values(by='dupes',ascending=False)
-                .drop_duplicates(subset=['lineup'])
-                .reset_index(drop=True))
-
-                st.dataframe((filt[['FLEX','CPT','unique','dupes']]
-                .rename(columns={'unique':'Unique','dupes':'Dupes'})
+                lineupTable(df_, rows, slots, players, f'{player1}-{player1Pos}-{player2}-{player2Pos}',
+                            contest, ('combo', player1, player1Pos, player2, player2Pos))
+
+            elif select == 'Player Combination Visualizer':
+                kind = st.radio('Pairing', ('CPT', 'FLEX'),
+                format_func=lambda i: 'CPT x FLEX' if i == 'CPT' else 'FLEX x FLEX')
+
+                threshold = st.slider('Minimum total roster rate (%)', 0.0, 50.0, 5.0, 0.5)
+
+                st.caption(f'This heatmap shows the percentage of all lineups that had a certain {kind} and FLEX pairing. ' \
+                           f'Only players with {threshold}% or more total ownership are included on this chart.')
+
+                pairCounts = getMetric(contest, 'pairCounts')
+
+                m = getResult(contest, ('heatmap', threshold, kind), showdown.corrPlot, pairCounts, threshold, kind)
+
+                st.altair_chart(getResult(contest, ('heatmapChart', threshold, kind), heatmapChart, m, kind),
+                                use_container_width=True)
+
+                exportButton(contest, ('heatmap', threshold, kind), f'heatmap-{kind}', lambda: m, 'the heatmap matrix')
+
+            elif select == 'Lineup Queries':
+                st.caption('Find lineups matching any combination of player conditions. ' \
+                           'Conditions are combined from top to bottom.')
+
+                bitmapIndex = getMetric(contest, 'bitmapIndex')
+
+                nTerms = st.number_input('Number of conditions', min_value=1, max_value=8, value=2)
+
+                terms = []
+
+                for i in range(int(nTerms)):
+                    col1, col2, col3 = st.columns([1,3,1])
+
+                    with col1:
+                        op = st.selectbox(
+                            'Operator',
+                            ('', 'NOT') if i == 0 else ('AND', 'OR', 'AND NOT', 'OR NOT'),
+                            key = f'queryOp{i}'
+                            )
+
+                    with col2:
+                        player = st.selectbox(
+                            'Player',
+                            players,
+                            key = f'queryPlayer{i}'
+                            )
+
+                    with col3:
+                        slot = st.selectbox(
+                            'CPT, FLEX or ANY?',
+                            ('CPT','FLEX','ANY'),
+                            key = f'querySlot{i}'
+                            )
+
+                    terms.append((op, player, slot))
+
+                minEntries = st.number_input('Only users with at least this many entries', min_value=1, value=1)
+
+                userEntries = userTable['user_entries'].to_numpy()[df_['user'].cat.codes.to_numpy()]
+                mask = userEntries >= minEntries if minEntries > 1 else None
+                result = lineupQuery(bitmapIndex, players, terms, mask)
+
+                st.markdown(f'### There are `{result["lineups"]}` matching lineups ' \
+                        f'`({round((result["lineups"] / len(df_)) * 100,2)}%)`, ' \
+                        f'`{result["distinct"]}` distinct. `{result["uniques"]}` are unique.')
+
+                st.write("*If the dataframe is truncated, closing the sidebar may help.*")
+
+                lineupTable(df_, result['rows'], slots, players, 'lineup-query',
+                            contest, ('lineupQuery', tuple(terms), minEntries))
+
+            elif select == 'Near-Duplicate Lineups':
+                st.caption('Lineups one or two roster swaps (a changed player or CPT) away from other entries, ' \
+                           'and users whose portfolios overlap.')
+
+                nearest = getMetric(contest, 'nearMetrics')['nearest'].value_counts(normalize=True)
+
+                st.markdown(f'### `{round(nearest.get(0, 0) * 100, 2)}%` of entries are exact dupes, ' \
+                        f'`{round(nearest.get(1, 0) * 100, 2)}%` are one swap from another entry and ' \
+                        f'`{round(nearest.get(2, 0) * 100, 2)}%` are two swaps away.')
+
+                st.caption('Largest Near-Duplicate Clusters (lineups sharing 5 of 6 roster spots)')
+
+                st.dataframe((getMetric(contest, 'nearClusters')
                 .style
-                .background_gradient(cmap='RdYlBu',subset='Dupes')
+                .background_gradient(cmap='RdYlBu',subset='Entries')
                 .set_precision(2)),
-                height=1200,
+                height=1000,
                 width=1500)
 
-            elif select == 'Player Combination Visualizer':
-                st.caption('This heatmap shows the percentage of all lineups that had a certain CPT and FLEX pairing. ' \
-                           'Only players with 5% or more total ownership are included on this chart.')
+                st.markdown("---")
+                st.caption('Portfolio Overlap (share of a user\'s lineups within one swap of one of the other user\'s)')
 
-                dfCorr = df.copy()
-                exposures_ = pd.DataFrame(getfieldExposure(df_))
+                minLineups = st.number_input('Minimum lineups', min_value=1, value=20, key='overlapMin')
 
-                @st.cache
-                def corrPlot(exposures_, dfCorr):
-                    exposures_['TOTAL'] = exposures_['CPT'] + exposures_['FLEX']
-                    playerCorr = list(set(exposures_.loc[exposures_.TOTAL>5,'Player']))
-                    playerCorr = [i.strip() for i in playerCorr]
-                    
-                    cpt_ = dfCorr.lineup.str.partition(" FLEX")[0]
-                    dfCorr.lineup = dfCorr.lineup.str.partition(" FLEX")[2] + ' ' + cpt_
+                st.dataframe((getResult(contest, ('portfolioOverlap', minLineups),
+                showdown.getportfolioOverlap, df_, getMetric(contest, 'nearIndex'), minLineups)
+                .style
+                .background_gradient(cmap='RdYlBu',subset='Overlap%')
+                .set_precision(2)),
+                height=1000,
+                width=1500)
 
-                    flex = dfCorr['lineup'].str.split('FLEX|CPT', expand = True)
+            elif select == 'Contest Simulation':
+                st.caption('Player scores are drawn around their FPTS (correlated, CPT at 1.5x) and every lineup ' \
+                           'in the field is scored in each simulation. Dupes split the places they tie for, ' \
+                           'and payouts are in entry fees on a top-heavy table paying the top 20%.')
 
-                    flex.columns = ['FLEX1', 'FLEX2', 'FLEX3', 'FLEX4', 'FLEX5', 'CPT']
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    sims = int(st.number_input('Simulations', min_value=100, max_value=100000, value=1000, step=1000))
+
+                with col2:
+                    seed = int(st.number_input('Seed', min_value=0, value=0))
 
-                    flex= flex[['FLEX1', 'FLEX2', 'FLEX3', 'FLEX4', 'FLEX5', 'CPT']]
+                simResults = getResult(contest, ('simResults', sims, seed),
+                showdown.getsimResults, df_, slots, getMetric(contest, 'playerStats'), sims, seed)
 
-                    flex['id'] = flex.index
+                st.caption('Users by Expected Payout (Win% is the chance one of their entries finishes first, ' \
+                           'Top1 their expected entries in the top 1%)')
 
-                    keys = [c for c in flex if c.startswith('FLEX')]
+                simUsers = getResult(contest, ('simUsers', sims, seed), showdown.getsimUsers, df_, simResults)
+
+                pagedTable(len(simUsers), 'simulatedUsers',
+                lambda start, stop: (simUsers.iloc[start:stop]
+                    .rename(columns={'user':'User','entries':'Entries','win%':'Win%','top1':'Top1',
+                                     'payout':'Payout','roi%':'ROI%'})
+                    .style
+                    .background_gradient(cmap='RdYlBu',subset='ROI%',
+                                         vmin=simUsers['roi%'].min(),vmax=simUsers['roi%'].max())
+                    .set_precision(2)),
+                lambda: simUsers,
+                contest, ('simUsers', sims, seed),
+                height=1000,
+                width=1500)
+
+                st.caption('Lineups Most Likely to Win')
+
+                simLineups = getResult(contest, ('simLineups', sims, seed), showdown.getsimLineups, simResults)
+                # one row per distinct lineup
+                win = simLineups['win%'].where(~df_['lineup_key'].duplicated().to_numpy(), -1)
+                rows = showdown.topRows(win.to_numpy(), 25)
+
+                st.dataframe((displayLineups(df_.iloc[rows], slots, players)
+                .assign(**{i:simLineups[i].to_numpy()[rows] for i in simLineups})
+                [['FLEX','CPT','dupes','win%','top1%','payout']]
+                .rename(columns={'dupes':'Dupes','win%':'Win%','top1%':'Top1%','payout':'Payout'})
+                .style
+                .background_gradient(cmap='RdYlBu',subset='Win%')
+                .set_precision(2)),
+                height=1000,
+                width=1500)
 
-                    cpts = pd.melt(flex, id_vars='CPT', value_vars=keys, value_name='FLEX')
-                    cpts = cpts.dropna()
+            elif select == 'Slate History':
+                conn = openHistory()
 
-                    cpts['CPT'] = cpts['CPT'].str.strip()
-                    cpts['CPT'] = cpts['CPT'].astype('category')
-                    cpts['FLEX'] = cpts['FLEX'].str.strip()
-                    cpts['FLEX'] = cpts['FLEX'].astype('category')
+                try:
+                    slates = getslates(conn)
+                    fingerprint = getfingerprint(uploaded_file)
 
-                    cpts = cpts.loc[(
-                        (cpts.CPT.isin(playerCorr)) & 
-                        (cpts.FLEX.isin(playerCorr)))]
+                    if fingerprint not in set(slates['key']):
+                        if st.button('Add this contest to the history'):
+                            appendContest(conn, getattr(uploaded_file, 'name', 'contest').rsplit('.', 1)[0],
+                                          fingerprint, df_, userTable, players, slots)
+                            slates = getslates(conn)
 
-                    m = pd.crosstab(cpts["CPT"], cpts["FLEX"])
-                    m = pd.crosstab(cpts["CPT"], cpts["FLEX"])
-                    m_div = m.div(len(dfCorr), axis=0)
+                    st.markdown(f'### `{len(slates)}` slates in the history')
 
-                    return m_div
+                    col1, col2, col3 = st.columns(3)
 
-                heatmap = corrPlot(exposures_, dfCorr)
+                    with col1:
+                        option = st.selectbox('Select a User', pd.Series(sorted(userTable.user)), key='historyUser')
 
-                fig, ax = plt.subplots(figsize=(6,6))
-                hm = sns.heatmap(heatmap, cmap='RdYlBu',fmt='.2f')
-                ax.tick_params(labelsize=6)
-                cax = plt.gcf().axes[-1]
-                cax.tick_params(labelsize=8)
+                    with col2:
+                        player = st.selectbox('Select a Player', pd.Series(sorted(players)), key='historyPlayer')
 
-                st.pyplot(fig)
+                    with col3:
+                        slot = st.radio('Slot', ('CPT', 'FLEX'), key='historySlot')
+                        minRate = st.number_input('Minimum rate (%)', min_value=0.0, max_value=100.0, value=0.0)
+
+                    st.caption(f"Slates where {option} rostered {player} at {slot}")
+
+                    st.dataframe((getexposureHistory(conn, player, slot, option, minRate)
+                    .rename(columns={'slate':'Slate','slot':'Slot','lineups':'Lineups','rate':'Rate%'})
+                    .style
+                    .background_gradient(cmap='RdYlBu',subset='Rate%')
+                    .set_precision(2)),
+                    width=1500)
+
+                    st.caption(f"Field {slot} rate of {player} by slate")
+
+                    st.line_chart(getexposureHistory(conn, player, slot).set_index('slate')[['rate']])
+
+                    st.caption(f"{option}'s slates")
+
+                    st.dataframe((getuserHistory(conn, option)
+                    .rename(columns={'slate':'Slate','entries':'Entries','uniques':'Uniques','unique%':'Unique%'})
+                    .style
+                    .set_precision(2)),
+                    width=1500)
+
+                finally:
+                    conn.close()
+
+            elif select == 'Live Standings':
+                changes = st.session_state.get('liveChanges')
+
+                st.markdown(f'### Refresh `{state["refreshes"]}`' + ('' if changes is None else
+                            f': `{changes["scores"]}` scores changed, `{changes["lineups"]}` lineups changed, ' \
+                            f'`{changes["new"]}` new entries'))
+
+                st.caption('Top Entries (Move is the rank change since the entry last moved)')
+
+                st.dataframe((liveStandings(state, 25)
+                .style
+                .background_gradient(cmap='RdYlBu',subset='Move')
+                .set_precision(2)),
+                width=1500,
+                height=1000)
+
+                option = st.selectbox(
+                'Select a User',
+                pd.Series(sorted(userTable.user))
+                )
+
+                st.caption(f"{option}'s best rank at each refresh")
+
+                st.line_chart(liveUserHistory(state, option)[['Rank']])
+
+            endStage(view)
+
+            # metrics still being preloaded in the background: show them as they land
+            if job is not None and not job['done']:
+                st.sidebar.progress(jobProgress(job))
+                st.sidebar.caption(f'Computing {job["stage"]} in the background...')
+
+            # the encoded contest itself, for notebooks to load instead of cleaning the export again
+            with st.sidebar.expander('Exports'):
+                st.caption('Lineup matrix (user, CPT and FLEX player ids, dupes) and the player ids it uses')
+                exportButton(contest, ('lineupMatrix',), 'lineup-matrix', label='the lineup matrix')
+                exportButton(contest, ('playerTable',), 'players', label='the player ids')
+
+            # which derived tables this session has computed so far
+            with st.sidebar.expander('Computed Metrics'):
+                stats = cacheStats(RESULTS)
+
+                st.caption(f'Result cache: {stats["entries"]} results, ' \
+                           f'{round(stats["bytes"] / 2**20, 1)} of {round(stats["maxBytes"] / 2**20)} MB, ' \
+                           f'{stats["hits"]} hits, {stats["misses"]} misses, {stats["evictions"]} evictions')
+
+                st.dataframe(metricGraph(contest)
+                .style
+                .set_precision(3))
+
+            if job is not None and not job['done']:
+                time.sleep(POLL_SECONDS)
+                st.experimental_rerun()
 
         # if a file is correctly read but is not an NFL Showdown CSV
         else:
@@ -583,6 +905,33 @@ if uploaded_file is not None:
                  'Are you sure the CSV you uploaded is an NFL contest?')
         st.stop()
 
+    # always stop recording, even when the run is cut short
+    finally:
+        if profile is not None:
+            profile = stopProfile()
+            profile['context']['contest'] = st.session_state.get('fingerprint')
+            logProfile(profile)
+
+            with st.sidebar.expander('Diagnostics', expanded=True):
+                st.dataframe((profileTable(profile)
+                .style
+                .set_precision(3)))
+
+                # ingestion runs on a background job with its own profile
+                job = st.session_state.get('job')
+                if job is not None and job.get('profile') and job['done']:
+                    st.caption('Background job')
+                    st.dataframe((profileTable(job['profile'])
+                    .style
+                    .set_precision(3)))
+
+                st.download_button(
+                    label='Download profile (JSON)',
+                    data=profileJson(profile),
+                    file_name=f'profile-{profile["id"]}.json',
+                    mime='application/json'
+                    )
+
 # if a file hasn't been uploaded yet
 else:
 
@@ -592,12 +941,12 @@ else:
                 "1. Go to the DraftKings site (desktop version)\n" \
                 "2. Open up any LIVE contest page\n" \
                 "3. In the bottom left, click `Export Lineups as CSV`\n" \
-                "4. Unzip the file and the you should see the CSV!\n\n")
+                "4. Upload the zip file as it is, or the CSV inside it!\n\n")
                 
     st.markdown("#### Don't have a DraftKings account? Click the button below for a sample contest CSV.")
 
-    _csv = pd.read_csv('sampleContest.csv')
-    csv = _csv.to_csv(index=False).encode('utf-8')
+    # the file's own bytes, read once per process
+    csv = memoize(RESULTS, ('sampleContest.csv',), readBytes, 'sampleContest.csv')
     st.download_button(
      label="Download a sample contest (1.3 MB)",
      data=csv,
@@ -623,24 +972,52 @@ with st.sidebar.expander("More Info"):
             - Exposures - Roster Rates for each player on the slate (FLEX, CPT, and TOTAL)
                 - Discarding blank lineups (decimal values might be slightly different than what DK shows)
             - User Unique Leaders - Which users had the most unique lineups, highest unique lineup rate, etc.
-            - Chalk Lineups - Which lineups were duplicated the most?
+            - Chalk Lineups - Which lineups were duplicated the most? With their ownership, points and leverage
 
         \n
         - **Individual User Stats**
             - Complete user lineup statistics, filterable by any user who entered the slate
+            - `Own%` is the lineup's cumulative ownership (CPT rate at CPT, FLEX rate at FLEX), `FPTS` its points (CPT at 1.5x) and `Leverage` how far its points z-score sits above its ownership z-score
 
         \n
         - **User/Field Exposure Comparison**
             - Comparison of user/field exposures for both FLEX and CPT filterable by any two users who entered the slate (or the field)
             - `Diff` column is with respect to the first user selected (User1 - User2)
+            - Users Most Different From the Field - Share of each user's CPT/FLEX roster spots that differ from the field
 
         \n
         - **Player Combo Queries**
             - Takes any 2 player CPT/FLEX combo and calculates popular and unique it is
-            - Only players with a roster rate greater than .99% are included
 
         \n
         - **Player Combination Visualizer**
-            - A heatmap showing all CPT/FLEX combos for players with more than a 5% total roster rate
+            - A heatmap showing all CPT/FLEX (or FLEX/FLEX) combos for players above an adjustable total roster rate (5% by default)
             - Shows the percentage of all lineups that had a certain CPT and FLEX pairing
+
+        \n
+        - **Lineup Queries**
+            - Counts the lineups matching any AND/OR/NOT combination of player CPT/FLEX conditions
+            - Can be limited to users with a minimum number of entries
+
+        \n
+        - **Near-Duplicate Lineups**
+            - How many entries are exact dupes, one roster swap or two swaps away from another entry
+            - The largest clusters of lineups sharing 5 of their 6 roster spots
+            - User pairs whose portfolios overlap most (share of a user's lineups within one swap of the other user's)
+
+        \n
+        - **Contest Simulation**
+            - Simulates the slate thousands of times: player scores are drawn around their `FPTS` (correlated, CPT at 1.5x) and every lineup in the field is scored in each simulation
+            - Each user's chance to win, expected entries in the top 1% and expected payout (in entry fees, on a top-heavy table paying the top 20%), with dupes splitting the places they tie for
+            - The lineups most likely to win
+
+        \n
+        - **Slate History**
+            - Adds the uploaded contest to a local multi-slate history
+            - Every slate where a user rostered a player at CPT or FLEX above a chosen rate, the field's rate of that player by slate, and the user's entries and uniques on each slate
+
+        \n
+        - **Live Standings** (Live mode)
+            - Re-upload exports of the same contest during the slate; only changed entries are reprocessed
+            - Top entries with rank movement, and any user's best rank over time
      """)
\ No newline at end of file
@@ -0,0 +1,86 @@
+'''
+Bitmap lineup queries against a brute-force scan of the slot matrix.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+from showdown.combos import PACK_CHUNK_ROWS, packRows
+from showdown.synthetic import generateContest
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def bruteQuery(df, slots, players, terms):
+    '''
+    Matching rows of a query, term by term over the slot matrix.
+    '''
+
+    match = np.ones(len(slots), dtype=bool)
+
+    for op, player, slot in terms:
+        i = players.index(player)
+        term = {'CPT':slots[:,0] == i, 'FLEX':(slots[:,1:] == i).any(axis=1), 'ANY':(slots == i).any(axis=1)}[slot]
+
+        if op.endswith('NOT'):
+            term = ~term
+
+        match = match | term if op.startswith('OR') else match & term
+
+    return match
+
+def checkQueries(df, slots, players, queries):
+    bitmapIndex = showdown.getbitmapIndex(df, slots, players)
+    unique = df['unique'].to_numpy() == 1
+    keys = df['lineup_key'].to_numpy()
+
+    for terms in queries:
+        result = showdown.lineupQuery(bitmapIndex, players, terms)
+        match = bruteQuery(df, slots, players, terms)
+
+        assert result['lineups'] == match.sum()
+        assert result['uniques'] == (match & unique).sum()
+        assert result['distinct'] == len(np.unique(keys[match]))
+        assert sorted(keys[result['rows']]) == sorted(np.unique(keys[match]))
+
+def queries(players):
+    a, b, c = players[:3]
+
+    return [
+        [('', a, 'CPT')],
+        [('', a, 'CPT'), ('AND', b, 'FLEX')],
+        [('', a, 'ANY'), ('OR', b, 'CPT'), ('AND NOT', c, 'FLEX')],
+        [('NOT', a, 'ANY')],
+        [('', b, 'FLEX'), ('OR NOT', c, 'ANY')],
+        [('', a, 'CPT'), ('AND', a, 'FLEX')]
+    ]
+
+def test_queries_match_brute_force():
+    df, userTable, players, slots = showdown.cleanData(pd.read_csv(SAMPLE))
+    top = list(pd.Series(slots.ravel()).value_counts().index[:3])
+
+    checkQueries(df, slots, players, queries([players[i] for i in top]))
+
+def test_queries_across_chunks():
+    df, userTable, players, slots = showdown.cleanData(generateContest(PACK_CHUNK_ROWS + 5000))
+    assert len(df) > PACK_CHUNK_ROWS
+
+    checkQueries(df, slots, players, queries(players))
+
+def test_packed_rows_do_not_depend_on_chunk():
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, 1001, 3000)
+    ids = rng.integers(0, 7, 3000)
+
+    expected = np.zeros((7, 1001), dtype=bool)
+    expected[ids, rows] = True
+
+    for chunk in [8, 64, 1000, PACK_CHUNK_ROWS]:
+        assert (packRows(ids, rows, 7, 1001, chunk=chunk) == np.packbits(expected, axis=1)).all()
@@ -0,0 +1,35 @@
+'''
+Memory of a cleaned contest against the published bytes-per-entry and bytes-per-user targets.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def test_bytes_per_entry():
+    df, userTable, players, slots = showdown.cleanData(pd.read_csv(SAMPLE))
+    sizes = showdown.contestBytes(df, userTable, players, slots)
+
+    assert sizes['per_entry'] <= showdown.TARGET_BYTES_PER_ENTRY
+    assert sizes['per_user'] <= showdown.TARGET_BYTES_PER_USER
+
+    # together the targets bound the whole contest, but for the player dictionary
+    target = showdown.TARGET_BYTES_PER_ENTRY * len(df) + showdown.TARGET_BYTES_PER_USER * len(userTable)
+    assert sizes['total'] - sizes['players'] <= target
+
+def test_streamed_bytes_per_entry():
+    df, userTable, players, slots = showdown.streamContest(SAMPLE)
+
+    sizes = showdown.contestBytes(df, userTable, players, slots)
+
+    assert sizes['per_entry'] <= showdown.TARGET_BYTES_PER_ENTRY
+    assert sizes['per_user'] <= showdown.TARGET_BYTES_PER_USER
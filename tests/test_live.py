@@ -0,0 +1,89 @@
+'''
+Incremental live updates against a full clean of the same export.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+from showdown.live import entryRows, startLive, updateLive, liveContest, liveExposure
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def refreshes():
+    '''
+    A first export missing its last entries and with one malformed lineup, then
+    re-exports with changed lineups, new entries (one malformed) and moving scores.
+    '''
+
+    data = pd.read_csv(SAMPLE)
+    rows = entryRows(data).index
+    rng = np.random.default_rng(0)
+
+    data.loc[rows[3], 'Lineup'] = 'CPT Najee Harris FLEX Nobody'
+    first = data.drop(index=rows[-200:])
+
+    later = data.copy()
+    changed = rng.choice(rows[4:-200], 300, replace=False)
+    later.loc[changed, 'Lineup'] = rng.choice(data.loc[rows[4:], 'Lineup'].to_numpy(), len(changed))
+    later.loc[rows[-1], 'Lineup'] = 'FLEX Nick Chubb'
+
+    exports = [first]
+    for i in range(3):
+        export = later.copy()
+        export.loc[rows, 'Points'] = export.loc[rows, 'Points'] + i
+        exports.append(export)
+
+    return exports
+
+def test_incremental_matches_full_clean():
+    exports = refreshes()
+    state = startLive(exports[0])
+    assert len(state['malformed']) == 1
+
+    for export in exports[1:]:
+        updateLive(state, export)
+
+        # identical lineups are reported once, however many refreshes repeat them
+        assert len(state['malformed']) == 2
+
+    malformed = []
+    df, userTable, players, slots = showdown.cleanData(exports[-1], malformed)
+    ids = entryRows(exports[-1]).drop(index=[i['row'] for i in malformed])['EntryId'].to_numpy()
+
+    liveDf, liveUsers, livePlayers, liveSlots = liveContest(state)
+    pos = state['entryIds'].get_indexer(ids)
+
+    assert livePlayers == players
+    assert len(liveDf) == len(df) and (pos >= 0).all()
+    assert (liveSlots[pos] == slots).all()
+
+    for i in ['lineup_key', 'unique', 'dupes']:
+        assert (liveDf[i].to_numpy()[pos] == df[i].to_numpy()).all()
+    assert (liveDf['user'].astype(str).to_numpy()[pos] == df['user'].astype(str).to_numpy()).all()
+
+    pd.testing.assert_frame_equal(liveUsers.sort_values('user').reset_index(drop=True),
+                                  userTable.sort_values('user').reset_index(drop=True), check_dtype=False)
+
+    exps = showdown.getfieldExposure(slots, players)
+    assert np.allclose(liveExposure(state)['CPT'], exps['CPT']) and np.allclose(liveExposure(state)['FLEX'], exps['FLEX'])
+
+def test_scores_follow_the_latest_export():
+    exports = refreshes()
+    state = startLive(exports[0])
+
+    for export in exports[1:]:
+        updateLive(state, export)
+
+    rows = entryRows(exports[-1])
+    pos = state['entryIds'].get_indexer(rows['EntryId'])
+    kept = pos >= 0
+
+    assert (state['points'][pos[kept]] == rows['Points'].to_numpy()[kept]).all()
@@ -0,0 +1,78 @@
+'''
+Near-duplicate distances and clusters against brute-force pairwise comparison.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+from showdown.neardupes import lineupTokens
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def sampleContest(n=1500):
+    '''
+    The first n entries of the sample, few enough to compare every pair.
+    '''
+
+    data = pd.read_csv(SAMPLE)
+    data = data.drop(index=data.dropna(subset=['EntryName', 'Lineup']).index[n:])
+
+    return showdown.cleanData(data)
+
+def swaps(df, slots, players):
+    '''
+    Swaps between every pair of rows: 6 less the roster tokens they share.
+    '''
+
+    tokens = lineupTokens(slots, len(players))
+    shared = (tokens[:,None,:,None] == tokens[None,:,None,:]).any(axis=3).sum(axis=2)
+
+    return 6 - shared
+
+def test_near_metrics_match_brute_force():
+    df, userTable, players, slots = sampleContest()
+    nearMetrics = showdown.getnearMetrics(showdown.getnearIndex(df, slots, players))
+
+    distance = swaps(df, slots, players)
+    np.fill_diagonal(distance, 99)
+
+    assert (nearMetrics['near1'].to_numpy() == (distance == 1).sum(axis=1)).all()
+    assert (nearMetrics['near2'].to_numpy() == (distance == 2).sum(axis=1)).all()
+    assert (nearMetrics['nearest'].to_numpy() == np.minimum(distance.min(axis=1), 3)).all()
+
+def test_clusters_match_brute_force():
+    df, userTable, players, slots = sampleContest()
+    nearIndex = showdown.getnearIndex(df, slots, players)
+    clusters = showdown.getnearClusters(df, nearIndex, players, n=10 ** 6)
+
+    # every 5-token core held by more than one distinct lineup, with its rows
+    tokens = lineupTokens(slots, len(players))
+    cores = {}
+    for row, lineup in enumerate(tokens):
+        for core in set(combinations(lineup, 5)):
+            cores.setdefault(core, []).append(row)
+
+    keys = df['lineup_key'].to_numpy()
+    users = df['user'].astype(str).to_numpy()
+    expected = sorted((len(set(keys[rows])), len(rows), len(set(users[rows])))
+                      for rows in cores.values() if len(set(keys[rows])) > 1)
+
+    assert sorted(zip(clusters['Lineups'], clusters['Entries'], clusters['Users'])) == expected
+
+    # every lineup of a cluster is one swap from every other
+    names = np.array(players, dtype=object)
+    for core in clusters['Core'].head(5):
+        cpt, flex = core.split(' | ')
+        flex = flex[len('FLEX '):].split(', ')
+        rows = [i for i in range(len(df)) if all(j in names[slots[i,1:]] for j in flex)
+                and (cpt == 'CPT (any)' or names[slots[i,0]] == cpt[len('CPT '):])]
+        assert len(rows) and (swaps(df, slots[rows], players) <= 1).all()
@@ -0,0 +1,40 @@
+'''
+Lineup points from the export's player side table against the export's own scoring.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def test_lineup_points_match_export():
+    data = pd.read_csv(SAMPLE)
+    side = []
+    df, userTable, players, slots = showdown.cleanData(data, side=side)
+
+    metrics = showdown.getlineupMetrics(slots, showdown.playerStats(side[0], players))
+    points = data.dropna(subset=['EntryName', 'Lineup'])['Points'].to_numpy()
+
+    assert np.allclose(metrics['fpts'].to_numpy(), points, atol=.01)
+
+def test_cpt_listed_points_are_base_points():
+    side = showdown.sideTable(pd.DataFrame({'Player':['A', 'B'], 'Roster Position':['CPT', 'FLEX'], 'FPTS':[15.0, 10.0]}))
+
+    assert side['FPTS'].tolist() == [10.0, 10.0]
+
+def test_streamed_side_table_matches():
+    side, streamed = [], []
+    df, userTable, players, slots = showdown.cleanData(pd.read_csv(SAMPLE), side=side)
+    showdown.streamContest(SAMPLE, side=streamed)
+
+    pd.testing.assert_frame_equal(showdown.playerStats(side[0], players), showdown.playerStats(streamed[0], players))
+    pd.testing.assert_frame_equal(showdown.playerStats(side[0], players), showdown.readPlayerStats(SAMPLE, players))
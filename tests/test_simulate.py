@@ -0,0 +1,55 @@
+'''
+Score model and simulated equity of the contest simulator.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv')
+
+def sampleContest():
+    data = pd.read_csv(SAMPLE)
+    side = []
+    df, userTable, players, slots = showdown.cleanData(data, side=side)
+
+    return data, df, players, slots, showdown.playerStats(side[0], players)
+
+def test_cpt_listed_means_are_base_points():
+    data, df, players, slots, stats = sampleContest()
+    model = showdown.scoreModel(stats)
+
+    listed = data.dropna(subset=['Player'])
+    cpt = listed.loc[listed['Roster Position'] == 'CPT']
+    assert len(cpt)
+
+    for name, fpts in zip(cpt['Player'], cpt['FPTS']):
+        assert np.isclose(model['mean'][players.index(name)], fpts / 1.5)
+
+def test_equity_adds_up():
+    data, df, players, slots, stats = sampleContest()
+    simResults = showdown.getsimResults(df, slots, stats, sims=200, seed=1, workers=2)
+
+    entries = simResults['entries']
+    topEntries = int(np.ceil(len(df) * .01))
+    prizes = showdown.payoutCurve(len(df))
+
+    # every simulation has one winner, topEntries entries in the top 1% and pays out every prize
+    assert np.isclose((simResults['win'] * entries).sum(), 1)
+    assert np.isclose((simResults['top1'] * entries).sum(), topEntries)
+    assert np.isclose((simResults['payout'] * entries).sum(), prizes.sum())
+
+def test_results_do_not_depend_on_workers():
+    data, df, players, slots, stats = sampleContest()
+    one = showdown.getsimResults(df, slots, stats, sims=100, seed=3, workers=1)
+    two = showdown.getsimResults(df, slots, stats, sims=100, seed=3, workers=4)
+
+    assert np.allclose(one['payout'], two['payout'])
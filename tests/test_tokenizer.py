@@ -0,0 +1,74 @@
+'''
+Lineup tokenizing on the export's lineup formats and on lineups it has to report.
+
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import showdown
+
+PLAYERS = ['Najee Harris', 'Nick Chubb', 'Diontae Johnson', 'Jarvis Landry', 'Pat Freiermuth', 'CPT Kirk', 'Joe FLEX Smith']
+IDS = dict(zip(PLAYERS, range(len(PLAYERS))))
+
+def tokenize(lineups):
+    return showdown.tokenizeLineups(pd.Series(lineups), IDS)
+
+def test_cpt_first_flex_first_and_mixed():
+    slots, malformed = tokenize([
+        'CPT Najee Harris FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth FLEX Joe FLEX Smith',
+        'FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth FLEX Joe FLEX Smith CPT Najee Harris',
+        'FLEX Nick Chubb FLEX Diontae Johnson CPT Najee Harris FLEX Jarvis Landry FLEX Pat Freiermuth FLEX Joe FLEX Smith'
+    ])
+
+    assert malformed.empty
+    assert (slots == [0, 1, 2, 3, 4, 6]).all()
+
+def test_names_starting_with_a_marker():
+    slots, malformed = tokenize([
+        'CPT CPT Kirk FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth FLEX Najee Harris',
+        'CPT Najee Harris FLEX CPT Kirk FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth',
+        'FLEX CPT Kirk FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth CPT Najee Harris'
+    ])
+
+    assert malformed.empty
+    assert slots.tolist() == [[5, 1, 2, 3, 4, 0], [0, 5, 1, 2, 3, 4], [0, 5, 1, 2, 3, 4]]
+
+def test_unknown_and_blank_lineups_are_reported():
+    lineups = pd.Series([
+        'CPT Najee Harris FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth FLEX Nobody',
+        np.nan,
+        '',
+        'CPT Najee Harris FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth',
+        'CPT Najee Harris FLEX Nick Chubb FLEX Diontae Johnson FLEX Jarvis Landry FLEX Pat Freiermuth FLEX Joe FLEX Smith'
+    ], index=[10, 11, 12, 13, 14])
+
+    slots, malformed = showdown.tokenizeLineups(lineups, IDS)
+
+    assert malformed['row'].tolist() == [10, 11, 12, 13]
+    assert malformed['reason'].tolist() == ['unknown player', 'lineup is not text', '0 CPT slots', '4 FLEX slots']
+    assert (slots[:4] == -1).all() and slots[4].tolist() == [0, 1, 2, 3, 4, 6]
+
+    # an unknown player doesn't grow the dictionary
+    assert len(IDS) == len(PLAYERS)
+
+def test_sample_matches_split():
+    data = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sampleContest.csv'))
+    lineups = data['Lineup'].dropna()
+    ids = {name:i for i, name in enumerate(pd.unique(showdown.normalizeNames(data['Player'].dropna())))}
+
+    slots, malformed = showdown.tokenizeLineups(lineups, ids)
+
+    # brute force: split on every marker, CPT first then the FLEX players in order
+    for lineup, row in zip(lineups, slots):
+        parts = [i.split(' ', 1) for i in (' ' + lineup).replace(' CPT ', '|CPT ').replace(' FLEX ', '|FLEX ').split('|')[1:]]
+        names = [name for marker, name in parts if marker == 'CPT'] + [name for marker, name in parts if marker == 'FLEX']
+        assert row.tolist() == [ids[' '.join(i.split())] for i in names]
+
+    assert malformed.empty